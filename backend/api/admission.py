@@ -0,0 +1,399 @@
+"""
+Admission control for audio processing requests.
+
+Before a request starts the pipeline it must get past two checks:
+
+- a per-client token bucket (``ADMISSION_CLIENT_RATE`` requests per minute,
+  bursts of ``ADMISSION_CLIENT_BURST``), keyed by API key when the client
+  sends one of ``ADMISSION_API_KEYS`` and by client IP otherwise; an empty
+  bucket answers 429;
+- a global limit of ``ADMISSION_MAX_CONCURRENT`` pipelines across all
+  workers. A request that finds every slot taken waits in a short FIFO queue
+  (``ADMISSION_QUEUE_SIZE`` entries, ``ADMISSION_QUEUE_TIMEOUT`` seconds);
+  when the queue is full or the wait times out it gets a 503.
+
+Both rejections carry ``Retry-After``: for 429 the time until the bucket
+refills one token, for 503 when a slot is expected to free up, judged from
+how long the running pipelines have been going and the recent average
+pipeline duration.
+
+State lives in a SQLite file shared by the gunicorn workers. Slots are leases
+tagged with the owning worker's process identity, so a crashed worker's
+slots are reclaimed.
+"""
+import math
+import time
+import uuid
+import random
+import asyncio
+import hashlib
+import hmac
+import logging
+import sqlite3
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator, Optional
+
+from django.conf import settings
+
+from . import metrics
+from .services import APIError
+from .storage import SQLiteStore, process_alive, process_identity
+
+logger = logging.getLogger(__name__)
+
+RUNNING = 'running'
+WAITING = 'waiting'
+
+# Weight of the newest duration in the per-endpoint moving average
+DURATION_SMOOTHING = 0.2
+
+
+class AdmissionStore(SQLiteStore):
+    """Concurrency leases, queued waiters and client token buckets shared by all workers"""
+
+    schema = """
+    CREATE TABLE IF NOT EXISTS admissions (
+        id TEXT PRIMARY KEY,
+        client TEXT NOT NULL,
+        endpoint TEXT NOT NULL,
+        state TEXT NOT NULL,
+        worker TEXT NOT NULL,
+        since REAL NOT NULL,
+        expires_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS admissions_state_since ON admissions (state, since);
+    CREATE TABLE IF NOT EXISTS client_buckets (
+        client TEXT PRIMARY KEY,
+        tokens REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS service_times (
+        endpoint TEXT PRIMARY KEY,
+        average REAL NOT NULL
+    );
+    """
+
+
+class AdmissionController:
+    """Token buckets plus a global concurrency limit with a bounded waiting queue"""
+
+    def __init__(self, store: AdmissionStore, max_concurrent: int = 4, queue_size: int = 8,
+                 queue_timeout: float = 10.0, client_rate: float = 6.0, client_burst: int = 3,
+                 lease_seconds: float = 900.0, poll_interval: float = 0.2):
+        self.store = store
+        self.max_concurrent = max_concurrent
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.client_rate = client_rate / 60.0  # tokens per second
+        self.client_burst = client_burst
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+
+    def _reclaim(self, conn, now: float) -> None:
+        """Drop expired leases and those held by workers that no longer exist"""
+        conn.execute('DELETE FROM admissions WHERE expires_at < ?', (now,))
+        for row in conn.execute('SELECT DISTINCT worker FROM admissions').fetchall():
+            if not process_alive(row['worker']):
+                conn.execute('DELETE FROM admissions WHERE worker = ?', (row['worker'],))
+
+    def _take_token(self, conn, client: str, now: float) -> Optional[float]:
+        """Consume one token; if the bucket is empty return the seconds until it has one"""
+        if self.client_rate <= 0:
+            return None
+        row = conn.execute('SELECT tokens, updated_at FROM client_buckets WHERE client = ?', (client,)).fetchone()
+        tokens = self.client_burst if row is None else min(
+            self.client_burst, row['tokens'] + max(0.0, now - row['updated_at']) * self.client_rate,
+        )
+        if tokens < 1:
+            return (1 - tokens) / self.client_rate
+        conn.execute(
+            'INSERT OR REPLACE INTO client_buckets (client, tokens, updated_at) VALUES (?, ?, ?)',
+            (client, tokens - 1, now),
+        )
+        if random.random() < 0.01:
+            # Buckets idle long enough to be full again carry no state
+            conn.execute('DELETE FROM client_buckets WHERE updated_at < ?',
+                         (now - self.client_burst / self.client_rate,))
+        return None
+
+    def _first_in_line(self, conn, admission_id: str) -> bool:
+        """Whether no queued request has been waiting longer than this one"""
+        row = conn.execute(
+            'SELECT id FROM admissions WHERE state = ? ORDER BY since, id LIMIT 1', (WAITING,),
+        ).fetchone()
+        return row is None or row['id'] == admission_id
+
+    def estimate_wait(self, conn, endpoint: str, position: int, now: float) -> int:
+        """Seconds until a slot should be free for the request ``position`` places back in the queue"""
+        average = self.average_duration(conn, endpoint)
+        running = conn.execute('SELECT since FROM admissions WHERE state = ?', (RUNNING,)).fetchall()
+        remaining = sorted(max(1.0, average - (now - row['since'])) for row in running) or [0.0]
+        rounds, index = divmod(position, max(1, len(remaining)))
+        return max(1, math.ceil(remaining[index] + rounds * average))
+
+    def average_duration(self, conn, endpoint: str) -> float:
+        row = conn.execute('SELECT average FROM service_times WHERE endpoint = ?', (endpoint,)).fetchone()
+        return row['average'] if row else getattr(settings, 'ADMISSION_DEFAULT_DURATION', 30.0)
+
+    def _admit_or_enqueue(self, client: str, endpoint: str, needs_slot: bool) -> tuple:
+        """Returns (admission id or None, state); raises the 429/503 ``APIError`` on rejection"""
+        with self.store.transaction() as conn:
+            # Read the clock once the write lock is held, so updates land in time order
+            now = time.time()
+            retry_after = self._take_token(conn, client, now)
+            if retry_after is not None:
+                metrics.record_admission(endpoint, 'rate_limited')
+                raise APIError(
+                    "Too many requests from this client, please slow down", 429, "admission",
+                    retry_after=max(1, math.ceil(retry_after)),
+                )
+            if not needs_slot:
+                return None, RUNNING
+
+            self._reclaim(conn, now)
+            running = conn.execute('SELECT COUNT(*) FROM admissions WHERE state = ?', (RUNNING,)).fetchone()[0]
+            waiting = conn.execute('SELECT COUNT(*) FROM admissions WHERE state = ?', (WAITING,)).fetchone()[0]
+            admission_id = uuid.uuid4().hex
+            if running < self.max_concurrent and waiting == 0:
+                state, expires_at = RUNNING, now + self.lease_seconds
+            elif waiting < self.queue_size and self.queue_timeout > 0:
+                state, expires_at = WAITING, now + self.queue_timeout + 5
+            else:
+                # Raising rolls the transaction back, so the client keeps its token
+                metrics.record_admission(endpoint, 'rejected')
+                raise APIError(
+                    "Server is at capacity, please retry shortly", 503, "admission",
+                    retry_after=self.estimate_wait(conn, endpoint, waiting, now),
+                )
+            conn.execute(
+                'INSERT INTO admissions (id, client, endpoint, state, worker, since, expires_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (admission_id, client, endpoint, state, process_identity(), now, expires_at),
+            )
+        return admission_id, state
+
+    def _try_promote(self, admission_id: str) -> bool:
+        """Move a queued request into a free slot if it is at the head of the queue"""
+        with self.store.transaction() as conn:
+            now = time.time()
+            self._reclaim(conn, now)
+            running = conn.execute('SELECT COUNT(*) FROM admissions WHERE state = ?', (RUNNING,)).fetchone()[0]
+            if running >= self.max_concurrent or not self._first_in_line(conn, admission_id):
+                return False
+            return conn.execute(
+                'UPDATE admissions SET state = ?, since = ?, expires_at = ? WHERE id = ? AND state = ?',
+                (RUNNING, now, now + self.lease_seconds, admission_id, WAITING),
+            ).rowcount == 1
+
+    def take_free_slots(self, client: str, endpoint: str, count: int) -> list:
+        """
+        Up to ``count`` more slots for work fanned out under one admission, e.g.
+        a batch. Only slots that are free right now are taken and none while
+        others are queued, so a batch never waits for or starves anyone.
+        """
+        with self.store.transaction() as conn:
+            now = time.time()
+            self._reclaim(conn, now)
+            running = conn.execute('SELECT COUNT(*) FROM admissions WHERE state = ?', (RUNNING,)).fetchone()[0]
+            waiting = conn.execute('SELECT COUNT(*) FROM admissions WHERE state = ?', (WAITING,)).fetchone()[0]
+            free = 0 if waiting else max(0, min(count, self.max_concurrent - running))
+            admission_ids = [uuid.uuid4().hex for _ in range(free)]
+            conn.executemany(
+                'INSERT INTO admissions (id, client, endpoint, state, worker, since, expires_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(admission_id, client, endpoint, RUNNING, process_identity(), now, now + self.lease_seconds)
+                 for admission_id in admission_ids],
+            )
+        return admission_ids
+
+    def _give_up(self, admission_id: str, endpoint: str) -> APIError:
+        with self.store.transaction() as conn:
+            now = time.time()
+            conn.execute('DELETE FROM admissions WHERE id = ?', (admission_id,))
+            waiting = conn.execute('SELECT COUNT(*) FROM admissions WHERE state = ?', (WAITING,)).fetchone()[0]
+            retry_after = self.estimate_wait(conn, endpoint, waiting, now)
+        return APIError("Server is at capacity, please retry shortly", 503, "admission", retry_after=retry_after)
+
+    def release(self, admission_id: Optional[str], endpoint: str, duration: Optional[float] = None) -> None:
+        """Free a slot; a completed pipeline's duration feeds the Retry-After estimate"""
+        if admission_id is None:
+            return
+        with self.store.transaction() as conn:
+            conn.execute('DELETE FROM admissions WHERE id = ?', (admission_id,))
+            if duration is not None:
+                conn.execute(
+                    'INSERT INTO service_times (endpoint, average) VALUES (?, ?) '
+                    'ON CONFLICT(endpoint) DO UPDATE SET average = average * ? + excluded.average * ?',
+                    (endpoint, duration, 1 - DURATION_SMOOTHING, DURATION_SMOOTHING),
+                )
+
+    def acquire(self, client: str, endpoint: str, needs_slot: bool = True) -> 'Admission':
+        """Take a client token and, if ``needs_slot``, a processing slot, waiting in the queue if needed"""
+        try:
+            admission_id, state = self._admit_or_enqueue(client, endpoint, needs_slot)
+        except sqlite3.Error as e:
+            # Admission control protects capacity; a broken store should not take the service down
+            logger.warning(f"Admission store unavailable, admitting request: {str(e)}")
+            return Admission(None, None, endpoint)
+        if state == WAITING:
+            metrics.record_admission(endpoint, 'queued')
+            deadline = time.monotonic() + self.queue_timeout
+            while not self._try_promote(admission_id):
+                if time.monotonic() >= deadline:
+                    metrics.record_admission(endpoint, 'queue_timeout')
+                    raise self._give_up(admission_id, endpoint)
+                time.sleep(self.poll_interval)
+        metrics.record_admission(endpoint, 'admitted')
+        return Admission(self, admission_id, endpoint, client)
+
+    async def aacquire(self, client: str, endpoint: str, needs_slot: bool = True) -> 'Admission':
+        """Async variant of ``acquire``; store access runs on worker threads"""
+        try:
+            admission_id, state = await asyncio.to_thread(self._admit_or_enqueue, client, endpoint, needs_slot)
+        except sqlite3.Error as e:
+            logger.warning(f"Admission store unavailable, admitting request: {str(e)}")
+            return Admission(None, None, endpoint)
+        if state == WAITING:
+            metrics.record_admission(endpoint, 'queued')
+            deadline = time.monotonic() + self.queue_timeout
+            while not await asyncio.to_thread(self._try_promote, admission_id):
+                if time.monotonic() >= deadline:
+                    metrics.record_admission(endpoint, 'queue_timeout')
+                    raise await asyncio.to_thread(self._give_up, admission_id, endpoint)
+                await asyncio.sleep(self.poll_interval)
+        metrics.record_admission(endpoint, 'admitted')
+        return Admission(self, admission_id, endpoint, client)
+
+
+class Admission:
+    """
+    A granted admission. ``release`` is idempotent and may be called early,
+    e.g. once a request turns out to be a background job; set ``completed``
+    when the pipeline finished so its duration feeds the Retry-After estimate.
+    """
+
+    def __init__(self, controller: Optional[AdmissionController], admission_id: Optional[str], endpoint: str,
+                 client: str = ''):
+        self.controller = controller
+        self.admission_id = admission_id
+        self.endpoint = endpoint
+        self.client = client
+        self.extra_ids = []
+        self.started = time.time()
+        self.completed = False
+
+    def widen(self, count: int) -> int:
+        """Take up to ``count`` more free slots; returns how many slots are now held, this one included"""
+        if self.controller is None:
+            # Admission control is off (or its store is down): nothing to share
+            return 1 + count
+        if self.admission_id is None or count <= 0:
+            return 1 + len(self.extra_ids)
+        try:
+            self.extra_ids.extend(self.controller.take_free_slots(self.client, self.endpoint, count))
+        except sqlite3.Error as e:
+            logger.warning(f"Could not take extra admission slots: {str(e)}")
+        return 1 + len(self.extra_ids)
+
+    def release(self) -> None:
+        admission_id, self.admission_id = self.admission_id, None
+        extra_ids, self.extra_ids = self.extra_ids, []
+        if admission_id is None:
+            return
+        duration = time.time() - self.started if self.completed else None
+        try:
+            self.controller.release(admission_id, self.endpoint, duration)
+            for extra_id in extra_ids:
+                self.controller.release(extra_id, self.endpoint)
+        except sqlite3.Error as e:
+            # The lease expires on its own
+            logger.warning(f"Could not release admission {admission_id}: {str(e)}")
+
+
+def _configured_api_key(request) -> Optional[str]:
+    """The API key the request sends (X-Api-Key or Authorization: Bearer), if it is one of ADMISSION_API_KEYS"""
+    credential = request.META.get('HTTP_X_API_KEY') or request.META.get('HTTP_AUTHORIZATION', '')
+    if credential[:7].lower() == 'bearer ':
+        credential = credential[7:]
+    credential = credential.strip()
+    if not credential:
+        return None
+    for key in getattr(settings, 'ADMISSION_API_KEYS', []):
+        if hmac.compare_digest(credential.encode('utf-8'), key.encode('utf-8')):
+            return credential
+    return None
+
+
+def client_key(request) -> str:
+    """
+    Rate-limit key: a hash of the API key when it is one of ADMISSION_API_KEYS,
+    otherwise the client IP. Unknown credentials are ignored, so sending a new
+    one per request does not buy a fresh bucket. The IP is REMOTE_ADDR unless
+    ADMISSION_PROXY_HOPS trusted reverse proxies sit in front; then it is taken
+    from X-Forwarded-For at that depth, which the client cannot spoof.
+    """
+    credential = _configured_api_key(request)
+    if credential:
+        return 'key:' + hashlib.sha256(credential.encode('utf-8')).hexdigest()[:24]
+    hops = getattr(settings, 'ADMISSION_PROXY_HOPS', 0)
+    forwarded = [part.strip() for part in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if part.strip()]
+    if hops > 0 and len(forwarded) >= hops:
+        return 'ip:' + forwarded[-hops]
+    return 'ip:' + request.META.get('REMOTE_ADDR', 'unknown')
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> Optional[AdmissionController]:
+    """Get or create the admission controller, or None when admission control is off"""
+    global _controller
+    if not getattr(settings, 'ADMISSION_ENABLED', True):
+        return None
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = AdmissionController(
+                    AdmissionStore(settings.ADMISSION_STORE_PATH),
+                    max_concurrent=getattr(settings, 'ADMISSION_MAX_CONCURRENT', 4),
+                    queue_size=getattr(settings, 'ADMISSION_QUEUE_SIZE', 8),
+                    queue_timeout=getattr(settings, 'ADMISSION_QUEUE_TIMEOUT', 10.0),
+                    client_rate=getattr(settings, 'ADMISSION_CLIENT_RATE', 6.0),
+                    client_burst=getattr(settings, 'ADMISSION_CLIENT_BURST', 3),
+                    lease_seconds=getattr(settings, 'ADMISSION_LEASE_SECONDS', 900.0),
+                )
+    return _controller
+
+
+def acquire(request, endpoint: str, needs_slot: bool = True) -> Admission:
+    """Admit ``request`` or raise the 429/503 ``APIError``; returns a no-op admission when the feature is off"""
+    controller = get_admission_controller()
+    if controller is None:
+        return Admission(None, None, endpoint)
+    return controller.acquire(client_key(request), endpoint, needs_slot)
+
+
+async def aacquire(request, endpoint: str, needs_slot: bool = True) -> Admission:
+    controller = get_admission_controller()
+    if controller is None:
+        return Admission(None, None, endpoint)
+    return await controller.aacquire(client_key(request), endpoint, needs_slot)
+
+
+@contextmanager
+def admit(request, endpoint: str, needs_slot: bool = True) -> Iterator[Admission]:
+    """Hold an admission for the enclosed block"""
+    admission = acquire(request, endpoint, needs_slot)
+    try:
+        yield admission
+    finally:
+        admission.release()
+
+
+@asynccontextmanager
+async def aadmit(request, endpoint: str, needs_slot: bool = True) -> AsyncIterator[Admission]:
+    admission = await aacquire(request, endpoint, needs_slot)
+    try:
+        yield admission
+    finally:
+        await asyncio.to_thread(admission.release)
@@ -1,7 +1,19 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+def _configure_sqlite(sender, connection, **kwargs):
+    """WAL lets gunicorn workers read saved meetings while another one writes"""
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA synchronous=NORMAL')
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
     verbose_name = 'Meeting Assistant API'
+
+    def ready(self):
+        connection_created.connect(_configure_sqlite)
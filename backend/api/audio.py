@@ -0,0 +1,592 @@
+"""
+Audio helpers used before upload to Bhashini.
+"""
+import io
+import os
+import json
+import asyncio
+import base64
+import hashlib
+import logging
+import tempfile
+import uuid
+import wave
+import bisect
+from typing import AsyncIterator, BinaryIO, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+from pydub import AudioSegment
+from pydub.silence import detect_silence
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Read size for streamed base64 encoding; a multiple of 3 so blocks encode without padding
+STREAM_BLOCK_SIZE = 3 * 256 * 1024
+
+# Sample rate Bhashini ASR models are trained on
+ASR_SAMPLE_RATE = 16000
+
+# Frames decoded per step while normalizing WAV uploads
+NORMALIZE_BLOCK_FRAMES = 1 << 17
+
+# Analysis window for energy-based voice activity detection
+VAD_FRAME_MS = 30
+
+
+class AudioSource:
+    """
+    An uploaded recording, either spooled to a file on disk or held in memory.
+
+    Large uploads stay on disk and are only ever read in blocks, so the raw
+    audio is never copied into memory just to be base64 encoded.
+    """
+
+    def __init__(self, audio_format: str, path: Optional[str] = None, content: Optional[bytes] = None,
+                 owned: bool = False):
+        if (path is None) == (content is None):
+            raise ValueError("AudioSource needs exactly one of path or content")
+        self.format = audio_format
+        self.path = path
+        self.content = content
+        self.owned = owned
+
+    @classmethod
+    def from_upload(cls, uploaded_file, audio_format: str, spool_dir: Optional[str] = None) -> 'AudioSource':
+        """
+        Take ownership of a Django upload.
+
+        Files Django already spooled to disk are moved (not copied) into
+        ``spool_dir`` so they outlive the request; small in-memory uploads are
+        kept as bytes.
+        """
+        if hasattr(uploaded_file, 'temporary_file_path'):
+            from django.core.files.move import file_move_safe
+
+            spool_dir = spool_dir or tempfile.gettempdir()
+            os.makedirs(spool_dir, exist_ok=True)
+            target = os.path.join(spool_dir, f"audio-{uuid.uuid4().hex}.{audio_format}")
+            file_move_safe(uploaded_file.temporary_file_path(), target)
+            uploaded_file.close()
+            return cls(audio_format, path=target, owned=True)
+        return cls(audio_format, content=uploaded_file.read())
+
+    @property
+    def size(self) -> int:
+        if self.content is not None:
+            return len(self.content)
+        return os.path.getsize(self.path)
+
+    def open(self) -> BinaryIO:
+        if self.content is not None:
+            return io.BytesIO(self.content)
+        return open(self.path, 'rb')
+
+    def read_bytes(self) -> bytes:
+        if self.content is not None:
+            return self.content
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def base64_length(self) -> int:
+        return 4 * ((self.size + 2) // 3)
+
+    def iter_base64(self, block_size: int = STREAM_BLOCK_SIZE) -> Iterator[bytes]:
+        """Yield the base64 encoding of the audio block by block"""
+        encode_timer = metrics.StageTimer('base64_encode')
+        try:
+            with self.open() as f:
+                while True:
+                    block = f.read(block_size)
+                    if not block:
+                        break
+                    with encode_timer.section():
+                        encoded = base64.b64encode(block)
+                    yield encoded
+        finally:
+            encode_timer.observe()
+
+    def sha256(self) -> str:
+        """Hex SHA-256 of the raw audio, computed once and read block by block"""
+        if getattr(self, '_sha256', None) is None:
+            digest = hashlib.sha256()
+            with self.open() as f:
+                for block in iter(lambda: f.read(STREAM_BLOCK_SIZE), b''):
+                    digest.update(block)
+            self._sha256 = digest.hexdigest()
+        return self._sha256
+
+    def cleanup(self) -> None:
+        """Delete the spooled file if this source owns it"""
+        if self.owned and self.path:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            self.owned = False
+
+    def __enter__(self) -> 'AudioSource':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+        return False
+
+
+class StreamingJSONBody:
+    """
+    A JSON request body with one audio field filled in from an ``AudioSource``.
+
+    The payload is serialized once with a placeholder, and the base64 audio is
+    streamed between the two halves. ``__len__`` lets requests send a proper
+    Content-Length instead of chunked encoding. ``__aiter__`` serves async
+    clients, reading file blocks on a worker thread so the event loop is not
+    blocked on disk I/O.
+    """
+
+    PLACEHOLDER = "__streamed_audio_content__"
+
+    def __init__(self, payload: dict, audio: AudioSource, block_size: int = STREAM_BLOCK_SIZE):
+        encoded = json.dumps(payload).encode('utf-8')
+        marker = json.dumps(self.PLACEHOLDER).encode('utf-8')
+        if encoded.count(marker) != 1:
+            raise ValueError("Payload must contain the audio placeholder exactly once")
+        prefix, suffix = encoded.split(marker)
+        self.prefix = prefix + b'"'
+        self.suffix = b'"' + suffix
+        self.audio = audio
+        self.block_size = block_size
+
+    def __len__(self) -> int:
+        return len(self.prefix) + self.audio.base64_length() + len(self.suffix)
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield self.prefix
+        yield from self.audio.iter_base64(self.block_size)
+        yield self.suffix
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield self.prefix
+        encode_timer = metrics.StageTimer('base64_encode')
+        try:
+            with self.audio.open() as f:
+                while True:
+                    block = await asyncio.to_thread(f.read, self.block_size)
+                    if not block:
+                        break
+                    with encode_timer.section():
+                        encoded = base64.b64encode(block)
+                    yield encoded
+        finally:
+            encode_timer.observe()
+        yield self.suffix
+
+
+def probe_format(header: bytes) -> Optional[str]:
+    """Audio container recognised from the first bytes of a file, or None if it is not one we accept"""
+    if header[:4] == b'RIFF' and header[8:12] == b'WAVE':
+        return 'wav'
+    if header[:4] == b'fLaC':
+        return 'flac'
+    if header[:4] == b'OggS':
+        return 'ogg'
+    if header[4:8] == b'ftyp':
+        return 'm4a'
+    # ID3 tag, or a bare MPEG audio frame sync
+    if header[:3] == b'ID3' or (len(header) >= 2 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return 'mp3'
+    return None
+
+
+def load_audio(audio: Union[AudioSource, bytes], audio_format: Optional[str] = None) -> AudioSegment:
+    """Decode audio with pydub (non-WAV formats need ffmpeg)"""
+    if isinstance(audio, AudioSource):
+        if audio.path is not None:
+            return AudioSegment.from_file(audio.path, format=audio.format)
+        return AudioSegment.from_file(io.BytesIO(audio.content), format=audio.format)
+    return AudioSegment.from_file(io.BytesIO(audio), format=audio_format)
+
+
+def plan_chunks(segment: AudioSegment, max_chunk_ms: int, min_chunk_ms: int,
+                min_silence_ms: int = 500, silence_margin_db: float = 16.0,
+                seek_step_ms: int = 50) -> List[Tuple[int, int]]:
+    """
+    Split ``segment`` into ``(start_ms, end_ms)`` ranges of at most ``max_chunk_ms``.
+
+    Cuts are placed in the middle of the latest silence that keeps the chunk
+    between ``min_chunk_ms`` and ``max_chunk_ms`` long, so words are not cut in
+    half. Without a usable silence the chunk is cut hard at ``max_chunk_ms``.
+    """
+    total_ms = len(segment)
+    if total_ms <= max_chunk_ms:
+        return [(0, total_ms)]
+
+    # Silence is relative to the recording's own loudness
+    silence_thresh = segment.dBFS - silence_margin_db if segment.dBFS != float('-inf') else -60.0
+    silences = detect_silence(
+        segment,
+        min_silence_len=min_silence_ms,
+        silence_thresh=silence_thresh,
+        seek_step=seek_step_ms,
+    )
+    cut_points = [(start + end) // 2 for start, end in silences]
+
+    chunks = []
+    start = 0
+    candidate = 0
+    while total_ms - start > max_chunk_ms:
+        limit = start + max_chunk_ms
+        cut = None
+        while candidate < len(cut_points) and cut_points[candidate] <= limit:
+            if cut_points[candidate] >= start + min_chunk_ms:
+                cut = cut_points[candidate]
+            candidate += 1
+        if cut is None:
+            cut = limit
+        chunks.append((start, cut))
+        start = cut
+    chunks.append((start, total_ms))
+    return chunks
+
+
+def export_wav(segment: AudioSegment) -> bytes:
+    """Encode an AudioSegment as WAV bytes"""
+    buffer = io.BytesIO()
+    segment.export(buffer, format='wav')
+    return buffer.getvalue()
+
+
+def wav_params(audio: AudioSource) -> Optional[wave._wave_params]:
+    """Header parameters of a PCM WAV upload, or None if it is not one"""
+    try:
+        with audio.open() as f, wave.open(f, 'rb') as reader:
+            return reader.getparams()
+    except (wave.Error, EOFError):
+        return None
+
+
+def pcm_to_float(raw: bytes, sample_width: int, channels: int) -> np.ndarray:
+    """Decode interleaved PCM bytes into a ``(frames, channels)`` float array in [-1, 1)"""
+    if sample_width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float64) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(raw, dtype='<i2') / 32768.0
+    elif sample_width == 3:
+        # Widen 24-bit little-endian samples to int32 by placing them in the top three bytes
+        packed = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        widened = np.zeros((packed.shape[0], 4), dtype=np.uint8)
+        widened[:, 1:] = packed
+        samples = widened.view('<i4').ravel() / 2147483648.0
+    elif sample_width == 4:
+        samples = np.frombuffer(raw, dtype='<i4') / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported PCM sample width: {sample_width} bytes")
+    return samples.reshape(-1, channels)
+
+
+def lowpass_kernel(source_rate: int, target_rate: int, zero_crossings: int = 16) -> np.ndarray:
+    """Blackman-windowed sinc anti-aliasing filter for downsampling ``source_rate`` to ``target_rate``"""
+    if target_rate >= source_rate:
+        return np.ones(1)
+    ratio = target_rate / source_rate
+    # Cut off slightly below the new Nyquist frequency so the transition band does not alias
+    cutoff = 0.5 * ratio * 0.95
+    half = int(np.ceil(zero_crossings / ratio))
+    n = np.arange(-half, half + 1)
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.blackman(len(n))
+    return kernel / kernel.sum()
+
+
+def _convolve_valid(signal: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    """``np.convolve(signal, kernel, 'valid')`` computed with an FFT"""
+    if len(kernel) == 1:
+        return signal * kernel[0]
+    size = len(signal) + len(kernel) - 1
+    nfft = 1 << (size - 1).bit_length()
+    full = np.fft.irfft(np.fft.rfft(signal, nfft) * np.fft.rfft(kernel, nfft), nfft)
+    return full[len(kernel) - 1:len(signal)]
+
+
+class StreamingResampler:
+    """
+    Block-wise low-pass + linear-interpolation resampler for mono float samples.
+
+    Feeding a recording in blocks produces the same output as resampling it in
+    one go, so long uploads never have to be decoded into memory at once.
+    """
+
+    def __init__(self, source_rate: int, target_rate: int):
+        self.step = source_rate / target_rate
+        self.kernel = lowpass_kernel(source_rate, target_rate)
+        self.delay = (len(self.kernel) - 1) // 2
+        # Leading zeros centre the linear-phase filter on the input samples
+        self._pending = np.zeros(self.delay)
+        self._filtered = 0          # filtered samples produced so far
+        self._last: Optional[float] = None
+        self._emitted = 0           # output samples produced so far
+
+    def _interpolate(self, filtered: np.ndarray) -> np.ndarray:
+        start = self._filtered
+        self._filtered += len(filtered)
+        if self._last is not None:
+            filtered = np.concatenate(([self._last], filtered))
+            start -= 1
+        self._last = filtered[-1]
+        # Output sample k sits at input position k * step; emit those covered so far
+        stop = int(np.floor((self._filtered - 1) / self.step)) + 1
+        if stop <= self._emitted:
+            return np.zeros(0)
+        positions = np.arange(self._emitted, stop) * self.step
+        self._emitted = stop
+        return np.interp(positions, np.arange(start, start + len(filtered)), filtered)
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        buffer = np.concatenate((self._pending, samples))
+        if len(buffer) < len(self.kernel):
+            self._pending = buffer
+            return np.zeros(0)
+        self._pending = buffer[len(buffer) - len(self.kernel) + 1:]
+        return self._interpolate(_convolve_valid(buffer, self.kernel))
+
+    def flush(self) -> np.ndarray:
+        return self.process(np.zeros(self.delay)) if self.delay else np.zeros(0)
+
+
+def normalize_wav(audio: AudioSource, target_rate: int = ASR_SAMPLE_RATE,
+                  spool_dir: Optional[str] = None) -> Optional[AudioSource]:
+    """
+    Downmix a PCM WAV upload to mono and resample it to ``target_rate`` as 16-bit PCM.
+
+    Returns a new ``AudioSource`` (spooled to disk when the input was), or None
+    when the upload is not PCM WAV or is already mono 16-bit at ``target_rate``.
+    """
+    params = wav_params(audio)
+    if params is None or params.nframes == 0:
+        return None
+    if params.nchannels == 1 and params.sampwidth == 2 and params.framerate == target_rate:
+        return None
+
+    resampler = StreamingResampler(params.framerate, target_rate)
+    if audio.path is not None:
+        spool_dir = spool_dir or os.path.dirname(audio.path)
+        target = os.path.join(spool_dir, f"audio-{uuid.uuid4().hex}.wav")
+        output = open(target, 'wb')
+    else:
+        target = None
+        output = io.BytesIO()
+
+    def write(writer, samples: np.ndarray) -> None:
+        if len(samples):
+            pcm = np.clip(np.round(samples * 32768.0), -32768, 32767).astype('<i2')
+            writer.writeframes(pcm.tobytes())
+
+    try:
+        with audio.open() as f, wave.open(f, 'rb') as reader:
+            writer = wave.open(output, 'wb')
+            writer.setnchannels(1)
+            writer.setsampwidth(2)
+            writer.setframerate(target_rate)
+            while True:
+                raw = reader.readframes(NORMALIZE_BLOCK_FRAMES)
+                if not raw:
+                    break
+                frames = pcm_to_float(raw, params.sampwidth, params.nchannels)
+                write(writer, resampler.process(frames.mean(axis=1)))
+            write(writer, resampler.flush())
+            writer.close()
+    except Exception:
+        output.close()
+        if target is not None and os.path.exists(target):
+            os.remove(target)
+        raise
+
+    if target is not None:
+        output.close()
+        normalized = AudioSource('wav', path=target, owned=True)
+    else:
+        normalized = AudioSource('wav', content=output.getvalue())
+
+    logger.info(
+        f"Normalized WAV {params.framerate} Hz/{params.nchannels}ch/{8 * params.sampwidth}-bit "
+        f"-> {target_rate} Hz mono 16-bit ({audio.size} -> {normalized.size} bytes)"
+    )
+    return normalized
+
+
+class TimeMap:
+    """
+    Maps offsets in silence-trimmed audio back to the original recording.
+
+    ``spans`` are ``(trimmed_start_ms, original_start_ms, duration_ms)`` for
+    every kept stretch of audio, in order.
+    """
+
+    def __init__(self, spans: List[Tuple[int, int, int]], original_ms: int):
+        self.spans = spans
+        self.original_ms = original_ms
+        self._starts = [span[0] for span in spans]
+
+    @property
+    def trimmed_ms(self) -> int:
+        return sum(span[2] for span in self.spans)
+
+    @property
+    def trimmed_percent(self) -> float:
+        if not self.original_ms:
+            return 0.0
+        return round(100.0 * (self.original_ms - self.trimmed_ms) / self.original_ms, 1)
+
+    def to_original(self, trimmed_ms: int) -> int:
+        """Original-recording offset of a position in the trimmed audio"""
+        if not self.spans:
+            return trimmed_ms
+        index = max(0, bisect.bisect_right(self._starts, trimmed_ms) - 1)
+        trimmed_start, original_start, duration = self.spans[index]
+        return original_start + min(max(trimmed_ms - trimmed_start, 0), duration)
+
+    def to_list(self) -> List[dict]:
+        return [
+            {'trimmedStartMs': t, 'originalStartMs': o, 'durationMs': d}
+            for t, o, d in self.spans
+        ]
+
+
+def frame_energies_db(audio: AudioSource, frame_ms: int = VAD_FRAME_MS) -> Tuple[np.ndarray, int]:
+    """Per-frame RMS level (dBFS) of a PCM WAV upload, and the frame length in samples"""
+    with audio.open() as f, wave.open(f, 'rb') as reader:
+        params = reader.getparams()
+        frame_len = max(1, params.framerate * frame_ms // 1000)
+        block_frames = frame_len * max(1, NORMALIZE_BLOCK_FRAMES // frame_len)
+        levels = []
+        carry = np.zeros(0)
+        while True:
+            raw = reader.readframes(block_frames)
+            if not raw:
+                break
+            samples = np.concatenate((carry, pcm_to_float(raw, params.sampwidth, params.nchannels).mean(axis=1)))
+            usable = len(samples) - len(samples) % frame_len
+            carry = samples[usable:]
+            if usable:
+                power = np.mean(samples[:usable].reshape(-1, frame_len) ** 2, axis=1)
+                levels.append(power)
+        if len(carry):
+            levels.append(np.array([np.mean(carry ** 2)]))
+    power = np.concatenate(levels) if levels else np.zeros(0)
+    return 10 * np.log10(np.maximum(power, 1e-10)), frame_len
+
+
+def plan_voiced_spans(levels_db: np.ndarray, frame_ms: int, margin_db: float = 16.0,
+                      min_silence_ms: int = 1000, keep_silence_ms: int = 300) -> List[Tuple[int, int]]:
+    """
+    Frame ranges ``(start, end)`` to keep after compressing long silences.
+
+    A frame is silent when it is ``margin_db`` below the recording's overall
+    level. Silent runs of at least ``min_silence_ms`` shrink to
+    ``keep_silence_ms`` (split around the neighbouring speech); shorter pauses
+    are kept as they are. Returns an empty list if nothing is voiced.
+    """
+    if not len(levels_db):
+        return []
+    overall_db = 10 * np.log10(np.mean(10 ** (levels_db / 10)))
+    silent = levels_db < overall_db - margin_db
+    if silent.all():
+        return []
+
+    min_run = max(1, int(np.ceil(min_silence_ms / frame_ms)))
+    keep_each_side = int(keep_silence_ms / frame_ms) // 2
+
+    # Boundaries of silent runs: +1 where silence starts, -1 where it ends
+    edges = np.diff(np.concatenate(([0], silent.astype(np.int8), [0])))
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+
+    spans = []
+    position = 0
+    total = len(levels_db)
+    for start, end in zip(run_starts, run_ends):
+        if end - start < min_run:
+            continue
+        drop_start = start + keep_each_side if start > 0 else 0
+        drop_end = end - keep_each_side if end < total else total
+        if drop_end <= drop_start:
+            continue
+        if drop_start > position:
+            spans.append((position, drop_start))
+        position = drop_end
+    if position < total:
+        spans.append((position, total))
+    return spans
+
+
+def trim_silence(audio: AudioSource, margin_db: float = 16.0, min_silence_ms: int = 1000,
+                 keep_silence_ms: int = 300, frame_ms: int = VAD_FRAME_MS,
+                 spool_dir: Optional[str] = None) -> Optional[Tuple[AudioSource, TimeMap]]:
+    """
+    Drop long silences from a PCM WAV upload using frame energy.
+
+    Kept stretches are copied byte for byte, so the output has the input's
+    format. Returns the trimmed audio and its ``TimeMap``, or None when the
+    upload is not PCM WAV, is all silence, or has nothing worth trimming.
+    """
+    params = wav_params(audio)
+    if params is None or params.nframes == 0:
+        return None
+
+    levels_db, frame_len = frame_energies_db(audio, frame_ms)
+    frame_spans = plan_voiced_spans(levels_db, frame_ms, margin_db, min_silence_ms, keep_silence_ms)
+    if not frame_spans or frame_spans == [(0, len(levels_db))]:
+        return None
+
+    def to_ms(sample: int) -> int:
+        return int(round(1000 * sample / params.framerate))
+
+    spans = []
+    trimmed_samples = 0
+    sample_spans = []
+    for start, end in frame_spans:
+        first, last = start * frame_len, min(end * frame_len, params.nframes)
+        sample_spans.append((first, last))
+        spans.append((to_ms(trimmed_samples), to_ms(first), to_ms(last - first)))
+        trimmed_samples += last - first
+    time_map = TimeMap(spans, to_ms(params.nframes))
+
+    if audio.path is not None:
+        spool_dir = spool_dir or os.path.dirname(audio.path)
+        target = os.path.join(spool_dir, f"audio-{uuid.uuid4().hex}.wav")
+        output = open(target, 'wb')
+    else:
+        target = None
+        output = io.BytesIO()
+
+    try:
+        with audio.open() as f, wave.open(f, 'rb') as reader:
+            writer = wave.open(output, 'wb')
+            writer.setparams(params)
+            for first, last in sample_spans:
+                reader.setpos(first)
+                remaining = last - first
+                while remaining > 0:
+                    raw = reader.readframes(min(remaining, NORMALIZE_BLOCK_FRAMES))
+                    if not raw:
+                        break
+                    writer.writeframes(raw)
+                    remaining -= len(raw) // (params.sampwidth * params.nchannels)
+            writer.close()
+    except Exception:
+        output.close()
+        if target is not None and os.path.exists(target):
+            os.remove(target)
+        raise
+
+    if target is not None:
+        output.close()
+        trimmed = AudioSource(audio.format, path=target, owned=True)
+    else:
+        trimmed = AudioSource(audio.format, content=output.getvalue())
+
+    logger.info(
+        f"Trimmed silence: {time_map.original_ms / 1000:.1f}s -> {time_map.trimmed_ms / 1000:.1f}s "
+        f"({time_map.trimmed_percent}% removed, {len(spans)} spans)"
+    )
+    return trimmed, time_map
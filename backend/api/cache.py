@@ -0,0 +1,278 @@
+"""
+Caching primitives shared by the service layer.
+"""
+import json
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from . import metrics
+from .storage import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class _Flight:
+    """A load in progress that concurrent callers can wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with per-entry expiry and single-flight loading.
+
+    A ``name`` reports ``get_or_load`` hits and misses to the metrics endpoint.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 3600.0, name: Optional[str] = None):
+        self.name = name
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = float(ttl)
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_locked(self, key: Hashable) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def _set_locked(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a live cached value or ``default``"""
+        with self._lock:
+            value = self._get_locked(key)
+        return default if value is _MISSING else value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full"""
+        with self._lock:
+            self._set_locked(key, value)
+
+    def invalidate(self, key: Hashable, expected: Any = _MISSING) -> bool:
+        """
+        Drop a cached entry.
+
+        When ``expected`` is given the entry is only dropped if it is still that
+        exact object, so many callers reacting to the same stale value trigger a
+        single reload instead of one each.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False
+            if expected is not _MISSING and entry[1] is not expected:
+                return False
+            del self._data[key]
+            return True
+
+    def clear(self) -> None:
+        """Drop every cached entry"""
+        with self._lock:
+            self._data.clear()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for ``key`` or compute it with ``loader``.
+
+        Concurrent misses for the same key are coalesced: the first caller runs
+        the loader while the others wait for its result. Loader errors are
+        propagated to every waiter and nothing is cached.
+        """
+        with self._lock:
+            value = self._get_locked(key)
+            if value is not _MISSING:
+                self.hits += 1
+                if self.name:
+                    metrics.record_cache(self.name, True)
+                return value
+            self.misses += 1
+            if self.name:
+                metrics.record_cache(self.name, False)
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+            with self._lock:
+                self._set_locked(key, flight.value)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss counters"""
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+class ResultCache(SQLiteStore):
+    """
+    Persistent, size-bounded LRU cache of JSON values with expiry.
+
+    Entries live in a SQLite file shared by all worker processes. Values are
+    grouped by namespace so different pipeline stages can share one store.
+    """
+
+    schema = """
+    CREATE TABLE IF NOT EXISTS cache_entries (
+        namespace TEXT NOT NULL,
+        key TEXT NOT NULL,
+        value TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        expires_at REAL NOT NULL,
+        accessed_at REAL NOT NULL,
+        PRIMARY KEY (namespace, key)
+    );
+    CREATE INDEX IF NOT EXISTS cache_entries_accessed_at ON cache_entries (accessed_at);
+    """
+
+    def __init__(self, path, max_bytes: int = 256 * 1024 * 1024, ttl: float = 7 * 24 * 60 * 60):
+        super().__init__(path)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+    def get(self, namespace: str, key: str) -> Any:
+        """Return the cached value or None; touching an entry makes it most recently used"""
+        try:
+            value = self._get(namespace, key)
+        except sqlite3.Error as e:
+            # A broken cache must never fail the request it was meant to speed up
+            logger.warning(f"Result cache read failed: {str(e)}")
+            value = None
+        metrics.record_cache(namespace, value is not None)
+        return value
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value and evict least recently used entries beyond ``max_bytes``"""
+        try:
+            self._set(namespace, key, value, ttl)
+        except sqlite3.Error as e:
+            logger.warning(f"Result cache write failed: {str(e)}")
+
+    def _get(self, namespace: str, key: str) -> Any:
+        now = time.time()
+        conn = self.connect()
+        row = conn.execute(
+            "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+            (namespace, key)
+        ).fetchone()
+        if row is None:
+            return None
+        if row['expires_at'] <= now:
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+            return None
+        conn.execute(
+            "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+            (now, namespace, key)
+        )
+        return json.loads(row['value'])
+
+    def _set(self, namespace: str, key: str, value: Any, ttl: Optional[float]) -> None:
+        encoded = json.dumps(value)
+        size = len(encoded)
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (namespace, key, encoded, size, now + (ttl if ttl is not None else self.ttl), now)
+            )
+            conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                victims = []
+                for row in conn.execute("SELECT namespace, key, size FROM cache_entries ORDER BY accessed_at"):
+                    if excess <= 0:
+                        break
+                    victims.append((row['namespace'], row['key']))
+                    excess -= row['size']
+                conn.executemany("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", victims)
+
+    def delete(self, namespace: str, key: str) -> None:
+        self.connect().execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def stats(self) -> Dict[str, Any]:
+        row = self.connect().execute(
+            "SELECT COUNT(*) AS entries, COALESCE(SUM(size), 0) AS bytes FROM cache_entries"
+        ).fetchone()
+        return {'entries': row['entries'], 'bytes': row['bytes'], 'maxBytes': self.max_bytes, 'ttl': self.ttl}
+
+
+def content_key(*parts: Any) -> str:
+    """Stable SHA-256 key over strings/bytes parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = str(part).encode('utf-8')
+        digest.update(len(part).to_bytes(8, 'big'))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Get or create the persistent result cache, or None when disabled"""
+    global _result_cache
+    from django.conf import settings
+
+    if not getattr(settings, 'RESULT_CACHE_ENABLED', True):
+        return None
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = ResultCache(
+                    settings.RESULT_CACHE_PATH,
+                    max_bytes=getattr(settings, 'RESULT_CACHE_MAX_BYTES', 256 * 1024 * 1024),
+                    ttl=getattr(settings, 'RESULT_CACHE_TTL', 7 * 24 * 60 * 60),
+                )
+    return _result_cache
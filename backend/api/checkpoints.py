@@ -0,0 +1,226 @@
+"""
+Stage checkpoints for retried requests.
+
+A request sent with an ``Idempotency-Key`` header saves the output of every
+stage it finishes (pipeline config, transcription, extra translations,
+analysis). When Gemini fails after a long Bhashini compute, a retry with the
+same key and the same upload finds those outputs and resumes after the last
+stage that succeeded instead of running ASR again.
+
+While a request runs it holds a claim on its key, renewed with every stage
+it saves, so a retry sent while the first attempt is still running gets a
+409 with ``Retry-After`` instead of running the same stages a second time.
+A claim left by a worker that died lapses after ``claim_ttl``.
+
+Checkpoints live in a SQLite file shared by all worker processes. A
+request's stages expire together, ``ttl`` after its latest checkpoint, and
+beyond ``max_bytes`` the requests checkpointed longest ago are dropped whole.
+"""
+import json
+import math
+import time
+import uuid
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+from . import metrics
+from .cache import content_key
+from .storage import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+# Longest Retry-After suggested to a request whose key is claimed; the claim usually ends well before it lapses
+CLAIM_RETRY_AFTER = 10
+
+
+class CheckpointStore(SQLiteStore):
+    """Stage outputs keyed by request, bounded by TTL and total size"""
+
+    schema = """
+    CREATE TABLE IF NOT EXISTS checkpoints (
+        request_key TEXT NOT NULL,
+        stage TEXT NOT NULL,
+        value TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        expires_at REAL NOT NULL,
+        PRIMARY KEY (request_key, stage)
+    );
+    CREATE INDEX IF NOT EXISTS checkpoints_expires_at ON checkpoints (expires_at);
+    CREATE TABLE IF NOT EXISTS claims (
+        request_key TEXT PRIMARY KEY,
+        owner TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    );
+    """
+
+    def __init__(self, path, max_bytes: int = 64 * 1024 * 1024, ttl: float = 60 * 60,
+                 claim_ttl: float = 5 * 60):
+        super().__init__(path)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.claim_ttl = claim_ttl
+
+    def claim(self, request_key: str, owner: str) -> float:
+        """Mark a request in flight for ``owner``; returns 0, or the seconds until another owner's claim lapses"""
+        now = time.time()
+        with self.transaction() as conn:
+            row = conn.execute("SELECT owner, expires_at FROM claims WHERE request_key = ?", (request_key,)).fetchone()
+            if row is not None and row['owner'] != owner and row['expires_at'] > now:
+                return row['expires_at'] - now
+            conn.execute("INSERT OR REPLACE INTO claims (request_key, owner, expires_at) VALUES (?, ?, ?)",
+                         (request_key, owner, now + self.claim_ttl))
+            conn.execute("DELETE FROM claims WHERE expires_at <= ?", (now,))
+        return 0.0
+
+    def release(self, request_key: str, owner: str) -> None:
+        try:
+            self.connect().execute("DELETE FROM claims WHERE request_key = ? AND owner = ?", (request_key, owner))
+        except sqlite3.Error as e:
+            # The claim lapses on its own
+            logger.warning(f"Checkpoint claim release failed: {str(e)}")
+
+    def load(self, request_key: str) -> Dict[str, Any]:
+        """The live stages of a request; a broken store reads as empty"""
+        try:
+            rows = self.connect().execute(
+                "SELECT stage, value FROM checkpoints WHERE request_key = ? AND expires_at > ?",
+                (request_key, time.time())
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Checkpoint read failed: {str(e)}")
+            return {}
+        return {row['stage']: json.loads(row['value']) for row in rows}
+
+    def save(self, request_key: str, stage: str, value: Any) -> None:
+        """Store one stage's output, renewing the request's expiry and evicting the oldest requests if full"""
+        try:
+            self._save(request_key, stage, value)
+        except sqlite3.Error as e:
+            # Losing a checkpoint only costs a retry the work it would have skipped
+            logger.warning(f"Checkpoint write failed: {str(e)}")
+
+    def _save(self, request_key: str, stage: str, value: Any) -> None:
+        encoded = json.dumps(value)
+        size = len(encoded)
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (request_key, stage, value, size, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (request_key, stage, encoded, size, now + self.ttl)
+            )
+            conn.execute("UPDATE checkpoints SET expires_at = ? WHERE request_key = ?", (now + self.ttl, request_key))
+            conn.execute("UPDATE claims SET expires_at = ? WHERE request_key = ?", (now + self.claim_ttl, request_key))
+            conn.execute("DELETE FROM checkpoints WHERE expires_at <= ?", (now,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM checkpoints").fetchone()[0]
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                victims = []
+                for row in conn.execute(
+                    "SELECT request_key, SUM(size) AS size FROM checkpoints WHERE request_key != ? "
+                    "GROUP BY request_key ORDER BY MAX(expires_at)", (request_key,)
+                ):
+                    if excess <= 0:
+                        break
+                    victims.append((row['request_key'],))
+                    excess -= row['size']
+                conn.executemany("DELETE FROM checkpoints WHERE request_key = ?", victims)
+
+    def stats(self) -> Dict[str, Any]:
+        row = self.connect().execute(
+            "SELECT COUNT(DISTINCT request_key) AS requests, COALESCE(SUM(size), 0) AS bytes FROM checkpoints"
+        ).fetchone()
+        return {'requests': row['requests'], 'bytes': row['bytes'], 'maxBytes': self.max_bytes, 'ttl': self.ttl}
+
+
+class Checkpoint:
+    """
+    The checkpointed stages of one request.
+
+    ``get`` returns a stage saved by an earlier attempt (recording it in
+    ``resumed``); ``save`` persists a stage as soon as it is finished.
+    ``release`` ends the request's claim on its key.
+    """
+
+    def __init__(self, store: CheckpointStore, request_key: str, owner: str = ''):
+        self.store = store
+        self.request_key = request_key
+        self.owner = owner
+        self.stages = store.load(request_key)
+        self.resumed: List[str] = []
+
+    def get(self, stage: str) -> Any:
+        value = self.stages.get(stage)
+        if value is not None and stage not in self.resumed:
+            self.resumed.append(stage)
+        return value
+
+    def save(self, stage: str, value: Any) -> None:
+        if self.stages.get(stage) == value:
+            return
+        self.stages[stage] = value
+        self.store.save(self.request_key, stage, value)
+
+    def release(self) -> None:
+        if self.owner:
+            self.store.release(self.request_key, self.owner)
+            self.owner = ''
+
+
+def open_checkpoint(idempotency_key: str, *request_parts: Any) -> Optional[Checkpoint]:
+    """
+    The checkpoint of a request sent with an ``Idempotency-Key``, or None
+    without a key or when checkpoints are disabled. ``request_parts`` (client,
+    audio hash, languages, notes) scope the key, so reusing it for a
+    different request starts from scratch.
+
+    The caller must ``release`` the checkpoint when the request ends. Raises
+    a 409 ``APIError`` while another request with the same key is running.
+    """
+    from .services import APIError
+
+    store = get_checkpoint_store()
+    if not idempotency_key or store is None:
+        return None
+    request_key = content_key(idempotency_key, *request_parts)
+    owner = uuid.uuid4().hex
+    try:
+        wait = store.claim(request_key, owner)
+    except sqlite3.Error as e:
+        # Without the claim a concurrent retry may repeat stages, which only costs work
+        logger.warning(f"Checkpoint claim failed: {str(e)}")
+        owner, wait = '', 0.0
+    if wait:
+        raise APIError("A request with this Idempotency-Key is still in progress; retry once it has finished",
+                       409, "checkpoints", retry_after=min(math.ceil(wait), CLAIM_RETRY_AFTER))
+    checkpoint = Checkpoint(store, request_key, owner)
+    metrics.record_cache('checkpoint', bool(checkpoint.stages))
+    if checkpoint.stages:
+        logger.info(f"Resuming request from checkpointed stages: {', '.join(checkpoint.stages)}")
+    return checkpoint
+
+
+_checkpoint_store = None
+_checkpoint_store_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> Optional[CheckpointStore]:
+    """Get or create the checkpoint store, or None when disabled"""
+    global _checkpoint_store
+    from django.conf import settings
+
+    if not getattr(settings, 'CHECKPOINTS_ENABLED', True):
+        return None
+    if _checkpoint_store is None:
+        with _checkpoint_store_lock:
+            if _checkpoint_store is None:
+                _checkpoint_store = CheckpointStore(
+                    settings.CHECKPOINT_STORE_PATH,
+                    max_bytes=getattr(settings, 'CHECKPOINT_MAX_BYTES', 64 * 1024 * 1024),
+                    ttl=getattr(settings, 'CHECKPOINT_TTL_SECONDS', 60 * 60),
+                    claim_ttl=getattr(settings, 'CHECKPOINT_CLAIM_SECONDS', 5 * 60),
+                )
+    return _checkpoint_store
@@ -0,0 +1,82 @@
+"""
+Per-request deadlines.
+
+A synchronous request has to answer before gunicorn kills its worker, but the
+upstream calls behind it have fixed ceilings of their own (30s config, 120s
+compute, 60s Gemini) that together run well past that. The view opens a
+``budget`` instead, and ``Upstream.call`` gives every attempt only what is
+left of it: timeouts shrink, retries that would not fit are skipped, and a
+call with no time left fails fast with a 504 ``APIError``.
+
+The deadline lives in a context variable like the current trace span, so it
+follows asyncio tasks, ``asyncio.to_thread`` and pool work wrapped with
+``tracing.bind``. Background jobs run ``detached`` from the request that
+queued them.
+"""
+import time
+import contextvars
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+from . import tracing
+
+# Below this an upstream call cannot usefully start
+MIN_CALL_SECONDS = 0.5
+
+_deadline: contextvars.ContextVar = tracing.propagate(contextvars.ContextVar('request_deadline', default=None))
+
+
+@contextmanager
+def budget(seconds: Optional[float]) -> Iterator[None]:
+    """Run the block under a deadline ``seconds`` from now (never later than an enclosing one); None or 0 adds none"""
+    deadline = _deadline.get()
+    if seconds:
+        expires = time.monotonic() + seconds
+        deadline = expires if deadline is None else min(deadline, expires)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def detached() -> Iterator[None]:
+    """Run the block without the caller's deadline, e.g. a background job queued by a request"""
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None without one"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def expires_within(seconds: float) -> bool:
+    """True when the deadline leaves no useful call after waiting ``seconds``"""
+    left = remaining()
+    return left is not None and left - seconds < MIN_CALL_SECONDS
+
+
+def exceeded(service: str, endpoint: str):
+    from .services import APIError
+
+    return APIError(f"Request deadline exceeded before {service} {endpoint} could finish", 504, service)
+
+
+def clamp(timeout: float, service: str, endpoint: str) -> Tuple[float, bool]:
+    """
+    Cap an upstream timeout at the time left; returns (timeout, capped).
+
+    Raises a 504 ``APIError`` when there is no time left for the call.
+    """
+    left = remaining()
+    if left is None or left >= timeout:
+        return timeout, False
+    if left < MIN_CALL_SECONDS:
+        raise exceeded(service, endpoint)
+    return left, True
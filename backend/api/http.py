@@ -0,0 +1,225 @@
+"""
+Pooled HTTP clients for upstream services.
+
+Each service singleton owns one HTTPClient so config, compute and
+generateContent calls reuse kept-alive TCP+TLS connections instead of paying
+for a fresh handshake on every request. AsyncHTTPClient is the equivalent for
+async views served under ASGI.
+"""
+import os
+import socket
+import asyncio
+import weakref
+import threading
+import logging
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _keepalive_socket_options() -> list:
+    """TCP keep-alive options so idle pooled connections are not silently dropped by NAT/LBs"""
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    for name, value in (('TCP_KEEPIDLE', 60), ('TCP_KEEPINTVL', 15), ('TCP_KEEPCNT', 4)):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter with TCP keep-alive enabled on pooled sockets"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs.setdefault('socket_options', _keepalive_socket_options())
+        return super().init_poolmanager(*args, **kwargs)
+
+
+class HTTPClient:
+    """
+    Thread-safe wrapper around a pooled ``requests.Session``.
+
+    Connection pools are sized per host: ``host_pool_sizes`` maps a base URL
+    (scheme + host) to its maximum number of pooled connections, everything
+    else uses ``default_pool_size``. The session is rebuilt lazily after a fork
+    so gunicorn workers never share sockets with their parent.
+
+    requests/urllib3 only speak HTTP/1.1, so reuse comes from keep-alive rather
+    than HTTP/2 multiplexing.
+    """
+
+    def __init__(self, name: str, host_pool_sizes: Optional[Dict[str, int]] = None,
+                 default_pool_size: int = 10, pool_block: bool = False):
+        self.name = name
+        self.host_pool_sizes = {
+            self._origin(url): size for url, size in (host_pool_sizes or {}).items()
+        }
+        self.default_pool_size = default_pool_size
+        self.pool_block = pool_block
+        self._lock = threading.Lock()
+        self._session: Optional[requests.Session] = None
+        self._pid: Optional[int] = None
+        self.request_count = 0
+
+    @staticmethod
+    def _origin(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def _build_session(self) -> requests.Session:
+        session = requests.Session()
+        default_adapter = KeepAliveAdapter(
+            pool_connections=max(4, len(self.host_pool_sizes)),
+            pool_maxsize=self.default_pool_size,
+            pool_block=self.pool_block,
+            max_retries=0,
+        )
+        session.mount('https://', default_adapter)
+        session.mount('http://', default_adapter)
+        for origin, size in self.host_pool_sizes.items():
+            session.mount(origin, KeepAliveAdapter(
+                pool_connections=1,
+                pool_maxsize=size,
+                pool_block=self.pool_block,
+                max_retries=0,
+            ))
+        logger.info(f"Created pooled HTTP session '{self.name}' (per-host pools: {self.host_pool_sizes or 'default'})")
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+        pid = os.getpid()
+        if self._session is None or self._pid != pid:
+            with self._lock:
+                if self._session is None or self._pid != pid:
+                    self._session = self._build_session()
+                    self._pid = pid
+        return self._session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        self.request_count += 1
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            metrics.record_upstream(self.name, 'error')
+            raise
+        metrics.record_upstream(self.name, response.status_code)
+        return response
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+            self._pid = None
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Return per-host connection pool counters"""
+        stats: Dict[str, Any] = {'requests': self.request_count, 'pools': {}}
+        session = self._session
+        if session is None or self._pid != os.getpid():
+            return stats
+
+        seen = set()
+        for adapter in session.adapters.values():
+            if id(adapter) in seen:
+                continue
+            seen.add(id(adapter))
+            manager = adapter.poolmanager
+            for key in list(manager.pools.keys()):
+                pool = manager.pools.get(key)
+                if pool is None:
+                    continue
+                host = f"{pool.scheme}://{pool.host}:{pool.port}"
+                stats['pools'][host] = {
+                    'maxsize': pool.pool.maxsize if pool.pool is not None else 0,
+                    'idle': pool.pool.qsize() if pool.pool is not None else 0,
+                    'connectionsOpened': pool.num_connections,
+                    'requests': pool.num_requests,
+                }
+        return stats
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class AsyncHTTPClient:
+    """
+    Pooled ``httpx.AsyncClient`` for async views.
+
+    httpx clients are bound to the event loop that created them, so one client
+    is kept per running loop (normally exactly one per ASGI worker). HTTP/2 is
+    negotiated when the optional ``h2`` package is installed, letting many
+    concurrent requests to one host share a single connection.
+    """
+
+    def __init__(self, name: str, max_connections: int = 200, max_keepalive_connections: Optional[int] = None,
+                 keepalive_expiry: float = 60.0):
+        self.name = name
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections if max_keepalive_connections is not None else max_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = _http2_available()
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+        self.request_count = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(limits=self.limits, http2=self.http2)
+            self._clients[loop] = client
+            logger.info(f"Created async HTTP client '{self.name}' (http2: {self.http2})")
+        return client
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        self.request_count += 1
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            metrics.record_upstream(self.name, 'error')
+            raise
+        metrics.record_upstream(self.name, response.status_code)
+        return response
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('POST', url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('GET', url, **kwargs)
+
+    async def aclose(self) -> None:
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return {
+            'requests': self.request_count,
+            'http2': self.http2,
+            'maxConnections': self.limits.max_connections,
+            'clients': len(self._clients),
+        }
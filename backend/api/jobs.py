@@ -0,0 +1,243 @@
+"""
+Background job mode for audio processing.
+
+Submitting a job returns immediately; a bounded thread pool in the worker
+process runs the pipeline while status, per-stage progress and results are
+written to a SQLite job store that every worker (and restarted workers) can
+read.
+"""
+import json
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable, List
+
+from django.conf import settings
+
+from . import deadlines, metrics, tracing
+from .services import APIError
+from .storage import SQLiteStore, process_alive, process_identity
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+
+ACTIVE_STATES = (JOB_QUEUED, JOB_RUNNING)
+
+
+INTERRUPTED_ERROR = {
+    'message': 'Job was interrupted by a worker restart; please resubmit',
+    'service': 'jobs',
+    'statusCode': 500,
+}
+
+
+class JobStore(SQLiteStore):
+    """SQLite-backed job records shared by all worker processes"""
+
+    schema = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        status TEXT NOT NULL,
+        worker TEXT,
+        params TEXT NOT NULL,
+        stages TEXT NOT NULL,
+        result TEXT,
+        error TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS jobs_updated_at ON jobs (updated_at);
+    CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+    """
+
+    def create(self, kind: str, params: Dict[str, Any], stages: List[str]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        stage_state = {stage: {'status': 'pending'} for stage in stages}
+        self.connect().execute(
+            "INSERT INTO jobs (id, kind, status, worker, params, stages, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, JOB_QUEUED, process_identity(), json.dumps(params), json.dumps(stage_state), now, now)
+        )
+        return job_id
+
+    def update_stage(self, job_id: str, stage: str, status: str) -> None:
+        now = time.time()
+        with self.transaction() as conn:
+            row = conn.execute("SELECT stages FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            stages = json.loads(row['stages'])
+            entry = stages.setdefault(stage, {})
+            entry['status'] = status
+            entry['startedAt' if status == 'running' else 'finishedAt'] = now
+            conn.execute(
+                "UPDATE jobs SET status = ?, stages = ?, updated_at = ? WHERE id = ?",
+                (JOB_RUNNING, json.dumps(stages), now, job_id)
+            )
+
+    def finish(self, job_id: str, result: Optional[Dict[str, Any]] = None,
+               error: Optional[Dict[str, Any]] = None) -> None:
+        now = time.time()
+        with self.transaction() as conn:
+            row = conn.execute("SELECT stages FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            stages = json.loads(row['stages'])
+            if error is not None:
+                for entry in stages.values():
+                    if entry.get('status') == 'running':
+                        entry['status'] = 'failed'
+                        entry['finishedAt'] = now
+            conn.execute(
+                "UPDATE jobs SET status = ?, stages = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                (
+                    JOB_FAILED if error is not None else JOB_COMPLETED,
+                    json.dumps(stages),
+                    json.dumps(result) if result is not None else None,
+                    json.dumps(error) if error is not None else None,
+                    now,
+                    job_id,
+                )
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self.connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+
+        # A job whose owning worker died (restart, OOM kill) will never finish
+        if row['status'] in ACTIVE_STATES and not process_alive(row['worker']):
+            self.finish(job_id, error=INTERRUPTED_ERROR)
+            row = self.connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+        stages = json.loads(row['stages'])
+        done = sum(1 for entry in stages.values() if entry.get('status') == 'completed')
+        return {
+            'id': row['id'],
+            'kind': row['kind'],
+            'status': row['status'],
+            'progress': round(done / len(stages), 2) if stages else 0.0,
+            'stages': stages,
+            'params': json.loads(row['params']),
+            'result': json.loads(row['result']) if row['result'] else None,
+            'error': json.loads(row['error']) if row['error'] else None,
+            'createdAt': row['created_at'],
+            'updatedAt': row['updated_at'],
+        }
+
+    def sweep(self) -> int:
+        """Fail queued and running jobs whose worker is gone, e.g. after a restart; returns how many"""
+        rows = self.connect().execute(
+            "SELECT id, worker FROM jobs WHERE status IN (?, ?)", ACTIVE_STATES
+        ).fetchall()
+        orphaned = [row['id'] for row in rows if not process_alive(row['worker'])]
+        for job_id in orphaned:
+            self.finish(job_id, error=INTERRUPTED_ERROR)
+        if orphaned:
+            logger.info(f"Failed {len(orphaned)} jobs left behind by workers that are gone")
+        return len(orphaned)
+
+    def prune(self, older_than: float) -> int:
+        """Delete finished jobs last updated more than ``older_than`` seconds ago"""
+        cutoff = time.time() - older_than
+        cursor = self.connect().execute(
+            "DELETE FROM jobs WHERE updated_at < ? AND status IN (?, ?)",
+            (cutoff, JOB_COMPLETED, JOB_FAILED)
+        )
+        return cursor.rowcount
+
+
+class JobRunner:
+    """Bounded local worker pool that runs jobs and records their outcome"""
+
+    def __init__(self, store: JobStore, max_workers: int = 2, max_pending: int = 8):
+        self.store = store
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def submit(self, kind: str, params: Dict[str, Any], stages: List[str],
+               func: Callable[[Callable[[str, str], None]], Dict[str, Any]]) -> str:
+        """
+        Queue ``func(on_stage)`` as a job and return its id.
+
+        ``params`` is stored for display only; ``func`` closes over the actual inputs.
+        Raises ``APIError`` (503) when the queue is full.
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_pending:
+                raise APIError("Job queue is full, please retry later", 503, "jobs")
+            self._pending += 1
+
+        job_id = self.store.create(kind, params, stages)
+        try:
+            # The job continues the submitting request's trace
+            self._executor.submit(tracing.bind(self._run), job_id, kind, func)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        logger.info(f"Queued {kind} job {job_id}")
+        return job_id
+
+    def _run(self, job_id: str, kind: str, func: Callable) -> None:
+        start = time.time()
+        try:
+            # Jobs exist to outlive the request's deadline
+            with deadlines.detached(), tracing.span(f"job {kind}", {'job.id': job_id}):
+                result = func(lambda stage, status: self.store.update_stage(job_id, stage, status))
+            self.store.finish(job_id, result=result)
+            logger.info(f"Job {job_id} completed in {time.time() - start:.2f}s")
+        except APIError as e:
+            logger.error(f"Job {job_id} failed: {e.message}")
+            metrics.record_api_error(e)
+            self.store.finish(job_id, error={'message': e.message, 'service': e.service, 'statusCode': e.status_code})
+        except Exception as e:
+            logger.error(f"Job {job_id} crashed: {str(e)}")
+            metrics.record_api_error(APIError(str(e), 500, "server"))
+            self.store.finish(job_id, error={'message': f"Internal server error: {str(e)}", 'service': 'server', 'statusCode': 500})
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+
+_job_store = None
+_job_runner = None
+_job_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    """Get or create the job store"""
+    global _job_store
+    if _job_store is None:
+        with _job_lock:
+            if _job_store is None:
+                _job_store = JobStore(settings.JOB_STORE_PATH)
+                _job_store.prune(getattr(settings, 'JOB_RETENTION_SECONDS', 24 * 60 * 60))
+                _job_store.sweep()
+    return _job_store
+
+
+def get_job_runner() -> JobRunner:
+    """Get or create this process's job runner"""
+    global _job_runner
+    if _job_runner is None:
+        store = get_job_store()
+        with _job_lock:
+            if _job_runner is None:
+                _job_runner = JobRunner(
+                    store,
+                    max_workers=getattr(settings, 'JOB_WORKERS', 2),
+                    max_pending=getattr(settings, 'JOB_QUEUE_SIZE', 8),
+                )
+    return _job_runner
@@ -0,0 +1,236 @@
+"""
+Off-thread, redacting log output.
+
+``AsyncLogHandler`` is the handler behind the console logger: request threads
+only put records on a bounded queue, and a ``QueueListener`` thread formats
+and writes them. Messages are formatted on that thread too, so
+``logger.info("...: %s", payload(result))`` costs the request a queue put;
+the payload is serialized later, compactly and cut off at
+``LOG_PAYLOAD_MAX_CHARS``, with credential fields masked. Informational
+records that carry a payload are sampled (``LOG_PAYLOAD_SAMPLE_RATE``);
+warnings and errors are always written. Formatted lines are scrubbed of
+configured secrets, ``key=`` query parameters and bearer tokens.
+
+Records are formatted after the call returns, so objects handed to
+``payload`` must not be mutated afterwards.
+"""
+import os
+import re
+import json
+import queue
+import atexit
+import random
+import logging
+import logging.handlers
+from typing import Any, List, Optional
+
+from . import tracing
+
+REDACTED = '[REDACTED]'
+
+# Environment variables holding credentials; their values never reach the log
+SECRET_ENV_VARS = (
+    'BHASHINI_USER_ID', 'ULCA_API_KEY', 'BHASHINI_API_KEY', 'BHASHINI_AUTH_TOKEN', 'GEMINI_API_KEY',
+    'DJANGO_SECRET_KEY', 'DJANGO_SUPERUSER_PASSWORD',
+)
+
+# Payload fields masked wherever they appear (matched on the lowercased key)
+SECRET_FIELD = re.compile(r'(api_?key|token|secret|password|authorization|userid)$')
+
+SECRET_PATTERNS = (
+    re.compile(r'(?i)([?&](?:key|api_?key|token)=)[^&\s"\']+'),
+    re.compile(r'(?i)(bearer\s+)[\w.~+/=-]+'),
+)
+
+_payload_max_chars = 2000
+
+
+class _Full(Exception):
+    pass
+
+
+class Payload:
+    """A value to log as compact, redacted, size-capped JSON, serialized only when the record is written"""
+
+    __slots__ = ('value', 'max_chars')
+
+    def __init__(self, value: Any, max_chars: Optional[int] = None):
+        self.value = value
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        return dump(self.value, self.max_chars or _payload_max_chars)
+
+
+def payload(value: Any, max_chars: Optional[int] = None) -> Payload:
+    return Payload(value, max_chars)
+
+
+def dump(value: Any, max_chars: int) -> str:
+    """
+    Compact JSON of ``value`` with secret fields masked, stopping after
+    ``max_chars``; the cost is bounded by the limit, not by the value's size.
+    """
+    if isinstance(value, (str, bytes)):
+        text = value.decode('utf-8', 'replace') if isinstance(value, bytes) else value
+        return _clip(text, max_chars)
+    out: List[str] = []
+    try:
+        _encode(value, out, [max_chars])
+    except _Full:
+        text = ''.join(out)[:max_chars]
+        return f"{text}... (truncated at {max_chars} chars)"
+    return ''.join(out)
+
+
+def _clip(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    return f"{text[:max_chars]}... ({len(text) - max_chars} more chars)"
+
+
+def _emit(piece: str, out: List[str], budget: List[int]) -> None:
+    out.append(piece)
+    budget[0] -= len(piece)
+    if budget[0] < 0:
+        raise _Full
+
+
+def _encode(value: Any, out: List[str], budget: List[int]) -> None:
+    if isinstance(value, dict):
+        _emit('{', out, budget)
+        for index, (key, item) in enumerate(value.items()):
+            _emit((',' if index else '') + json.dumps(str(key), ensure_ascii=False) + ':', out, budget)
+            if SECRET_FIELD.search(str(key).lower()) and item:
+                _emit(json.dumps(REDACTED), out, budget)
+            else:
+                _encode(item, out, budget)
+        _emit('}', out, budget)
+    elif isinstance(value, (list, tuple)):
+        _emit('[', out, budget)
+        for index, item in enumerate(value):
+            if index:
+                _emit(',', out, budget)
+            _encode(item, out, budget)
+        _emit(']', out, budget)
+    elif isinstance(value, str):
+        # Slicing first keeps a multi-megabyte transcript from being escaped in full
+        _emit(json.dumps(value[:budget[0] + 1], ensure_ascii=False), out, budget)
+    elif value is None or isinstance(value, (bool, int, float)):
+        _emit(json.dumps(value), out, budget)
+    else:
+        _emit(json.dumps(str(value)[:budget[0] + 1], ensure_ascii=False), out, budget)
+
+
+def _configured_secrets() -> List[str]:
+    # Short values would mask ordinary words
+    return sorted({value for value in (os.getenv(name) for name in SECRET_ENV_VARS) if value and len(value) >= 8},
+                  key=len, reverse=True)
+
+
+def redact(text: str, secrets: Optional[List[str]] = None) -> str:
+    """Mask configured secrets, key query parameters and bearer tokens in formatted log text"""
+    for secret in _configured_secrets() if secrets is None else secrets:
+        if secret in text:
+            text = text.replace(secret, REDACTED)
+    for pattern in SECRET_PATTERNS:
+        text = pattern.sub(lambda match: match.group(1) + REDACTED, text)
+    return text
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.process,
+            'thread': record.thread,
+        }
+        trace_id = getattr(record, 'trace_id', None)
+        if trace_id:
+            entry['traceId'] = trace_id
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _RedactingStreamHandler(logging.StreamHandler):
+    def __init__(self):
+        super().__init__()
+        self.secrets = _configured_secrets()
+
+    def format(self, record: logging.LogRecord) -> str:
+        return redact(super().format(record), self.secrets)
+
+
+class AsyncLogHandler(logging.handlers.QueueHandler):
+    """
+    Queues records for a background thread that formats, redacts and writes
+    them to stderr. A full queue drops records instead of blocking requests;
+    the number dropped is reported once there is room again.
+    """
+
+    def __init__(self, max_queue: int = 10000, payload_max_chars: int = 2000, payload_sample_rate: float = 1.0):
+        global _payload_max_chars
+        super().__init__(queue.Queue(maxsize=max_queue))
+        _payload_max_chars = payload_max_chars
+        self.payload_sample_rate = payload_sample_rate
+        self.target = _RedactingStreamHandler()
+        self.dropped = 0
+        self._pid = None
+        self._listener = None
+        self._start()
+        atexit.register(self.close)
+
+    def _start(self) -> None:
+        self._pid = os.getpid()
+        self._listener = logging.handlers.QueueListener(self.queue, self.target, respect_handler_level=True)
+        self._listener.start()
+
+    def setFormatter(self, fmt: Optional[logging.Formatter]) -> None:
+        # Formatting happens on the listener thread, in the target handler
+        self.target.setFormatter(fmt)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if (record.levelno < logging.WARNING and self.payload_sample_rate < 1.0 and record.args
+                and isinstance(record.args, tuple) and any(isinstance(arg, Payload) for arg in record.args)):
+            if random.random() >= self.payload_sample_rate:
+                return False
+        return super().filter(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike the stdlib handler, leave msg/args alone: formatting is the listener's job
+        record.trace_id = tracing.current_trace_id()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self._pid != os.getpid():
+            # The listener thread does not survive a fork
+            self._start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            notice = logging.LogRecord(__name__, logging.WARNING, __file__, 0,
+                                       'Dropped %d log records (log queue full)', (dropped,), None)
+            try:
+                self.queue.put_nowait(notice)
+            except queue.Full:
+                self.dropped += dropped
+
+    def close(self) -> None:
+        """Write out everything queued, then stop the listener"""
+        listener, self._listener = self._listener, None
+        if listener is not None and self._pid == os.getpid():
+            try:
+                listener.stop()
+            except queue.Full:
+                pass
+        super().close()
@@ -0,0 +1,337 @@
+"""
+Saved meetings: persistence, keyset-paginated listing and ranked full-text search.
+
+On SQLite, meeting text is mirrored into an FTS5 table (created by migration
+0002) so searches stay fast across thousands of meetings; other database
+backends fall back to a LIKE scan.
+"""
+import re
+import json
+import uuid
+import base64
+import binascii
+import logging
+from typing import Dict, Any, Optional, List, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from .cache import get_result_cache
+from .models import Meeting, Transcript, Translation, ActionItem, Decision
+from .services import APIError
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'api_meeting_search'
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+_SEARCH_TERM = re.compile(r'\w+', re.UNICODE)
+
+
+def _fts_enabled() -> bool:
+    return connection.vendor == 'sqlite'
+
+
+def encode_cursor(values: List[Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, ValueError, UnicodeError):
+        raise APIError("Invalid pagination cursor", 400, "validation")
+    if not isinstance(values, list):
+        raise APIError("Invalid pagination cursor", 400, "validation")
+    return values
+
+
+def page_size(value: Optional[str]) -> int:
+    if value in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        raise APIError("limit must be an integer", 400, "validation")
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def build_match_query(text: str) -> str:
+    """Turn free text into an FTS5 query: every term must match, as a word prefix"""
+    terms = _SEARCH_TERM.findall(text)
+    if not terms:
+        raise APIError("Search query must contain at least one word", 400, "validation")
+    return " ".join(f'"{term}"*' for term in terms[:16])
+
+
+def save_meeting(result: Dict[str, Any], user_id: str = '', title: str = '',
+                 pre_meeting_notes: str = '') -> Meeting:
+    """Store a process-audio result (``{'data': ..., 'metadata': ...}``) and index it"""
+    if not user_id:
+        raise APIError("Saved meetings need an owner", 401, "meetings")
+    data = result.get('data') or {}
+    metadata = result.get('metadata') or {}
+    if not isinstance(data, dict) or not isinstance(metadata, dict):
+        raise APIError("data and metadata must be objects", 400, "validation")
+
+    target_language = metadata.get('targetLanguage') or 'en'
+    translations = dict(data.get('translations') or {})
+    if data.get('translation') and target_language not in translations:
+        translations[target_language] = data['translation']
+
+    with transaction.atomic():
+        meeting = Meeting.objects.create(
+            user_id=user_id,
+            title=title[:255],
+            source_language=metadata.get('sourceLanguage') or '',
+            target_language=target_language,
+            audio_format=metadata.get('audioFormat') or '',
+            content_hash=metadata.get('contentHash') or '',
+            pre_meeting_notes=pre_meeting_notes,
+            summary=data.get('summary') or '',
+            metadata=metadata,
+        )
+        transcript = Transcript.objects.create(
+            meeting=meeting,
+            text=data.get('transcript') or '',
+            segments=data.get('segments') or [],
+        )
+        Translation.objects.bulk_create([
+            Translation(meeting=meeting, language=language, text=text or '')
+            for language, text in translations.items()
+        ])
+        action_items = ActionItem.objects.bulk_create([
+            ActionItem(
+                meeting=meeting,
+                position=position,
+                item=str(entry.get('item', '')),
+                assignee=str(entry.get('assignee', ''))[:255],
+                priority=str(entry.get('priority', ''))[:32],
+                due_date=str(entry.get('dueDate', ''))[:64],
+            )
+            for position, entry in enumerate(data.get('actionItems') or [])
+            if isinstance(entry, dict)
+        ])
+        Decision.objects.bulk_create([
+            Decision(meeting=meeting, position=position, text=str(text))
+            for position, text in enumerate(data.get('keyDecisions') or [])
+        ])
+        _index_meeting(meeting, transcript.text, translations, action_items)
+
+    logger.info(f"Saved meeting {meeting.id}")
+    return meeting
+
+
+def _index_meeting(meeting: Meeting, transcript: str, translations: Dict[str, str],
+                   action_items: List[ActionItem]) -> None:
+    if not _fts_enabled():
+        return
+    action_text = "\n".join(
+        " ".join(part for part in (item.item, item.assignee) if part) for item in action_items
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE meeting_id = %s", [meeting.id.hex])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (meeting_id, user_id, transcript, translations, summary, action_items) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            [meeting.id.hex, meeting.user_id, transcript, "\n".join(translations.values()), meeting.summary, action_text]
+        )
+
+
+def delete_meeting(meeting: Meeting) -> None:
+    with transaction.atomic():
+        if _fts_enabled():
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE meeting_id = %s", [meeting.id.hex])
+        meeting.delete()
+
+
+def get_meeting(meeting_id: str, user_id: str = '') -> Optional[Meeting]:
+    if not user_id:
+        return None
+    try:
+        return (Meeting.objects
+                .select_related('transcript')
+                .prefetch_related('translations', 'action_items', 'decisions')
+                .get(id=meeting_id, user_id=user_id))
+    except (Meeting.DoesNotExist, ValidationError, ValueError):
+        return None
+
+
+def load_stored_transcript(meeting_id: Optional[str] = None, content_hash: Optional[str] = None,
+                           user_id: str = '', source_lang: Optional[str] = None) -> Dict[str, Any]:
+    """
+    The transcript of an earlier run, for re-analysis and re-translation.
+
+    By ``meeting_id`` it comes from the saved meeting. By ``content_hash``
+    (``metadata.contentHash`` of a process-audio response) it comes from the
+    result cache, falling back to a saved meeting with that hash.
+    ``source_lang`` fills in for cache entries that predate stored languages.
+    """
+    if meeting_id:
+        meeting = get_meeting(meeting_id, user_id)
+        if meeting is None:
+            raise APIError("Meeting not found", 404, "meetings")
+        return stored_transcript(meeting)
+    if not content_hash or not isinstance(content_hash, str):
+        raise APIError("meetingId or contentHash is required", 400, "validation")
+
+    result_cache = get_result_cache()
+    transcription = result_cache.get('transcription', content_hash) if result_cache else None
+    if transcription is not None and (transcription.get('sourceLanguage') or source_lang):
+        target_language = transcription.get('targetLanguage')
+        return {
+            'transcript': transcription['transcript'],
+            'translations': {target_language: transcription['translation']} if target_language else {},
+            'sourceLanguage': transcription.get('sourceLanguage') or source_lang,
+            'targetLanguage': target_language,
+            'contentHash': content_hash,
+            'meetingId': None,
+        }
+    meeting = None
+    if user_id:
+        meeting = (Meeting.objects.select_related('transcript').prefetch_related('translations')
+                   .filter(content_hash=content_hash, user_id=user_id).first())
+    if meeting is None:
+        raise APIError("No stored transcript for this content hash; process the recording again", 404, "cache")
+    return stored_transcript(meeting)
+
+
+def stored_transcript(meeting: Meeting) -> Dict[str, Any]:
+    transcript = getattr(meeting, 'transcript', None)
+    return {
+        'transcript': transcript.text if transcript else '',
+        'translations': {t.language: t.text for t in meeting.translations.all()},
+        'sourceLanguage': meeting.source_language,
+        'targetLanguage': meeting.target_language,
+        'contentHash': meeting.content_hash,
+        'meetingId': meeting.id.hex,
+    }
+
+
+def _keyset_page(queryset, limit: int, cursor: Optional[str]) -> Tuple[List[Meeting], Optional[str]]:
+    """One page of ``queryset`` ordered newest first, continuing after ``cursor``"""
+    queryset = queryset.order_by('-created_at', '-id')
+    if cursor:
+        values = decode_cursor(cursor)
+        created_at = parse_datetime(values[0]) if len(values) == 2 and isinstance(values[0], str) else None
+        if created_at is None:
+            raise APIError("Invalid pagination cursor", 400, "validation")
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=values[1]))
+
+    meetings = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(meetings) > limit:
+        meetings = meetings[:limit]
+        next_cursor = encode_cursor([meetings[-1].created_at.isoformat(), meetings[-1].id.hex])
+    return meetings, next_cursor
+
+
+def list_meetings(user_id: str = '', limit: int = DEFAULT_PAGE_SIZE,
+                  cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Newest meetings first; returns (page, cursor for the next page or None)"""
+    if not user_id:
+        return [], None
+    meetings, next_cursor = _keyset_page(Meeting.objects.filter(user_id=user_id), limit, cursor)
+    return [meeting_summary(meeting) for meeting in meetings], next_cursor
+
+
+def search_meetings(query: str, user_id: str = '', limit: int = DEFAULT_PAGE_SIZE,
+                    cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Best matches first (BM25); returns (page, cursor for the next page or None)"""
+    if not user_id:
+        return [], None
+    if not _fts_enabled():
+        return _search_meetings_like(query, user_id, limit, cursor)
+
+    sql = (
+        f"SELECT meeting_id, rank, rowid, snippet({FTS_TABLE}, -1, '[', ']', '…', 16) "
+        f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND user_id = %s"
+    )
+    params: List[Any] = [build_match_query(query), user_id]
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 2:
+            raise APIError("Invalid pagination cursor", 400, "validation")
+        sql += " AND (rank > %s OR (rank = %s AND rowid > %s))"
+        params += [values[0], values[0], values[1]]
+    sql += " ORDER BY rank, rowid LIMIT %s"
+    params.append(limit + 1)
+
+    with connection.cursor() as db_cursor:
+        rows = db_cursor.execute(sql, params).fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1][1], rows[-1][2]])
+
+    meetings = Meeting.objects.in_bulk([uuid.UUID(row[0]) for row in rows])
+    results = []
+    for meeting_id, rank, _, snippet in rows:
+        meeting = meetings.get(uuid.UUID(meeting_id))
+        if meeting is not None:
+            # FTS5 ranks are negated BM25 scores; report higher-is-better
+            results.append({**meeting_summary(meeting), 'score': round(-rank, 4), 'snippet': snippet})
+    return results, next_cursor
+
+
+def _search_meetings_like(query: str, user_id: str, limit: int,
+                          cursor: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Unranked fallback for databases without FTS5: newest matching meetings first"""
+    terms = _SEARCH_TERM.findall(query)
+    if not terms:
+        raise APIError("Search query must contain at least one word", 400, "validation")
+    matches = Meeting.objects.filter(user_id=user_id)
+    for term in terms[:16]:
+        matches = matches.filter(
+            Q(summary__icontains=term) | Q(transcript__text__icontains=term) |
+            Q(translations__text__icontains=term) | Q(action_items__item__icontains=term)
+        )
+    meetings, next_cursor = _keyset_page(
+        Meeting.objects.filter(id__in=matches.values('id')), limit, cursor
+    )
+    return [meeting_summary(meeting) for meeting in meetings], next_cursor
+
+
+def meeting_summary(meeting: Meeting) -> Dict[str, Any]:
+    """List view of a meeting (no transcript text)"""
+    return {
+        'id': meeting.id.hex,
+        'title': meeting.title,
+        'sourceLanguage': meeting.source_language,
+        'targetLanguage': meeting.target_language,
+        'audioFormat': meeting.audio_format,
+        'summary': meeting.summary,
+        'createdAt': meeting.created_at.isoformat(),
+    }
+
+
+def meeting_detail(meeting: Meeting) -> Dict[str, Any]:
+    """Full meeting in the same shape as a process-audio response"""
+    transcript = getattr(meeting, 'transcript', None)
+    translations = {t.language: t.text for t in meeting.translations.all()}
+    data = {
+        'transcript': transcript.text if transcript else '',
+        'translation': translations.get(meeting.target_language, ''),
+        'translations': translations,
+        'summary': meeting.summary,
+        'actionItems': [
+            {'item': a.item, 'assignee': a.assignee, 'priority': a.priority, 'dueDate': a.due_date}
+            for a in meeting.action_items.all()
+        ],
+        'keyDecisions': [d.text for d in meeting.decisions.all()],
+    }
+    if transcript and transcript.segments:
+        data['segments'] = transcript.segments
+    return {
+        **meeting_summary(meeting),
+        'preMeetingNotes': meeting.pre_meeting_notes,
+        'data': data,
+        'metadata': meeting.metadata,
+    }
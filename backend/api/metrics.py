@@ -0,0 +1,170 @@
+"""
+Prometheus metrics for the processing pipeline.
+
+Stage latencies are histograms labelled by stage; cache lookups, upstream
+responses, retries, hedges and ``APIError`` categories are counters; in-flight
+requests, audio bytes and open circuits are gauges.
+
+gunicorn workers are separate processes, so each keeps its own samples. When
+``PROMETHEUS_MULTIPROC_DIR`` is set (gunicorn.conf.py sets it and clears it at
+startup), prometheus_client writes every worker's samples to files in that
+directory and ``render`` aggregates all of them, so a scrape hitting any worker
+sees the whole server. Without it, metrics are per process, which is correct
+for runserver and single-worker deployments.
+"""
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+
+# Stages reported in meeting_stage_duration_seconds
+STAGES = (
+    'upload_read',      # multipart parsing and spooling, or JSON body decoding
+    'base64_encode',    # encoding audio for the compute payload (summed per request)
+    'pipeline_config',  # getModelsPipeline round trip on a cache miss
+    'bhashini_compute', # ASR/translation compute round trip, including the upload
+    'gemini_generate',  # generateContent round trip
+    'json_parse',       # decoding upstream responses and Gemini's JSON answer
+    'total',            # whole process-audio request
+)
+
+# Upstream calls range from milliseconds (cached config) to minutes (long ASR)
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0,
+                 float('inf'))
+
+STAGE_SECONDS = Histogram(
+    'meeting_stage_duration_seconds', 'Time spent in each processing stage',
+    ['stage'], buckets=STAGE_BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    'meeting_cache_lookups_total', 'Cache lookups by cache and outcome',
+    ['cache', 'result'],
+)
+UPSTREAM_RESPONSES = Counter(
+    'meeting_upstream_responses_total', 'Upstream HTTP responses by client and status code ("error" for transport failures)',
+    ['upstream', 'status'],
+)
+API_ERRORS = Counter(
+    'meeting_api_errors_total', 'Errors returned to clients by APIError service and status code',
+    ['service', 'status'],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'meeting_requests_in_flight', 'Audio processing requests currently being handled',
+    ['endpoint'], multiprocess_mode='livesum',
+)
+AUDIO_BYTES_IN_FLIGHT = Gauge(
+    'meeting_audio_bytes_in_flight', 'Bytes of uploaded audio currently being processed',
+    multiprocess_mode='livesum',
+)
+AUDIO_BYTES = Counter(
+    'meeting_audio_bytes_total', 'Bytes of uploaded audio accepted for processing',
+)
+UPSTREAM_RETRIES = Counter(
+    'meeting_upstream_retries_total', 'Upstream calls retried after a transport error or retryable status',
+    ['service', 'endpoint'],
+)
+UPSTREAM_HEDGES = Counter(
+    'meeting_upstream_hedges_total', 'Hedged duplicate upstream requests sent, and how many answered first',
+    ['service', 'endpoint', 'result'],
+)
+ADMISSIONS = Counter(
+    'meeting_admissions_total', 'Admission control decisions (admitted, queued, rate_limited, rejected, queue_timeout)',
+    ['endpoint', 'result'],
+)
+CIRCUIT_REJECTIONS = Counter(
+    'meeting_circuit_rejections_total', 'Calls failed fast because the service circuit was open',
+    ['service'],
+)
+CIRCUIT_OPEN = Gauge(
+    'meeting_circuit_open', 'Workers whose circuit for the service is currently open',
+    ['service'], multiprocess_mode='livesum',
+)
+
+
+def time_stage(stage: str):
+    """Context manager (or decorator) observing the enclosed block as ``stage``"""
+    return STAGE_SECONDS.labels(stage).time()
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    STAGE_SECONDS.labels(stage).observe(seconds)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def record_upstream(upstream: str, status) -> None:
+    UPSTREAM_RESPONSES.labels(upstream, str(status)).inc()
+
+
+def record_api_error(error) -> None:
+    API_ERRORS.labels(error.service, str(error.status_code)).inc()
+
+
+def record_retry(service: str, endpoint: str) -> None:
+    UPSTREAM_RETRIES.labels(service, endpoint).inc()
+
+
+def record_hedge(service: str, endpoint: str, result: str) -> None:
+    UPSTREAM_HEDGES.labels(service, endpoint, result).inc()
+
+
+def record_admission(endpoint: str, result: str) -> None:
+    ADMISSIONS.labels(endpoint, result).inc()
+
+
+def record_circuit_rejection(service: str) -> None:
+    CIRCUIT_REJECTIONS.labels(service).inc()
+
+
+def set_circuit_open(service: str, is_open: bool) -> None:
+    CIRCUIT_OPEN.labels(service).set(1 if is_open else 0)
+
+
+def track_in_flight(endpoint: str):
+    """Context manager counting a request as in flight for ``endpoint``"""
+    return REQUESTS_IN_FLIGHT.labels(endpoint).track_inprogress()
+
+
+@contextmanager
+def audio_in_flight(size: int) -> Iterator[None]:
+    AUDIO_BYTES.inc(size)
+    AUDIO_BYTES_IN_FLIGHT.inc(size)
+    try:
+        yield
+    finally:
+        AUDIO_BYTES_IN_FLIGHT.dec(size)
+
+
+class StageTimer:
+    """Accumulates time over many short sections and reports it as one observation"""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.seconds = 0.0
+
+    @contextmanager
+    def section(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds += time.perf_counter() - start
+
+    def observe(self) -> None:
+        observe_stage(self.stage, self.seconds)
+
+
+def render() -> Tuple[bytes, str]:
+    """Exposition-format body and content type, aggregated across workers when multiprocess is on"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,96 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActionItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('item', models.TextField()),
+                ('assignee', models.CharField(blank=True, default='', max_length=255)),
+                ('priority', models.CharField(blank=True, default='', max_length=32)),
+                ('due_date', models.CharField(blank=True, default='', max_length=64)),
+            ],
+            options={
+                'ordering': ['position'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Decision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('text', models.TextField()),
+            ],
+            options={
+                'ordering': ['position'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Meeting',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('user_id', models.CharField(blank=True, default='', max_length=128)),
+                ('title', models.CharField(blank=True, default='', max_length=255)),
+                ('source_language', models.CharField(max_length=16)),
+                ('target_language', models.CharField(max_length=16)),
+                ('audio_format', models.CharField(blank=True, default='', max_length=16)),
+                ('content_hash', models.CharField(blank=True, db_index=True, default='', max_length=64)),
+                ('pre_meeting_notes', models.TextField(blank=True, default='')),
+                ('summary', models.TextField(blank=True, default='')),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Translation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=16)),
+                ('text', models.TextField(blank=True, default='')),
+                ('meeting', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='translations', to='api.meeting')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Transcript',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.TextField(blank=True, default='')),
+                ('segments', models.JSONField(blank=True, default=list)),
+                ('meeting', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='transcript', to='api.meeting')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['user_id', '-created_at', '-id'], name='meeting_user_recent'),
+        ),
+        migrations.AddField(
+            model_name='decision',
+            name='meeting',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='decisions', to='api.meeting'),
+        ),
+        migrations.AddField(
+            model_name='actionitem',
+            name='meeting',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='action_items', to='api.meeting'),
+        ),
+        migrations.AddConstraint(
+            model_name='translation',
+            constraint=models.UniqueConstraint(fields=('meeting', 'language'), name='translation_meeting_language'),
+        ),
+    ]
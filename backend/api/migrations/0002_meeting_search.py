@@ -0,0 +1,40 @@
+"""
+FTS5 index over meeting text (SQLite only; other backends fall back to LIKE search).
+"""
+from django.db import migrations
+
+FTS_TABLE = 'api_meeting_search'
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "meeting_id UNINDEXED, user_id UNINDEXED, "
+            "transcript, translations, summary, action_items, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        # Summary and action-item hits rank above incidental transcript mentions
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rank) VALUES ('rank', 'bm25(0.0, 0.0, 1.0, 1.0, 2.0, 1.5)')"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
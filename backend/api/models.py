@@ -0,0 +1,73 @@
+"""
+Saved meetings: the processed output of a recording, queryable across devices.
+"""
+import uuid
+
+from django.db import models
+
+
+class Meeting(models.Model):
+    """One processed recording and its AI analysis"""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Owner key (X-User-Id header): the sync key a browser generates and the user can enter on other devices
+    user_id = models.CharField(max_length=128, blank=True, default='')
+    title = models.CharField(max_length=255, blank=True, default='')
+    source_language = models.CharField(max_length=16)
+    target_language = models.CharField(max_length=16)
+    audio_format = models.CharField(max_length=16, blank=True, default='')
+    content_hash = models.CharField(max_length=64, blank=True, default='', db_index=True)
+    pre_meeting_notes = models.TextField(blank=True, default='')
+    summary = models.TextField(blank=True, default='')
+    metadata = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Keyset pagination walks (user_id, created_at, id) in descending order
+            models.Index(fields=['user_id', '-created_at', '-id'], name='meeting_user_recent'),
+        ]
+
+    def __str__(self):
+        return self.title or str(self.id)
+
+
+class Transcript(models.Model):
+    """Source-language ASR output; ``segments`` holds per-chunk offsets for long recordings"""
+
+    meeting = models.OneToOneField(Meeting, on_delete=models.CASCADE, related_name='transcript')
+    text = models.TextField(blank=True, default='')
+    segments = models.JSONField(default=list, blank=True)
+
+
+class Translation(models.Model):
+    meeting = models.ForeignKey(Meeting, on_delete=models.CASCADE, related_name='translations')
+    language = models.CharField(max_length=16)
+    text = models.TextField(blank=True, default='')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['meeting', 'language'], name='translation_meeting_language'),
+        ]
+
+
+class ActionItem(models.Model):
+    meeting = models.ForeignKey(Meeting, on_delete=models.CASCADE, related_name='action_items')
+    position = models.PositiveIntegerField(default=0)
+    item = models.TextField()
+    assignee = models.CharField(max_length=255, blank=True, default='')
+    priority = models.CharField(max_length=32, blank=True, default='')
+    due_date = models.CharField(max_length=64, blank=True, default='')
+
+    class Meta:
+        ordering = ['position']
+
+
+class Decision(models.Model):
+    meeting = models.ForeignKey(Meeting, on_delete=models.CASCADE, related_name='decisions')
+    position = models.PositiveIntegerField(default=0)
+    text = models.TextField()
+
+    class Meta:
+        ordering = ['position']
@@ -0,0 +1,489 @@
+"""
+Meeting processing pipeline shared by the synchronous endpoint and background jobs.
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable, Tuple, List
+
+from django.conf import settings
+
+from .audio import AudioSource
+from . import deadlines, tracing
+from .cache import content_key, get_result_cache
+from .checkpoints import Checkpoint
+from .services import APIError, BhashiniService, get_bhashini_service, get_gemini_service
+
+logger = logging.getLogger(__name__)
+
+# Ordered stages reported to progress callbacks
+STAGES = ['transcription', 'analysis']
+
+StageCallback = Callable[[str, str], None]
+EventCallback = Callable[[str, Dict[str, Any]], None]
+
+# Stands in for an analysis the request deadline cut off (``summaryPending``)
+PENDING_ANALYSIS = {'summary': '', 'actionItems': [], 'keyDecisions': []}
+
+
+def extract_bhashini_outputs(bhashini_result: Dict[str, Any]) -> Tuple[str, str]:
+    """Pull transcript and translation text out of a Bhashini compute result"""
+    transcript, translation = BhashiniService.extract_outputs(bhashini_result)
+
+    # If no translation was performed (same language), use transcript as translation
+    if not translation and transcript:
+        translation = transcript
+
+    return transcript, translation
+
+
+def build_transcription(bhashini_result: Dict[str, Any], source_lang: str, target_lang: str) -> Dict[str, Any]:
+    """The cacheable part of a transcription: texts, languages, chunk segments and audio trimming stats"""
+    transcript, translation = extract_bhashini_outputs(bhashini_result)
+    transcription = {
+        'transcript': transcript,
+        'translation': translation,
+        # Lets the transcript be reused by content hash alone (re-analysis, re-translation)
+        'sourceLanguage': source_lang,
+        'targetLanguage': target_lang,
+    }
+    if 'segments' in bhashini_result:
+        # Long recordings were transcribed in chunks; keep per-chunk offsets
+        transcription['segments'] = bhashini_result['segments']
+    if 'audio' in bhashini_result:
+        transcription['audio'] = bhashini_result['audio']
+    return transcription
+
+
+def translate_extra_targets(transcript: str, source_lang: str, target_langs: List[str]) -> Dict[str, str]:
+    """
+    Translate a finished transcript into additional target languages.
+
+    Each language is cached on transcript + language pair; the misses are
+    translated concurrently, reusing the ASR output instead of re-running it.
+    Returns (translations, errors); see ``translation_errors`` for the latter.
+    """
+    result_cache = get_result_cache()
+    translations = {}
+    missing = []
+    for lang in target_langs:
+        cached = result_cache.get('translation', content_key(transcript, source_lang, lang)) if result_cache else None
+        if cached is not None:
+            translations[lang] = cached['translation']
+        else:
+            missing.append(lang)
+
+    errors = {}
+    if missing:
+        fresh, failed = get_bhashini_service().translate_many(transcript, source_lang, missing)
+        for lang, text in fresh.items():
+            translations[lang] = text
+            if result_cache and text:
+                result_cache.set('translation', content_key(transcript, source_lang, lang), {'translation': text})
+        errors = translation_errors(failed)
+    return {lang: translations[lang] for lang in target_langs if lang in translations}, errors
+
+
+def translation_errors(errors: Dict[str, APIError]) -> Dict[str, Dict[str, Any]]:
+    """Per-language failures as returned in ``data.translationErrors``"""
+    return {
+        lang: {'message': error.message, 'service': error.service, 'statusCode': error.status_code}
+        for lang, error in errors.items()
+    }
+
+
+def _traced_extra_translations(transcript: str, source_lang: str,
+                               target_langs: List[str]) -> Tuple[Dict[str, str], Dict[str, Dict[str, Any]]]:
+    with tracing.span('translations', {'language.source': source_lang, 'language.targets': ','.join(target_langs)}) as span:
+        translations, errors = translate_extra_targets(transcript, source_lang, target_langs)
+        if errors:
+            span.set_attribute('translations.failed', ','.join(errors))
+        return translations, errors
+
+
+def _checkpointed_extra_translations(transcript: str, source_lang: str, target_langs: List[str],
+                                     checkpoint: Optional[Checkpoint]) -> Tuple[Dict[str, str], Dict[str, Dict[str, Any]]]:
+    """
+    Extra translations and per-language errors, skipping languages an earlier
+    attempt of the request already translated. Only successes are
+    checkpointed, so a retry tries the failed languages again.
+    """
+    translations = dict((checkpoint.get('translations') if checkpoint else None) or {})
+    missing = [lang for lang in target_langs if lang not in translations]
+    errors = {}
+    if missing:
+        fresh, errors = _traced_extra_translations(transcript, source_lang, missing)
+        translations.update(fresh)
+        if checkpoint and fresh:
+            checkpoint.save('translations', translations)
+    return {lang: translations[lang] for lang in target_langs if lang in translations}, errors
+
+
+def _prepare_pipeline_config(bhashini_service: BhashiniService, source_lang: str, target_lang: str,
+                             checkpoint: Optional[Checkpoint]) -> None:
+    """Resolve (and cache) the Bhashini pipeline config, reusing one checkpointed by an earlier attempt"""
+    pipeline_config = checkpoint.get('pipeline_config') if checkpoint else None
+    if pipeline_config is not None:
+        bhashini_service.prime_pipeline_config(source_lang, target_lang, pipeline_config)
+        return
+    pipeline_config = bhashini_service.get_pipeline_config(source_lang, target_lang)
+    if checkpoint:
+        checkpoint.save('pipeline_config', pipeline_config)
+
+
+def _analysis_out_of_time() -> bool:
+    """True when the request deadline leaves Gemini too little time for an analysis"""
+    return deadlines.expires_within(getattr(settings, 'DEADLINE_MIN_ANALYSIS_SECONDS', 10))
+
+
+def analyze_text(analysis_text: str, pre_meeting_notes: str = "",
+                 on_delta: Optional[Callable[[str], None]] = None) -> Tuple[Dict[str, Any], bool]:
+    """Gemini summary, action items and decisions, cached on text + notes + prompt; returns (analysis, cached)"""
+    result_cache = get_result_cache()
+    with tracing.span('analysis') as span:
+        gemini_service = get_gemini_service()
+        analysis_key = content_key(analysis_text, pre_meeting_notes.strip(), gemini_service.prompt_fingerprint())
+        ai_analysis = result_cache.get('analysis', analysis_key) if result_cache else None
+        analysis_cached = ai_analysis is not None
+        span.set_attribute('cache.hit', analysis_cached)
+        span.set_attribute('text.chars', len(analysis_text))
+        if not analysis_cached:
+            if _analysis_out_of_time():
+                raise deadlines.exceeded('gemini', 'analysis')
+            ai_analysis = gemini_service.generate_summary_and_actions(analysis_text, pre_meeting_notes, on_delta=on_delta)
+            if result_cache and analysis_text.strip():
+                result_cache.set('analysis', analysis_key, ai_analysis)
+    return ai_analysis, analysis_cached
+
+
+async def aanalyze_text(analysis_text: str, pre_meeting_notes: str = "") -> Tuple[Dict[str, Any], bool]:
+    """Async variant of ``analyze_text``; cache access runs on worker threads"""
+    result_cache = get_result_cache()
+    with tracing.span('analysis') as span:
+        gemini_service = get_gemini_service()
+        analysis_key = content_key(analysis_text, pre_meeting_notes.strip(), gemini_service.prompt_fingerprint())
+        ai_analysis = await asyncio.to_thread(result_cache.get, 'analysis', analysis_key) if result_cache else None
+        analysis_cached = ai_analysis is not None
+        span.set_attribute('cache.hit', analysis_cached)
+        span.set_attribute('text.chars', len(analysis_text))
+        if not analysis_cached:
+            if _analysis_out_of_time():
+                raise deadlines.exceeded('gemini', 'analysis')
+            ai_analysis = await gemini_service.agenerate_summary_and_actions(analysis_text, pre_meeting_notes)
+            if result_cache and analysis_text.strip():
+                await asyncio.to_thread(result_cache.set, 'analysis', analysis_key, ai_analysis)
+    return ai_analysis, analysis_cached
+
+
+def _summary_pending(error: APIError) -> Tuple[None, bool]:
+    """Re-raise ``error`` unless the request deadline is what stopped the analysis"""
+    if not _analysis_out_of_time():
+        raise error
+    logger.warning(f"Request deadline reached before the analysis finished ({error.message}); returning the transcript")
+    tracing.set_attribute('analysis.pending', True)
+    return None, False
+
+
+def _analyze_or_pending(analysis_text: str, pre_meeting_notes: str,
+                        on_delta: Optional[Callable[[str], None]] = None,
+                        checkpoint: Optional[Checkpoint] = None) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """``analyze_text`` unless checkpointed, or (None, False) when the request deadline cuts it off"""
+    ai_analysis = checkpoint.get('analysis') if checkpoint else None
+    if ai_analysis is not None:
+        return ai_analysis, True
+    try:
+        ai_analysis, analysis_cached = analyze_text(analysis_text, pre_meeting_notes, on_delta=on_delta)
+    except APIError as e:
+        return _summary_pending(e)
+    if checkpoint:
+        checkpoint.save('analysis', ai_analysis)
+    return ai_analysis, analysis_cached
+
+
+async def _aanalyze_or_pending(analysis_text: str, pre_meeting_notes: str,
+                               checkpoint: Optional[Checkpoint] = None) -> Tuple[Optional[Dict[str, Any]], bool]:
+    ai_analysis = checkpoint.get('analysis') if checkpoint else None
+    if ai_analysis is not None:
+        return ai_analysis, True
+    try:
+        ai_analysis, analysis_cached = await aanalyze_text(analysis_text, pre_meeting_notes)
+    except APIError as e:
+        return _summary_pending(e)
+    if checkpoint:
+        await asyncio.to_thread(checkpoint.save, 'analysis', ai_analysis)
+    return ai_analysis, analysis_cached
+
+
+def run_meeting_pipeline(audio: AudioSource, source_lang: str, target_lang: str,
+                         pre_meeting_notes: str = "", on_stage: Optional[StageCallback] = None,
+                         on_event: Optional[EventCallback] = None,
+                         extra_target_langs: Optional[List[str]] = None,
+                         checkpoint: Optional[Checkpoint] = None) -> Dict[str, Any]:
+    """
+    Run transcription, translation and AI analysis for one recording.
+
+    ``target_lang`` is translated together with ASR and feeds the analysis;
+    ``extra_target_langs`` are translated from the transcript concurrently
+    while the analysis runs.
+
+    ``on_stage(stage, status)`` is called with ``running``/``completed`` as each
+    stage in ``STAGES`` starts and finishes. ``on_event(name, data)`` receives
+    partial results as soon as they exist (``pipeline_config_resolved``,
+    ``transcript``, ``translation``, ``summary_delta``, ``analysis``); passing it
+    also streams the Gemini answer. Errors propagate as ``APIError``, except
+    that under a request deadline (``deadlines.budget``) an analysis that
+    cannot finish in time leaves the result with ``summaryPending`` set.
+
+    With a ``checkpoint`` every finished stage is saved as it completes, and
+    stages an earlier attempt of the same request finished are reused.
+    """
+    def report(stage: str, status: str) -> None:
+        if on_stage:
+            on_stage(stage, status)
+
+    def emit(event: str, data: Dict[str, Any]) -> None:
+        if on_event:
+            on_event(event, data)
+
+    result_cache = get_result_cache()
+    transcription_key = content_key(audio.sha256(), source_lang, target_lang, audio.format)
+
+    # Process audio through Bhashini, unless this exact recording was already transcribed
+    report('transcription', 'running')
+    with tracing.span('transcription', {'audio.bytes': audio.size, 'audio.format': audio.format}) as span:
+        transcription = checkpoint.get('transcription') if checkpoint else None
+        if transcription is None and result_cache:
+            transcription = result_cache.get('transcription', transcription_key)
+        transcription_cached = transcription is not None
+        span.set_attribute('cache.hit', transcription_cached)
+        if transcription_cached:
+            emit('pipeline_config_resolved', {'sourceLanguage': source_lang, 'targetLanguage': target_lang, 'cached': True})
+        else:
+            bhashini_service = get_bhashini_service()
+            # Resolved up front (and cached) so clients learn the pipeline is set up before ASR starts
+            _prepare_pipeline_config(bhashini_service, source_lang, target_lang, checkpoint)
+            emit('pipeline_config_resolved', {'sourceLanguage': source_lang, 'targetLanguage': target_lang, 'cached': False})
+            transcription = build_transcription(bhashini_service.transcribe(audio, source_lang, target_lang), source_lang, target_lang)
+            if result_cache and transcription['transcript']:
+                result_cache.set('transcription', transcription_key, transcription)
+        if checkpoint:
+            checkpoint.save('transcription', transcription)
+    report('transcription', 'completed')
+    emit('transcript', {'transcript': transcription['transcript'], 'segments': transcription.get('segments')})
+    emit('translation', {'translation': transcription['translation'], 'targetLanguage': target_lang})
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix='translations') as executor:
+        extra_future = executor.submit(
+            tracing.bind(_checkpointed_extra_translations), transcription['transcript'], source_lang,
+            extra_target_langs, checkpoint,
+        ) if extra_target_langs else None
+
+        # Generate AI summary using Gemini, cached on transcript + notes + prompt
+        report('analysis', 'running')
+        on_delta = (lambda delta: emit('summary_delta', {'text': delta})) if on_event else None
+        ai_analysis, analysis_cached = _analyze_or_pending(
+            transcription['translation'] or transcription['transcript'], pre_meeting_notes, on_delta=on_delta,
+            checkpoint=checkpoint,
+        )
+        report('analysis', 'completed')
+
+        extra_translations, extra_errors = extra_future.result() if extra_future else ({}, {})
+    for lang, text in extra_translations.items():
+        emit('translation', {'translation': text, 'targetLanguage': lang})
+    for lang, error in extra_errors.items():
+        emit('translation_failed', {'targetLanguage': lang, 'error': error})
+    analysis = ai_analysis or PENDING_ANALYSIS
+    emit('analysis', {
+        'summary': analysis['summary'],
+        'actionItems': analysis['actionItems'],
+        'keyDecisions': analysis['keyDecisions'],
+        'cached': analysis_cached,
+    })
+
+    return _assemble_result(audio, source_lang, target_lang, pre_meeting_notes, transcription_key,
+                            transcription, ai_analysis, transcription_cached, analysis_cached,
+                            extra_translations, checkpoint, extra_errors)
+
+
+async def arun_meeting_pipeline(audio: AudioSource, source_lang: str, target_lang: str,
+                                pre_meeting_notes: str = "",
+                                extra_target_langs: Optional[List[str]] = None,
+                                checkpoint: Optional[Checkpoint] = None) -> Dict[str, Any]:
+    """
+    Async variant of ``run_meeting_pipeline`` for ASGI views.
+
+    Upstream calls go through the services' async HTTP clients; hashing and
+    SQLite cache access run on worker threads so they never block the event loop.
+    """
+    result_cache = get_result_cache()
+    transcription_key = content_key(await asyncio.to_thread(audio.sha256), source_lang, target_lang, audio.format)
+
+    with tracing.span('transcription', {'audio.bytes': audio.size, 'audio.format': audio.format}) as span:
+        transcription = checkpoint.get('transcription') if checkpoint else None
+        if transcription is None and result_cache:
+            transcription = await asyncio.to_thread(result_cache.get, 'transcription', transcription_key)
+        transcription_cached = transcription is not None
+        span.set_attribute('cache.hit', transcription_cached)
+        if not transcription_cached:
+            bhashini_service = get_bhashini_service()
+            if checkpoint:
+                # atranscribe then finds the resolved config in the cache
+                await asyncio.to_thread(_prepare_pipeline_config, bhashini_service, source_lang, target_lang, checkpoint)
+            transcription = build_transcription(
+                await bhashini_service.atranscribe(audio, source_lang, target_lang), source_lang, target_lang
+            )
+            if result_cache and transcription['transcript']:
+                await asyncio.to_thread(result_cache.set, 'transcription', transcription_key, transcription)
+        if checkpoint:
+            await asyncio.to_thread(checkpoint.save, 'transcription', transcription)
+
+    extra_task = asyncio.ensure_future(asyncio.to_thread(
+        _checkpointed_extra_translations, transcription['transcript'], source_lang, extra_target_langs, checkpoint
+    )) if extra_target_langs else None
+
+    try:
+        ai_analysis, analysis_cached = await _aanalyze_or_pending(
+            transcription['translation'] or transcription['transcript'], pre_meeting_notes, checkpoint
+        )
+    except BaseException:
+        if extra_task:
+            extra_task.cancel()
+        raise
+    extra_translations, extra_errors = await extra_task if extra_task else ({}, {})
+
+    return _assemble_result(audio, source_lang, target_lang, pre_meeting_notes, transcription_key,
+                            transcription, ai_analysis, transcription_cached, analysis_cached,
+                            extra_translations, checkpoint, extra_errors)
+
+
+def _assemble_result(audio: AudioSource, source_lang: str, target_lang: str, pre_meeting_notes: str,
+                     transcription_key: str, transcription: Dict[str, Any], ai_analysis: Optional[Dict[str, Any]],
+                     transcription_cached: bool, analysis_cached: bool,
+                     extra_translations: Optional[Dict[str, str]] = None,
+                     checkpoint: Optional[Checkpoint] = None,
+                     extra_errors: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    The endpoint's result; ``ai_analysis`` is None when the deadline cut the
+    analysis off, and extra languages that failed are in ``extra_errors``.
+    """
+    summary_pending = ai_analysis is None
+    ai_analysis = ai_analysis or PENDING_ANALYSIS
+    translations = {target_lang: transcription['translation'], **(extra_translations or {})}
+    data = {
+        'transcript': transcription['transcript'],
+        'translation': transcription['translation'],
+        'translations': translations,
+        # Extra target languages that failed, e.g. {"ta": {"message", "service", "statusCode"}}
+        'translationErrors': extra_errors or {},
+        'summary': ai_analysis['summary'],
+        'actionItems': ai_analysis['actionItems'],
+        'keyDecisions': ai_analysis['keyDecisions'],
+        # The analysis missed the request deadline; it finishes in the background (see metadata)
+        'summaryPending': summary_pending,
+    }
+    if 'segments' in transcription:
+        data['segments'] = transcription['segments']
+
+    if transcription_cached and analysis_cached:
+        cache_status = 'hit'
+    elif transcription_cached or analysis_cached:
+        cache_status = 'partial'
+    else:
+        cache_status = 'miss'
+
+    return {
+        'data': data,
+        'metadata': {
+            'sourceLanguage': source_lang,
+            'targetLanguage': target_lang,
+            'targetLanguages': list(translations),
+            'audioFormat': audio.format,
+            'processedAt': datetime.now().isoformat(),
+            'preMeetingNotesProvided': bool(pre_meeting_notes.strip()),
+            'contentHash': transcription_key,
+            # Share of the recording dropped as silence before ASR (entries cached before trimming lack it)
+            'trimmedPercent': transcription.get('audio', {}).get('trimmedPercent'),
+            'cache': cache_status,
+            'degraded': summary_pending or bool(extra_errors),
+            # Stages reused from an earlier attempt with the same Idempotency-Key
+            'resumedStages': list(checkpoint.resumed) if checkpoint else [],
+            'traceId': tracing.current_trace_id(),
+        }
+    }
+
+
+def reanalyze_transcript(stored: Dict[str, Any], pre_meeting_notes: str = "",
+                         target_lang: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Re-run only the AI analysis of an already transcribed recording, e.g. with new notes.
+
+    ``stored`` is a transcript as returned by ``meetings.load_stored_transcript``.
+    The analysis reads the ``target_lang`` translation (default: the stored
+    primary target), which is translated from the transcript if missing.
+    """
+    target_lang = target_lang or stored['targetLanguage'] or stored['sourceLanguage']
+    translations, _ = _reuse_translations(stored, [target_lang])
+    ai_analysis, analysis_cached = analyze_text(translations[target_lang] or stored['transcript'], pre_meeting_notes)
+    return {
+        'data': {
+            'transcript': stored['transcript'],
+            'translation': translations[target_lang],
+            'summary': ai_analysis['summary'],
+            'actionItems': ai_analysis['actionItems'],
+            'keyDecisions': ai_analysis['keyDecisions'],
+        },
+        'metadata': {
+            **_reuse_metadata(stored, [target_lang]),
+            'preMeetingNotesProvided': bool(pre_meeting_notes.strip()),
+            'cache': 'hit' if analysis_cached else 'miss',
+        },
+    }
+
+
+def retranslate_transcript(stored: Dict[str, Any], target_langs: List[str]) -> Dict[str, Any]:
+    """
+    Translate a stored transcript into ``target_langs`` with translation-only
+    Bhashini calls; languages that fail are reported in ``translationErrors``.
+    """
+    translations, errors = _reuse_translations(stored, target_langs)
+    return {
+        'data': {
+            'transcript': stored['transcript'],
+            'translation': translations.get(target_langs[0], ''),
+            'translations': translations,
+            'translationErrors': errors,
+        },
+        'metadata': _reuse_metadata(stored, target_langs),
+    }
+
+
+def _reuse_translations(stored: Dict[str, Any],
+                        target_langs: List[str]) -> Tuple[Dict[str, str], Dict[str, Dict[str, Any]]]:
+    """
+    Stored translations where they exist, fresh (or cached) ones for the rest,
+    and the errors of languages that failed. Raises the first error when no
+    language could be translated, as there is nothing to return.
+    """
+    translations = {lang: stored['translations'][lang] for lang in target_langs if lang in stored['translations']}
+    missing = [lang for lang in target_langs if lang not in translations]
+    errors = {}
+    if missing:
+        fresh, errors = _traced_extra_translations(stored['transcript'], stored['sourceLanguage'], missing)
+        translations.update(fresh)
+    if not translations and errors:
+        error = next(iter(errors.values()))
+        raise APIError(error['message'], error['statusCode'], error['service'])
+    return {lang: translations[lang] for lang in target_langs if lang in translations}, errors
+
+
+def _reuse_metadata(stored: Dict[str, Any], target_langs: List[str]) -> Dict[str, Any]:
+    return {
+        'sourceLanguage': stored['sourceLanguage'],
+        'targetLanguage': target_langs[0],
+        'targetLanguages': target_langs,
+        'contentHash': stored.get('contentHash'),
+        'meetingId': stored.get('meetingId'),
+        'processedAt': datetime.now().isoformat(),
+        'traceId': tracing.current_trace_id(),
+    }
@@ -0,0 +1,401 @@
+"""
+Timeouts, retries, hedging and circuit breaking for upstream calls.
+
+Each service owns an ``Upstream`` that wraps its HTTP calls:
+
+- Latency of successful calls is tracked per endpoint (and request size
+  class, so a 2-hour recording is not judged by 20-second chunks). Once an
+  endpoint has enough samples its timeout becomes a multiple of the observed
+  p99, never above the fixed ceiling the call site passes in; a retry after a
+  timeout gets the full ceiling.
+- Idempotent calls still waiting at the endpoint's p95 get a duplicate
+  request; whichever answers first is used. Hedges are capped at a share of
+  calls so a slow upstream is not sent double the load.
+- Connection errors, timeouts and 429/502/503/504 answers are retried with
+  jittered exponential backoff (honouring a short Retry-After).
+- Inside a request deadline (``deadlines.budget``) no attempt outlives it:
+  timeouts are capped at the time left, retries that would not fit are
+  skipped, and a call with no time left fails with a 504 ``APIError``.
+- A per-service circuit breaker opens after consecutive failures and rejects
+  calls with a 503 ``APIError`` until a probe call succeeds, so workers are
+  not tied up waiting on an upstream that is down.
+
+State is per process; each gunicorn worker learns its own latencies.
+"""
+import os
+import math
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Dict, Optional
+
+import httpx
+import requests
+from django.conf import settings
+
+from . import deadlines, metrics, tracing
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+RETRYABLE_ERRORS = (requests.ConnectionError, requests.Timeout, httpx.TransportError)
+TIMEOUT_ERRORS = (requests.Timeout, httpx.TimeoutException)
+
+
+def _is_failure(status_code: int) -> bool:
+    """Answers that say the upstream itself is unhealthy (4xx other than 429 are the caller's problem)"""
+    return status_code >= 500 or status_code == 429
+
+
+def size_class(nbytes: Optional[int]) -> int:
+    """Coarse request size bucket: 0 below 64 KB, then one per factor of four"""
+    if not nbytes or nbytes < 64 * 1024:
+        return 0
+    return int(math.log(nbytes / (64 * 1024), 4)) + 1
+
+
+class LatencyTracker:
+    """Sliding window of recent successful call durations"""
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self.samples.append(seconds)
+
+    def percentile(self, p: float, min_samples: int) -> Optional[float]:
+        with self._lock:
+            if len(self.samples) < min_samples:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+class CircuitBreaker:
+    """
+    Closed until ``failure_threshold`` consecutive failures, then open for
+    ``reset_timeout`` seconds; after that one probe call is let through
+    (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, service: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.service = service
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.opened_at + self.reset_timeout - time.monotonic()))
+
+    def before_call(self) -> None:
+        """Raise a 503 ``APIError`` instead of calling an upstream known to be down"""
+        from .services import APIError
+
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+        metrics.record_circuit_rejection(self.service)
+        raise APIError(
+            f"{self.service.capitalize()} is temporarily unavailable, please retry in {self.retry_after()}s",
+            503, self.service, retry_after=self.retry_after(),
+        )
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit for {self.service} closed")
+                metrics.set_circuit_open(self.service, False)
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def release(self) -> None:
+        """Give up a half-open probe that ended without an answer either way"""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                if self.state == self.CLOSED:
+                    logger.warning(f"Circuit for {self.service} opened after {self.failures} consecutive failures")
+                    metrics.set_circuit_open(self.service, True)
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._probing = False
+
+
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+_hedge_pool_pid: Optional[int] = None
+_hedge_pool_lock = threading.Lock()
+
+
+def _get_hedge_pool() -> ThreadPoolExecutor:
+    """Threads that run hedged sync calls (recreated after a fork)"""
+    global _hedge_pool, _hedge_pool_pid
+    pid = os.getpid()
+    if _hedge_pool is None or _hedge_pool_pid != pid:
+        with _hedge_pool_lock:
+            if _hedge_pool is None or _hedge_pool_pid != pid:
+                _hedge_pool = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'UPSTREAM_HEDGE_POOL_SIZE', 64), thread_name_prefix='upstream-hedge',
+                )
+                _hedge_pool_pid = pid
+    return _hedge_pool
+
+
+def _close_quietly(future) -> None:
+    try:
+        future.result().close()
+    except Exception:
+        pass
+
+
+class Upstream:
+    """Resilience policy for one upstream service; ``send(timeout)`` performs a single HTTP request"""
+
+    def __init__(self, service: str):
+        self.service = service
+        self.adaptive_timeouts = getattr(settings, 'UPSTREAM_ADAPTIVE_TIMEOUTS', True)
+        self.timeout_multiplier = getattr(settings, 'UPSTREAM_TIMEOUT_MULTIPLIER', 3.0)
+        self.min_timeout = getattr(settings, 'UPSTREAM_TIMEOUT_MIN_SECONDS', 5.0)
+        self.window = getattr(settings, 'UPSTREAM_LATENCY_WINDOW', 200)
+        self.min_samples = getattr(settings, 'UPSTREAM_LATENCY_MIN_SAMPLES', 20)
+        self.hedging = getattr(settings, 'UPSTREAM_HEDGING_ENABLED', True)
+        self.hedge_max_ratio = getattr(settings, 'UPSTREAM_HEDGE_MAX_RATIO', 0.1)
+        self.hedge_max_bytes = getattr(settings, 'UPSTREAM_HEDGE_MAX_BODY_BYTES', 4 * 1024 * 1024)
+        self.retry_attempts = getattr(settings, 'UPSTREAM_RETRY_ATTEMPTS', 2)
+        self.retry_base_delay = getattr(settings, 'UPSTREAM_RETRY_BASE_DELAY', 0.5)
+        self.retry_max_delay = getattr(settings, 'UPSTREAM_RETRY_MAX_DELAY', 8.0)
+        self.breaker = CircuitBreaker(
+            service,
+            failure_threshold=getattr(settings, 'CIRCUIT_BREAKER_FAILURES', 5),
+            reset_timeout=getattr(settings, 'CIRCUIT_BREAKER_RESET_SECONDS', 30.0),
+        )
+        self.trackers: Dict[tuple, LatencyTracker] = {}
+        self.calls = 0
+        self.hedges = 0
+        self._lock = threading.Lock()
+
+    def tracker(self, endpoint: str, size: Optional[int]) -> LatencyTracker:
+        key = (endpoint, size_class(size))
+        tracker = self.trackers.get(key)
+        if tracker is None:
+            with self._lock:
+                tracker = self.trackers.setdefault(key, LatencyTracker(self.window))
+        return tracker
+
+    def timeout(self, tracker: LatencyTracker, ceiling: float) -> float:
+        if not self.adaptive_timeouts:
+            return ceiling
+        p99 = tracker.percentile(99, self.min_samples)
+        if p99 is None:
+            return ceiling
+        return min(ceiling, max(self.min_timeout, p99 * self.timeout_multiplier))
+
+    def _hedge_delay(self, tracker: LatencyTracker, size: Optional[int], hedge: bool) -> Optional[float]:
+        if not (hedge and self.hedging) or (size or 0) > self.hedge_max_bytes:
+            return None
+        if self.breaker.state != CircuitBreaker.CLOSED:
+            return None
+        return tracker.percentile(95, self.min_samples)
+
+    def _take_hedge(self) -> bool:
+        with self._lock:
+            if self.hedges >= self.hedge_max_ratio * self.calls:
+                return False
+            self.hedges += 1
+            return True
+
+    def _backoff(self, attempt: int, response=None) -> float:
+        """Full-jitter exponential backoff, at least a short Retry-After"""
+        delay = random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), self.retry_max_delay))
+        return delay
+
+    def _outcome(self, tracker: LatencyTracker, response, elapsed: float) -> bool:
+        """Record a response with the breaker and tracker; True when it is worth retrying"""
+        if _is_failure(response.status_code):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+            tracker.observe(elapsed)
+        return response.status_code in RETRYABLE_STATUSES
+
+    def call(self, endpoint: str, send: Callable[[float], requests.Response], ceiling: float,
+             size: Optional[int] = None, hedge: bool = True, retry: bool = True) -> requests.Response:
+        """Send a request with adaptive timeout, hedging, retries and the circuit breaker"""
+        tracker = self.tracker(endpoint, size)
+        attempts = 1 + (self.retry_attempts if retry else 0)
+        timed_out = False
+        for attempt in range(attempts):
+            timeout, capped = deadlines.clamp(ceiling if timed_out else self.timeout(tracker, ceiling),
+                                              self.service, endpoint)
+            self.breaker.before_call()
+            with self._lock:
+                self.calls += 1
+            start = time.monotonic()
+            try:
+                response = self._send(endpoint, send, timeout, self._hedge_delay(tracker, size, hedge))
+            except RETRYABLE_ERRORS as e:
+                timed_out = isinstance(e, TIMEOUT_ERRORS)
+                if timed_out and capped:
+                    # Cut short by the request deadline, not a sign the upstream is down
+                    self.breaker.release()
+                    raise deadlines.exceeded(self.service, endpoint) from e
+                self.breaker.record_failure()
+                delay = self._backoff(attempt)
+                if attempt + 1 >= attempts or deadlines.expires_within(delay):
+                    raise
+                logger.warning(f"{self.service} {endpoint} attempt {attempt + 1} failed ({type(e).__name__}), retrying")
+                response = None
+            except BaseException:
+                self.breaker.release()
+                raise
+            else:
+                retryable = self._outcome(tracker, response, time.monotonic() - start)
+                delay = self._backoff(attempt, response)
+                if not retryable or attempt + 1 >= attempts or deadlines.expires_within(delay):
+                    tracing.set_attribute('upstream.attempts', attempt + 1)
+                    return response
+                logger.warning(f"{self.service} {endpoint} answered {response.status_code}, retrying")
+                response.close()
+            metrics.record_retry(self.service, endpoint)
+            time.sleep(delay)
+
+    def _send(self, endpoint: str, send: Callable[[float], requests.Response], timeout: float,
+              hedge_delay: Optional[float]) -> requests.Response:
+        if hedge_delay is None:
+            return send(timeout)
+        pool = _get_hedge_pool()
+        primary = pool.submit(tracing.bind(send), timeout)
+        done, _ = wait([primary], timeout=hedge_delay)
+        if done or not self._take_hedge():
+            return primary.result()
+        metrics.record_hedge(self.service, endpoint, 'sent')
+        tracing.set_attribute('upstream.hedged', True)
+        hedged = pool.submit(tracing.bind(send), timeout)
+        pending = {primary, hedged}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if response.status_code not in RETRYABLE_STATUSES or not pending:
+                    if future is hedged:
+                        metrics.record_hedge(self.service, endpoint, 'won')
+                    for other in pending:
+                        other.add_done_callback(_close_quietly)
+                    return response
+                response.close()
+        raise error
+
+    async def acall(self, endpoint: str, send: Callable[[float], Awaitable[httpx.Response]], ceiling: float,
+                    size: Optional[int] = None, hedge: bool = True, retry: bool = True) -> httpx.Response:
+        """Async variant of ``call``; ``send`` must build a fresh request body each time"""
+        tracker = self.tracker(endpoint, size)
+        attempts = 1 + (self.retry_attempts if retry else 0)
+        timed_out = False
+        for attempt in range(attempts):
+            timeout, capped = deadlines.clamp(ceiling if timed_out else self.timeout(tracker, ceiling),
+                                              self.service, endpoint)
+            self.breaker.before_call()
+            with self._lock:
+                self.calls += 1
+            start = time.monotonic()
+            try:
+                response = await self._asend(endpoint, send, timeout, self._hedge_delay(tracker, size, hedge))
+            except RETRYABLE_ERRORS as e:
+                timed_out = isinstance(e, TIMEOUT_ERRORS)
+                if timed_out and capped:
+                    # Cut short by the request deadline, not a sign the upstream is down
+                    self.breaker.release()
+                    raise deadlines.exceeded(self.service, endpoint) from e
+                self.breaker.record_failure()
+                delay = self._backoff(attempt)
+                if attempt + 1 >= attempts or deadlines.expires_within(delay):
+                    raise
+                logger.warning(f"{self.service} {endpoint} attempt {attempt + 1} failed ({type(e).__name__}), retrying")
+                response = None
+            except BaseException:
+                self.breaker.release()
+                raise
+            else:
+                retryable = self._outcome(tracker, response, time.monotonic() - start)
+                delay = self._backoff(attempt, response)
+                if not retryable or attempt + 1 >= attempts or deadlines.expires_within(delay):
+                    tracing.set_attribute('upstream.attempts', attempt + 1)
+                    return response
+                logger.warning(f"{self.service} {endpoint} answered {response.status_code}, retrying")
+            metrics.record_retry(self.service, endpoint)
+            await asyncio.sleep(delay)
+
+    async def _asend(self, endpoint: str, send: Callable[[float], Awaitable[httpx.Response]], timeout: float,
+                     hedge_delay: Optional[float]) -> httpx.Response:
+        if hedge_delay is None:
+            return await send(timeout)
+        primary = asyncio.ensure_future(send(timeout))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=hedge_delay)
+            if done or not self._take_hedge():
+                return await primary
+            metrics.record_hedge(self.service, endpoint, 'sent')
+            tracing.set_attribute('upstream.hedged', True)
+            hedged = asyncio.ensure_future(send(timeout))
+            pending = {primary, hedged}
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    response = task.result()
+                    if response.status_code not in RETRYABLE_STATUSES or not pending:
+                        if task is hedged:
+                            metrics.record_hedge(self.service, endpoint, 'won')
+                        return response
+            raise error
+        finally:
+            # The slower request is abandoned; httpx releases its connection on cancel
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            'circuit': self.breaker.state,
+            'consecutiveFailures': self.breaker.failures,
+            'calls': self.calls,
+            'hedges': self.hedges,
+            'timeouts': {
+                f"{endpoint}:{size}": round(self.timeout(tracker, float('inf')), 3)
+                for (endpoint, size), tracker in list(self.trackers.items())
+                if tracker.percentile(99, self.min_samples) is not None
+            },
+        }
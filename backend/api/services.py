@@ -3,22 +3,42 @@ Service layer for Bhashini and Gemini integrations with comprehensive error hand
 Implements complete Bhashini API pipeline according to official documentation.
 """
 import os
+import re
 import json
+import asyncio
 import logging
 import requests
 import base64
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, Union, Callable
+
+from django.conf import settings
+
+from .audio import (
+    ASR_SAMPLE_RATE, AudioSource, StreamingJSONBody, TimeMap, load_audio, plan_chunks, export_wav, normalize_wav,
+    trim_silence, wav_params
+)
+from .cache import TTLCache, content_key
+from .http import HTTPClient, AsyncHTTPClient
+from .resilience import Upstream
+from .task_graph import TaskGraph
+from . import logs, metrics, tracing
 
 logger = logging.getLogger(__name__)
 
+# Largest recording accepted on any path: direct, batch and chunked uploads
+MAX_AUDIO_BYTES = 50 * 1024 * 1024
+
 class APIError(Exception):
-    """Custom exception for API errors"""
-    def __init__(self, message: str, status_code: int = 500, service: str = "unknown"):
+    """Custom exception for API errors; ``retry_after`` (seconds) is sent as a Retry-After header"""
+    def __init__(self, message: str, status_code: int = 500, service: str = "unknown", retry_after: Optional[int] = None):
         self.message = message
         self.status_code = status_code
         self.service = service
+        self.retry_after = retry_after
         super().__init__(self.message)
 
 class BhashiniService:
@@ -32,24 +52,65 @@ class BhashiniService:
             os.getenv('BHASHINI_API_KEY') or 
             os.getenv('BHASHINI_AUTH_TOKEN')
         )
-        self.base_url = "https://meity-auth.ulcacontrib.org"
-        self.compute_url = "https://dhruva-api.bhashini.gov.in/services/inference/pipeline"
+        self.base_url = os.getenv('BHASHINI_CONFIG_BASE_URL', "https://meity-auth.ulcacontrib.org")
+        self.compute_url = os.getenv('BHASHINI_COMPUTE_URL', "https://dhruva-api.bhashini.gov.in/services/inference/pipeline")
         
         # Available pipeline IDs from documentation
         self.pipeline_id = "64392f96daac500b55c543cd"  # MeitY pipeline
         
+        # Pipeline configs rarely change for a given language pair, so keep them around
+        self.pipeline_cache = TTLCache(
+            maxsize=getattr(settings, 'BHASHINI_PIPELINE_CACHE_SIZE', 128),
+            ttl=getattr(settings, 'BHASHINI_PIPELINE_CACHE_TTL', 6 * 60 * 60),
+            name='pipeline_config',
+        )
+        
+        # Shared keep-alive connection pool; config lookups are cheap so the auth host gets a small pool
+        self.http = HTTPClient(
+            'bhashini',
+            host_pool_sizes={
+                self.base_url: getattr(settings, 'BHASHINI_CONFIG_POOL_MAXSIZE', 4),
+                self.compute_url: getattr(settings, 'BHASHINI_COMPUTE_POOL_MAXSIZE', 10),
+            },
+            default_pool_size=getattr(settings, 'HTTP_POOL_MAXSIZE', 10),
+        )
+        self.async_http = AsyncHTTPClient('bhashini', max_connections=getattr(settings, 'ASYNC_HTTP_MAX_CONNECTIONS', 200))
+        self.upstream = Upstream('bhashini')
+        
         if not self.user_id:
             raise APIError("Bhashini User ID not configured. Please set BHASHINI_USER_ID environment variable.", 500, "bhashini")
         
         if not self.api_key:
             raise APIError("Bhashini API Key not configured. Please set ULCA_API_KEY, BHASHINI_API_KEY, or BHASHINI_AUTH_TOKEN environment variable.", 500, "bhashini")
         
-        logger.info(f"Bhashini service initialized with User ID: {self.user_id[:8]}... and API Key: {self.api_key[:8]}...")
+        logger.info("Bhashini service initialized (user ID and API key configured)")
+    
+    def get_pipeline_config(self, source_lang: str, target_lang: str, force_refresh: bool = False,
+                            audio_input: bool = True) -> Dict[str, Any]:
+        """Pipeline config for the minimal task graph of a request (see ``TaskGraph.plan``)"""
+        return self.get_graph_config(TaskGraph.plan(source_lang, target_lang, audio_input), force_refresh)
+    
+    def get_graph_config(self, graph: TaskGraph, force_refresh: bool = False) -> Dict[str, Any]:
+        """Get pipeline configuration from Bhashini, served from the TTL cache when possible"""
+        key = self._pipeline_cache_key(graph)
+        if force_refresh:
+            self.pipeline_cache.invalidate(key)
+        return self.pipeline_cache.get_or_load(key, lambda: self._fetch_pipeline_config(graph))
+    
+    def prime_pipeline_config(self, source_lang: str, target_lang: str, pipeline_config: Dict[str, Any]) -> None:
+        """Seed the config cache, e.g. with a config checkpointed by an earlier attempt on another worker"""
+        key = self._pipeline_cache_key(TaskGraph.plan(source_lang, target_lang))
+        if self.pipeline_cache.get(key) is None:
+            self.pipeline_cache.set(key, pipeline_config)
     
-    def get_pipeline_config(self, source_lang: str, target_lang: str) -> Dict[str, Any]:
-        """Get pipeline configuration from Bhashini"""
+    def _pipeline_cache_key(self, graph: TaskGraph) -> tuple:
+        return (*graph.key, self.pipeline_id)
+    
+    def _fetch_pipeline_config(self, graph: TaskGraph) -> Dict[str, Any]:
+        """Request pipeline configuration from Bhashini"""
+        source_lang, target_lang = graph.source_lang, graph.target_lang
         try:
-            logger.info(f"Getting Bhashini pipeline config for tasks: ['asr', 'translation']")
+            logger.info(f"Getting Bhashini pipeline config for tasks: {list(graph.tasks)}")
             
             auth_url = f"{self.base_url}/ulca/apis/v0/model/getModelsPipeline"
             headers = {
@@ -58,56 +119,45 @@ class BhashiniService:
                 'Content-Type': 'application/json'
             }
             
-            # Build pipeline tasks based on your working Colab code
-            tasks = [
-                {
-                    "taskType": "asr",
-                    "config": {
-                        "language": {
-                            "sourceLanguage": source_lang
-                        }
-                    }
-                },
-                {
-                    "taskType": "translation",
-                    "config": {
-                        "language": {
-                            "sourceLanguage": source_lang,
-                            "targetLanguage": target_lang
-                        }
-                    }
-                }
-            ]
-            
             payload = {
-                "pipelineTasks": tasks,
+                "pipelineTasks": graph.config_tasks(),
                 "pipelineRequestConfig": {
                     "pipelineId": self.pipeline_id
                 }
             }
             
             logger.info(f"Sending pipeline config request to: {auth_url}")
-            logger.info(f"Headers: userID={self.user_id[:8]}..., ulcaApiKey={self.api_key[:8]}...")
-            logger.info(f"Payload: {json.dumps(payload, indent=2)}")
+            logger.info("Payload: %s", logs.payload(payload))
             
-            response = requests.post(auth_url, headers=headers, json=payload, timeout=30)
+            with metrics.time_stage('pipeline_config'), tracing.span('bhashini.pipeline_config', {
+                'language.source': source_lang, 'language.target': target_lang, 'bhashini.tasks': graph.name,
+            }, kind=tracing.KIND_CLIENT) as span:
+                response = self.upstream.call(
+                    'pipeline_config',
+                    lambda timeout: self.http.post(auth_url, headers=headers, json=payload, timeout=timeout),
+                    ceiling=30,
+                )
+                span.set_attribute('http.status_code', response.status_code)
             
             logger.info(f"Pipeline config response status: {response.status_code}")
             
             if response.status_code != 200:
-                logger.error(f"Bhashini pipeline config failed: {response.status_code} - {response.text}")
+                logger.error("Bhashini pipeline config failed: %s - %s", response.status_code, logs.payload(response.text))
                 raise APIError(f"Bhashini pipeline configuration failed: {response.status_code} - {response.text}", response.status_code, "bhashini")
             
-            data = response.json()
-            logger.info(f"Pipeline config response: {json.dumps(data, indent=2)}")
+            with metrics.time_stage('json_parse'):
+                data = response.json()
+            logger.info("Pipeline config response: %s", logs.payload(data))
             
             if 'pipelineResponseConfig' not in data:
-                logger.error(f"Invalid Bhashini pipeline config response: {data}")
+                logger.error("Invalid Bhashini pipeline config response: %s", logs.payload(data))
                 raise APIError("Invalid Bhashini pipeline configuration response", 500, "bhashini")
             
             logger.info("Bhashini pipeline config obtained successfully")
             return data
             
+        except APIError:
+            raise
         except requests.exceptions.RequestException as e:
             logger.error(f"Bhashini pipeline config request failed: {str(e)}")
             raise APIError(f"Bhashini pipeline configuration request failed: {str(e)}", 500, "bhashini")
@@ -115,8 +165,171 @@ class BhashiniService:
             logger.error(f"Unexpected error in Bhashini pipeline config: {str(e)}")
             raise APIError(f"Bhashini pipeline configuration error: {str(e)}", 500, "bhashini")
     
-    def process_audio(self, audio_base64: str, source_lang: str, target_lang: str, audio_format: str) -> Dict[str, Any]:
-        """Process audio through Bhashini ASR and Translation pipeline"""
+    def _resolve_services(self, pipeline_config: Dict[str, Any], graph: TaskGraph) -> Dict[str, Any]:
+        """Pick each task's service and the compute endpoint out of a pipeline config"""
+        try:
+            return graph.resolve(pipeline_config, self.compute_url)
+        except LookupError as e:
+            raise APIError(str(e), 500, "bhashini")
+    
+    @staticmethod
+    def _is_stale_config_error(status_code: int, body: str) -> bool:
+        """Whether a compute failure suggests the cached pipeline config is no longer valid"""
+        if status_code in (401, 403):
+            return True
+        if 400 <= status_code < 500:
+            lowered = (body or '').lower()
+            return any(marker in lowered for marker in ('serviceid', 'service id', 'invalid service', 'unauthorized', 'api key'))
+        return False
+    
+    def _build_compute_request(self, pipeline_config: Dict[str, Any], graph: TaskGraph, audio: Union[str, AudioSource],
+                               audio_format: str, sampling_rate: int) -> tuple:
+        """Return (endpoint, headers, body) for a compute call on recorded audio"""
+        resolved = self._resolve_services(pipeline_config, graph)
+        compute_endpoint = resolved['compute_endpoint']
+        auth_token = resolved['auth_token']
+        
+        compute_payload = graph.compute_payload(
+            resolved,
+            audio_content=audio if isinstance(audio, str) else StreamingJSONBody.PLACEHOLDER,
+            audio_format=audio_format,
+            sampling_rate=sampling_rate,
+        )
+        
+        # Set up headers for compute request
+        headers = {
+            'Content-Type': 'application/json'
+        }
+        
+        if auth_token:
+            headers['Authorization'] = auth_token
+        
+        logger.info(f"Sending compute request to: {compute_endpoint}")
+        logger.info(f"Compute payload tasks: {list(graph.tasks)}")
+        logger.info(f"Auth token: {'present' if auth_token else 'None'}")
+        
+        if isinstance(audio, str):
+            body = json.dumps(compute_payload).encode('utf-8')
+        else:
+            body = StreamingJSONBody(compute_payload, audio)
+        
+        return compute_endpoint, headers, body
+    
+    def _post_compute(self, graph: TaskGraph, build_request: Callable[[Dict[str, Any]], tuple]) -> requests.Response:
+        """
+        POST a compute request built from the cached pipeline config for a task graph.
+        
+        A cached config can go stale (rotated inference key, retired serviceId);
+        on such errors it is refreshed once and the request rebuilt and retried.
+        """
+        for attempt in range(2):
+            pipeline_config = self.get_graph_config(graph)
+            compute_endpoint, headers, body = build_request(pipeline_config)
+            
+            with metrics.time_stage('bhashini_compute'), tracing.span('bhashini.compute', {
+                'language.source': graph.source_lang, 'language.target': graph.target_lang,
+                'bhashini.tasks': graph.name, 'http.request_content_length': len(body), 'retry.attempt': attempt,
+            }, kind=tracing.KIND_CLIENT) as span:
+                response = self.upstream.call(
+                    'compute',
+                    lambda timeout: self.http.post(compute_endpoint, headers=headers, data=body, timeout=timeout),
+                    ceiling=120, size=len(body),
+                )
+                span.set_attribute('http.status_code', response.status_code)
+            
+            logger.info(f"Compute response status: {response.status_code}")
+            
+            if response.status_code == 200:
+                return response
+            
+            if attempt == 0 and self._is_stale_config_error(response.status_code, response.text):
+                logger.warning(f"Bhashini compute rejected cached pipeline config ({response.status_code}), refreshing")
+                self.pipeline_cache.invalidate(self._pipeline_cache_key(graph), pipeline_config)
+                continue
+            
+            logger.error("Bhashini compute request failed: %s - %s", response.status_code, logs.payload(response.text))
+            raise APIError(f"Bhashini processing failed: {response.status_code} - {response.text}", response.status_code, "bhashini")
+    
+    def _build_translation_request(self, pipeline_config: Dict[str, Any], graph: TaskGraph, texts: List[str]) -> tuple:
+        """Return (endpoint, headers, body) for a text-only translation compute call"""
+        resolved = self._resolve_services(pipeline_config, graph)
+        payload = graph.compute_payload(resolved, texts=texts)
+        headers = {'Content-Type': 'application/json'}
+        if resolved['auth_token']:
+            headers['Authorization'] = resolved['auth_token']
+        return resolved['compute_endpoint'], headers, json.dumps(payload).encode('utf-8')
+    
+    def translate_text(self, text: str, source_lang: str, target_lang: str) -> str:
+        """
+        Translate already transcribed text with the pair's translation service.
+        
+        Long text is sent as sentence-bounded pieces in one request and the
+        translated pieces are joined back in order.
+        """
+        source_lang = source_lang.split('-')[0].lower()
+        target_lang = target_lang.split('-')[0].lower()
+        if not text.strip() or source_lang == target_lang:
+            return text
+        
+        max_chars = getattr(settings, 'BHASHINI_TRANSLATION_MAX_CHARS', 2000)
+        pieces = split_into_windows(text, max(1, max_chars // 4))
+        try:
+            logger.info(f"Translating {len(text)} chars ({len(pieces)} pieces): {source_lang} -> {target_lang}")
+            with tracing.span('bhashini.translate', {
+                'language.source': source_lang, 'language.target': target_lang,
+                'text.chars': len(text), 'text.pieces': len(pieces),
+            }):
+                graph = TaskGraph.plan(source_lang, target_lang, audio_input=False)
+                response = self._post_compute(
+                    graph, lambda pipeline_config: self._build_translation_request(pipeline_config, graph, pieces),
+                )
+            with metrics.time_stage('json_parse'):
+                result = response.json()
+            outputs = []
+            for task in result.get('pipelineResponse', []):
+                if task.get('taskType') == 'translation':
+                    outputs = [item.get('target', '') for item in task.get('output') or []]
+            return " ".join(output.strip() for output in outputs if output.strip())
+        except APIError:
+            raise
+        except Exception as e:
+            logger.error(f"Bhashini translation error: {str(e)}")
+            raise APIError(f"Translation to {target_lang} failed: {str(e)}", 500, "bhashini")
+    
+    def translate_many(self, text: str, source_lang: str,
+                       target_langs: List[str]) -> Tuple[Dict[str, str], Dict[str, 'APIError']]:
+        """
+        Translate ``text`` into every language in ``target_langs`` concurrently.
+
+        Returns (translations, errors): a language that fails lands in
+        ``errors`` without costing the others their translations.
+        """
+        if not target_langs:
+            return {}, {}
+        concurrency = max(1, getattr(settings, 'BHASHINI_TRANSLATION_CONCURRENCY', 4))
+        translations, errors = {}, {}
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(target_langs)), thread_name_prefix='nmt') as executor:
+            translate = tracing.bind(self.translate_text)
+            futures = {lang: executor.submit(translate, text, source_lang, lang) for lang in target_langs}
+            for lang, future in futures.items():
+                try:
+                    translations[lang] = future.result()
+                except APIError as e:
+                    errors[lang] = e
+                except Exception as e:
+                    errors[lang] = APIError(f"Translation to {lang} failed: {str(e)}", 500, "bhashini")
+        for lang, error in errors.items():
+            logger.warning(f"Translation to {lang} failed: {error.message}")
+        return translations, errors
+    
+    def process_audio(self, audio: Union[str, AudioSource], source_lang: str, target_lang: str, audio_format: str,
+                      sampling_rate: int = 16000) -> Dict[str, Any]:
+        """
+        Process audio through Bhashini ASR and Translation pipeline.
+        
+        ``audio`` is either a base64 string or an ``AudioSource``; the latter is
+        base64 encoded while the request body is being sent.
+        """
         try:
             # Normalize language codes (remove country codes like en-US -> en)
             source_lang = source_lang.split('-')[0].lower()
@@ -124,105 +337,86 @@ class BhashiniService:
             
             logger.info(f"Processing audio: {source_lang} -> {target_lang}, format: {audio_format}")
             
-            # Get pipeline configuration
-            pipeline_config = self.get_pipeline_config(source_lang, target_lang)
-            
-            # Extract service configurations
-            asr_service = None
-            translation_service = None
-            
-            # Find service configurations
-            for task_config in pipeline_config['pipelineResponseConfig']:
-                if task_config['taskType'] == 'asr' and not asr_service:
-                    # Find service for source language
-                    for config in task_config['config']:
-                        if config['language']['sourceLanguage'] == source_lang:
-                            asr_service = config
-                            break
-                elif task_config['taskType'] == 'translation' and not translation_service:
-                    # Find service for language pair
-                    for config in task_config['config']:
-                        if (config['language']['sourceLanguage'] == source_lang and 
-                            config['language']['targetLanguage'] == target_lang):
-                            translation_service = config
-                            break
-            
-            if not asr_service:
-                raise APIError(f"ASR service not found for language: {source_lang}", 500, "bhashini")
-            
-            if not translation_service:
-                raise APIError(f"Translation service not found for {source_lang} -> {target_lang}", 500, "bhashini")
-            
-            # Get compute endpoint and auth token
-            compute_endpoint = self.compute_url
-            auth_token = None
-            
-            if 'pipelineInferenceAPIEndPoint' in pipeline_config:
-                endpoint_config = pipeline_config['pipelineInferenceAPIEndPoint']
-                compute_endpoint = endpoint_config.get('callbackUrl', self.compute_url)
-                if 'inferenceApiKey' in endpoint_config:
-                    auth_name = endpoint_config['inferenceApiKey']['name']
-                    auth_value = endpoint_config['inferenceApiKey']['value']
-                    auth_token = auth_value
-            
-            # Build compute request following your Colab code structure
-            pipeline_tasks = [
-                {
-                    "taskType": "asr",
-                    "config": {
-                        "language": {
-                            "sourceLanguage": source_lang
-                        },
-                        "serviceId": asr_service['serviceId'],
-                        "audioFormat": audio_format,
-                        "samplingRate": 16000
-                    }
-                },
-                {
-                    "taskType": "translation",
-                    "config": {
-                        "language": {
-                            "sourceLanguage": source_lang,
-                            "targetLanguage": target_lang
-                        },
-                        "serviceId": translation_service['serviceId']
-                    }
-                }
-            ]
-            
-            # Build the compute payload exactly like your Colab code
-            compute_payload = {
-                "pipelineTasks": pipeline_tasks,
-                "inputData": {
-                    "audio": [{"audioContent": audio_base64}],
-                    "input": [{"source": ""}]  # Empty string instead of null
-                }
-            }
-            
-            # Set up headers for compute request
-            headers = {
-                'Content-Type': 'application/json'
-            }
+            # Same-language recordings need ASR only
+            graph = TaskGraph.plan(source_lang, target_lang)
+            response = self._post_compute(
+                graph,
+                lambda pipeline_config: self._build_compute_request(
+                    pipeline_config, graph, audio, audio_format, sampling_rate
+                ),
+            )
             
-            if auth_token:
-                headers['Authorization'] = auth_token
+            with metrics.time_stage('json_parse'):
+                result = response.json()
+            logger.info("Bhashini processing completed successfully")
+            logger.info("Compute result: %s", logs.payload(result))
             
-            logger.info(f"Sending compute request to: {compute_endpoint}")
-            logger.info(f"Compute payload tasks: {[task['taskType'] for task in pipeline_tasks]}")
-            logger.info(f"Auth token: {auth_token[:20] if auth_token else 'None'}...")
+            return result
             
-            response = requests.post(compute_endpoint, headers=headers, json=compute_payload, timeout=120)
+        except APIError:
+            raise
+        except Exception as e:
+            logger.error(f"Bhashini processing error: {str(e)}")
+            raise APIError(f"Audio processing failed: {str(e)}", 500, "bhashini")
+    
+    async def aget_graph_config(self, graph: TaskGraph) -> Dict[str, Any]:
+        """Async access to the pipeline config cache; misses are fetched on a worker thread"""
+        cached = self.pipeline_cache.get(self._pipeline_cache_key(graph))
+        if cached is not None:
+            metrics.record_cache('pipeline_config', True)
+            return cached
+        return await asyncio.to_thread(self.get_graph_config, graph)
+    
+    async def aprocess_audio(self, audio: Union[str, AudioSource], source_lang: str, target_lang: str,
+                             audio_format: str, sampling_rate: int = 16000) -> Dict[str, Any]:
+        """Async variant of ``process_audio`` on the shared async HTTP client"""
+        try:
+            source_lang = source_lang.split('-')[0].lower()
+            target_lang = target_lang.split('-')[0].lower()
             
-            logger.info(f"Compute response status: {response.status_code}")
+            logger.info(f"Processing audio (async): {source_lang} -> {target_lang}, format: {audio_format}")
             
-            if response.status_code != 200:
-                logger.error(f"Bhashini compute request failed: {response.status_code} - {response.text}")
+            graph = TaskGraph.plan(source_lang, target_lang)
+            for attempt in range(2):
+                pipeline_config = await self.aget_graph_config(graph)
+                compute_endpoint, headers, body = self._build_compute_request(
+                    pipeline_config, graph, audio, audio_format, sampling_rate
+                )
+                if isinstance(body, StreamingJSONBody):
+                    # httpx would pick the blocking __iter__ over __aiter__ for a plain object
+                    headers['Content-Length'] = str(len(body))
+                    content = lambda: aiter(body)
+                else:
+                    content = lambda: body
+                
+                with metrics.time_stage('bhashini_compute'), tracing.span('bhashini.compute', {
+                    'language.source': source_lang, 'language.target': target_lang,
+                    'bhashini.tasks': graph.name, 'http.request_content_length': len(body), 'retry.attempt': attempt,
+                }, kind=tracing.KIND_CLIENT) as span:
+                    # Each attempt or hedge needs its own body iterator
+                    response = await self.upstream.acall(
+                        'compute',
+                        lambda timeout: self.async_http.post(compute_endpoint, headers=headers, content=content(), timeout=timeout),
+                        ceiling=120, size=len(body),
+                    )
+                    span.set_attribute('http.status_code', response.status_code)
+                
+                logger.info(f"Compute response status: {response.status_code}")
+                
+                if response.status_code == 200:
+                    break
+                
+                if attempt == 0 and self._is_stale_config_error(response.status_code, response.text):
+                    logger.warning(f"Bhashini compute rejected cached pipeline config ({response.status_code}), refreshing")
+                    self.pipeline_cache.invalidate(self._pipeline_cache_key(graph), pipeline_config)
+                    continue
+                
+                logger.error("Bhashini compute request failed: %s - %s", response.status_code, logs.payload(response.text))
                 raise APIError(f"Bhashini processing failed: {response.status_code} - {response.text}", response.status_code, "bhashini")
             
-            result = response.json()
+            with metrics.time_stage('json_parse'):
+                result = response.json()
             logger.info("Bhashini processing completed successfully")
-            logger.info(f"Compute result: {json.dumps(result, indent=2)}")
-            
             return result
             
         except APIError:
@@ -231,6 +425,208 @@ class BhashiniService:
             logger.error(f"Bhashini processing error: {str(e)}")
             raise APIError(f"Audio processing failed: {str(e)}", 500, "bhashini")
     
+    async def atranscribe(self, audio: AudioSource, source_lang: str, target_lang: str) -> Dict[str, Any]:
+        """
+        Async variant of ``transcribe``.
+        
+        Audio preparation and the chunked path for long recordings run on worker
+        threads, since decoding, resampling and VAD are CPU-bound.
+        """
+        if getattr(settings, 'BHASHINI_CHUNKING_ENABLED', True):
+            min_seconds = getattr(settings, 'BHASHINI_CHUNK_MIN_AUDIO_SECONDS', 180)
+            if audio.size >= min_seconds * 1000:
+                return await asyncio.to_thread(self.transcribe, audio, source_lang, target_lang)
+        
+        upload, temporary, time_map = await asyncio.to_thread(self._prepare_audio, audio)
+        try:
+            result = await self.aprocess_audio(upload, source_lang, target_lang, upload.format,
+                                               sampling_rate=self._declared_sample_rate(upload))
+            return self._with_audio_stats(result, time_map)
+        finally:
+            for source in temporary:
+                source.cleanup()
+    
+    def transcribe(self, audio: AudioSource, source_lang: str, target_lang: str) -> Dict[str, Any]:
+        """
+        Transcribe and translate an uploaded recording.
+        
+        WAV uploads are first downmixed and resampled to 16 kHz mono and long
+        silences are trimmed. Recordings longer than BHASHINI_CHUNK_MIN_AUDIO_SECONDS
+        are split on silence and processed as concurrent chunks; everything else goes
+        out as a single compute call. Segment offsets refer to the original recording.
+        """
+        upload, temporary, time_map = self._prepare_audio(audio)
+        try:
+            if getattr(settings, 'BHASHINI_CHUNKING_ENABLED', True):
+                segment = self._load_long_audio(upload)
+                if segment is not None:
+                    result = self.process_audio_chunked(segment, source_lang, target_lang)
+                    if time_map is not None:
+                        for chunk in result['segments']:
+                            chunk['startMs'] = time_map.to_original(chunk['startMs'])
+                            chunk['endMs'] = time_map.to_original(chunk['endMs'])
+                    return self._with_audio_stats(result, time_map)
+            
+            result = self.process_audio(upload, source_lang, target_lang, upload.format,
+                                        sampling_rate=self._declared_sample_rate(upload))
+            return self._with_audio_stats(result, time_map)
+        finally:
+            for source in temporary:
+                source.cleanup()
+    
+    def _prepare_audio(self, audio: AudioSource) -> tuple:
+        """
+        Normalize and silence-trim a WAV upload before it is sent.
+        
+        Returns ``(upload, temporary sources to clean up, TimeMap or None)``.
+        """
+        temporary = []
+        upload = audio
+        with tracing.span('audio.normalize', {'audio.bytes': audio.size, 'audio.format': audio.format}) as span:
+            normalized = self._normalize_audio(upload)
+            span.set_attribute('audio.normalized_bytes', normalized.size if normalized is not None else None)
+        if normalized is not None:
+            temporary.append(normalized)
+            upload = normalized
+        
+        time_map = None
+        if getattr(settings, 'BHASHINI_VAD_ENABLED', True) and upload.format == 'wav':
+            try:
+                with tracing.span('audio.trim_silence', {'audio.bytes': upload.size}) as span:
+                    trimmed = trim_silence(
+                        upload,
+                        margin_db=getattr(settings, 'BHASHINI_VAD_MARGIN_DB', 16.0),
+                        min_silence_ms=getattr(settings, 'BHASHINI_VAD_MIN_SILENCE_MS', 1000),
+                        keep_silence_ms=getattr(settings, 'BHASHINI_VAD_KEEP_SILENCE_MS', 300),
+                        spool_dir=settings.AUDIO_SPOOL_DIR,
+                    )
+                    span.set_attribute('audio.trimmed_percent', trimmed[1].trimmed_percent if trimmed else 0.0)
+            except Exception as e:
+                logger.warning(f"Silence trimming failed, sending untrimmed audio: {str(e)}")
+                trimmed = None
+            if trimmed is not None:
+                upload, time_map = trimmed
+                temporary.append(upload)
+        
+        return upload, temporary, time_map
+    
+    @staticmethod
+    def _with_audio_stats(result: Dict[str, Any], time_map: Optional[TimeMap]) -> Dict[str, Any]:
+        """Attach how much silence was trimmed before upload"""
+        result['audio'] = {
+            'originalMs': time_map.original_ms if time_map else None,
+            'uploadedMs': time_map.trimmed_ms if time_map else None,
+            'trimmedPercent': time_map.trimmed_percent if time_map else 0.0,
+        }
+        return result
+    
+    def _normalize_audio(self, audio: AudioSource) -> Optional[AudioSource]:
+        """Return a 16 kHz mono copy of a PCM WAV upload, or None to send the original"""
+        if not getattr(settings, 'BHASHINI_NORMALIZE_AUDIO', True) or audio.format != 'wav':
+            # Compressed formats would only grow if re-encoded as PCM
+            return None
+        try:
+            return normalize_wav(audio, getattr(settings, 'BHASHINI_TARGET_SAMPLE_RATE', ASR_SAMPLE_RATE),
+                                 spool_dir=settings.AUDIO_SPOOL_DIR)
+        except Exception as e:
+            logger.warning(f"Could not normalize WAV audio, sending as uploaded: {str(e)}")
+            return None
+    
+    @staticmethod
+    def _declared_sample_rate(audio: AudioSource) -> int:
+        """The real sample rate for WAV uploads; other formats keep the 16 kHz default"""
+        params = wav_params(audio) if audio.format == 'wav' else None
+        return params.framerate if params is not None else ASR_SAMPLE_RATE
+    
+    def _load_long_audio(self, audio: AudioSource):
+        """Decode the recording if it is long enough to be worth chunking, otherwise None"""
+        min_seconds = getattr(settings, 'BHASHINI_CHUNK_MIN_AUDIO_SECONDS', 180)
+        # Even 8 kbps speech needs ~1KB per second, so smaller files cannot be long enough
+        if audio.size < min_seconds * 1000:
+            return None
+        
+        try:
+            segment = load_audio(audio)
+        except Exception as e:
+            logger.warning(f"Could not decode {audio.format} audio for chunking, sending as one request: {str(e)}")
+            return None
+        
+        if segment.duration_seconds <= min_seconds:
+            return None
+        return segment
+    
+    def process_audio_chunked(self, segment, source_lang: str, target_lang: str) -> Dict[str, Any]:
+        """
+        Split a long recording on silence and run ASR+translation on the chunks concurrently.
+        
+        Returns a compute-shaped result whose transcript/translation are the chunk outputs
+        joined in order, plus a ``segments`` list keeping each chunk's offsets.
+        """
+        source_lang = source_lang.split('-')[0].lower()
+        target_lang = target_lang.split('-')[0].lower()
+        
+        chunks = plan_chunks(
+            segment,
+            max_chunk_ms=int(getattr(settings, 'BHASHINI_CHUNK_MAX_SECONDS', 60) * 1000),
+            min_chunk_ms=int(getattr(settings, 'BHASHINI_CHUNK_MIN_SECONDS', 20) * 1000),
+        )
+        concurrency = max(1, getattr(settings, 'BHASHINI_CHUNK_CONCURRENCY', 4))
+        logger.info(f"Processing {segment.duration_seconds:.1f}s of audio as {len(chunks)} chunks (fan-out {concurrency})")
+        
+        # Warm the pipeline config cache once instead of racing N lookups
+        self.get_pipeline_config(source_lang, target_lang)
+        
+        @tracing.bind
+        def run_chunk(index: int, start_ms: int, end_ms: int) -> Dict[str, Any]:
+            chunk = segment[start_ms:end_ms]
+            wav_bytes = export_wav(chunk)
+            with metrics.time_stage('base64_encode'):
+                chunk_base64 = base64.b64encode(wav_bytes).decode('utf-8')
+            try:
+                with tracing.span('bhashini.chunk', {'chunk.index': index, 'chunk.start_ms': start_ms, 'chunk.end_ms': end_ms}):
+                    result = self.process_audio(chunk_base64, source_lang, target_lang, 'wav', sampling_rate=chunk.frame_rate)
+            except APIError as e:
+                raise APIError(f"Chunk {index + 1}/{len(chunks)} ({start_ms / 1000:.1f}s-{end_ms / 1000:.1f}s) failed: {e.message}", e.status_code, e.service)
+            
+            transcript, translation = self.extract_outputs(result)
+            if source_lang == target_lang:
+                # ASR-only graph: the transcript is already in the target language
+                translation = transcript
+            return {
+                'index': index,
+                'startMs': start_ms,
+                'endMs': end_ms,
+                'transcript': transcript,
+                'translation': translation,
+            }
+        
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(chunks)), thread_name_prefix='asr-chunk') as executor:
+            futures = [executor.submit(run_chunk, i, start, end) for i, (start, end) in enumerate(chunks)]
+            segments = [future.result() for future in futures]
+        
+        transcript = " ".join(s['transcript'].strip() for s in segments if s['transcript'].strip())
+        translation = " ".join(s['translation'].strip() for s in segments if s['translation'].strip())
+        
+        return {
+            'pipelineResponse': [
+                {'taskType': 'asr', 'output': [{'source': transcript}]},
+                {'taskType': 'translation', 'output': [{'source': transcript, 'target': translation}]},
+            ],
+            'segments': segments,
+        }
+    
+    @staticmethod
+    def extract_outputs(result: Dict[str, Any]) -> tuple:
+        """Return (transcript, translation) text from a compute result"""
+        transcript = ""
+        translation = ""
+        for response in result.get('pipelineResponse', []):
+            if response['taskType'] == 'asr' and response.get('output'):
+                transcript = response['output'][0].get('source', '')
+            elif response['taskType'] == 'translation' and response.get('output'):
+                translation = response['output'][0].get('target', '')
+        return transcript, translation
+    
     def get_supported_languages(self) -> List[Dict[str, str]]:
         """Get supported languages"""
         return [
@@ -262,39 +658,8 @@ class BhashiniService:
         """Get supported audio formats"""
         return ["wav", "mp3", "flac", "m4a", "ogg"]
 
-class GeminiService:
-    """Service for Google Gemini AI integration"""
-    
-    def __init__(self):
-        self.api_key = os.getenv('GEMINI_API_KEY')
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash-latest:generateContent"
-        
-        if not self.api_key:
-            raise APIError("Gemini API key not configured", 500, "gemini")
-    
-    def generate_summary_and_actions(self, text: str, pre_meeting_notes: str = "") -> Dict[str, Any]:
-        """Generate summary and action items using Gemini AI"""
-        try:
-            logger.info("Starting Gemini AI analysis...")
-            
-            if not text or text.strip() == "":
-                return {
-                    'summary': "No content available for summary",
-                    'actionItems': [],
-                    'keyDecisions': []
-                }
-            
-            # Build context-aware prompt
-            context_parts = []
-            
-            if pre_meeting_notes and pre_meeting_notes.strip():
-                context_parts.append(f"Pre-meeting context and notes:\n{pre_meeting_notes.strip()}")
-            
-            context_parts.append(f"Meeting transcript/content:\n{text}")
-            full_context = "\n\n".join(context_parts)
-            
-            # Enhanced prompt for better AI analysis
-            prompt = f"""
+# Prompt for meeting analysis; {full_context} is filled with notes and transcript
+ANALYSIS_PROMPT_TEMPLATE = """
 You are an AI meeting assistant. Analyze the following meeting content and provide a comprehensive summary with actionable insights.
 
 {full_context}
@@ -335,140 +700,604 @@ Format your response as valid JSON:
 
 Focus on being comprehensive yet concise. If pre-meeting notes were provided, ensure they are integrated naturally into the summary.
 """
+
+# Map step of map-reduce analysis for long transcripts
+MAP_PROMPT_TEMPLATE = """
+You are an AI meeting assistant. The following is part {part} of {total} of a long meeting transcript.
+
+Pre-meeting context and notes:
+{notes}
+
+Transcript part {part}/{total}:
+{window}
+
+Summarize only this part and extract the action items and key decisions it contains.
+Respond with valid JSON only:
+{{
+    "summary": "Summary of this part",
+    "actionItems": [
+        {{
+            "item": "Task description",
+            "assignee": "Person name or 'Not specified'",
+            "priority": "High/Medium/Low",
+            "dueDate": "Date or 'Not specified'"
+        }}
+    ],
+    "keyDecisions": ["Decision 1"]
+}}
+"""
+
+# Reduce step: merge per-part results into the final analysis
+REDUCE_PROMPT_TEMPLATE = """
+You are an AI meeting assistant. A long meeting was analyzed in parts. Merge the partial results below into one analysis of the whole meeting.
+
+Pre-meeting context and notes:
+{notes}
+
+Partial summaries (in meeting order):
+{summaries}
+
+Candidate action items:
+{action_items}
+
+Candidate key decisions:
+{decisions}
+
+Please provide:
+1. **SUMMARY**: one detailed, well-structured summary of the entire meeting that integrates the pre-meeting notes.
+2. **ACTION ITEMS**: the candidate action items merged and deduplicated; combine items describing the same task, keeping the most specific assignee, priority and due date.
+3. **KEY DECISIONS**: the candidate decisions merged and deduplicated.
+
+Respond with valid JSON only:
+{{
+    "summary": "Your detailed summary here...",
+    "actionItems": [
+        {{
+            "item": "Task description",
+            "assignee": "Person name or 'Not specified'",
+            "priority": "High/Medium/Low",
+            "dueDate": "Date or 'Not specified'"
+        }}
+    ],
+    "keyDecisions": ["Decision 1"]
+}}
+"""
+
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?\u0964\u0965])\s+')
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)"""
+    return len(text) // 4 + 1
+
+def split_into_windows(text: str, max_tokens: int) -> List[str]:
+    """Split text into windows of at most ``max_tokens`` estimated tokens, preferring sentence boundaries"""
+    max_chars = max(1, max_tokens * 4)
+    windows = []
+    current = ""
+    for sentence in _SENTENCE_BOUNDARY.split(text.strip()):
+        # Sentences longer than a window are split on whitespace
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(' ', 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                windows.append(current)
+                current = ""
+            windows.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            windows.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        windows.append(current)
+    return windows
+
+class SummaryStreamExtractor:
+    """
+    Incrementally pull the ``summary`` string value out of streamed JSON text.
+    
+    Gemini answers with a JSON document, so streamed deltas are JSON fragments.
+    ``feed`` returns the newly decoded part of the summary so it can be shown
+    to the user while the rest of the answer is still being generated.
+    """
+    
+    _KEY = re.compile(r'"summary"\s*:\s*"')
+    _ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', '"': '"', '\\': '\\', '/': '/'}
+    
+    def __init__(self):
+        self.buffer = ""
+        self.position = None
+        self.done = False
+    
+    def feed(self, delta: str) -> str:
+        if self.done:
+            return ""
+        self.buffer += delta
+        if self.position is None:
+            match = self._KEY.search(self.buffer)
+            if not match:
+                return ""
+            self.position = match.end()
+        
+        out = []
+        i = self.position
+        while i < len(self.buffer):
+            char = self.buffer[i]
+            if char == '"':
+                self.done = True
+                i += 1
+                break
+            if char == '\\':
+                if i + 1 >= len(self.buffer):
+                    break
+                code = self.buffer[i + 1]
+                if code == 'u':
+                    if i + 6 > len(self.buffer):
+                        break
+                    try:
+                        out.append(chr(int(self.buffer[i + 2:i + 6], 16)))
+                    except ValueError:
+                        pass
+                    i += 6
+                    continue
+                out.append(self._ESCAPES.get(code, code))
+                i += 2
+                continue
+            out.append(char)
+            i += 1
+        self.position = i
+        return "".join(out)
+
+def _normalize_for_dedupe(value: str) -> str:
+    return re.sub(r'[^\w]+', ' ', value.lower()).strip()
+
+def dedupe_strings(values: List[str]) -> List[str]:
+    """Drop repeated strings (ignoring case and punctuation), keeping first occurrences"""
+    seen = set()
+    unique = []
+    for value in values:
+        key = _normalize_for_dedupe(value)
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(value)
+    return unique
+
+def dedupe_action_items(items: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Merge action items with the same description, filling unspecified fields from duplicates"""
+    merged: Dict[str, Dict[str, str]] = {}
+    for item in items:
+        key = _normalize_for_dedupe(item.get('item', ''))
+        if not key:
+            continue
+        if key not in merged:
+            merged[key] = dict(item)
+            continue
+        existing = merged[key]
+        for field in ('assignee', 'dueDate'):
+            if existing.get(field, 'Not specified') == 'Not specified' and item.get(field, 'Not specified') != 'Not specified':
+                existing[field] = item[field]
+    return list(merged.values())
+
+class GeminiService:
+    """Service for Google Gemini AI integration"""
+    
+    generation_config = {
+        "temperature": 0.3,
+        "topK": 40,
+        "topP": 0.95,
+        "maxOutputTokens": 2048,
+    }
+    
+    def __init__(self):
+        self.api_key = os.getenv('GEMINI_API_KEY')
+        self.base_url = os.getenv(
+            'GEMINI_API_URL',
+            "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash-latest:generateContent"
+        )
+        self.stream_url = self.base_url.replace(':generateContent', ':streamGenerateContent')
+        
+        if not self.api_key:
+            raise APIError("Gemini API key not configured", 500, "gemini")
+        
+        self.http = HTTPClient(
+            'gemini',
+            host_pool_sizes={self.base_url: getattr(settings, 'GEMINI_POOL_MAXSIZE', 10)},
+            default_pool_size=getattr(settings, 'HTTP_POOL_MAXSIZE', 10),
+        )
+        self.async_http = AsyncHTTPClient('gemini', max_connections=getattr(settings, 'ASYNC_HTTP_MAX_CONNECTIONS', 200))
+        self.upstream = Upstream('gemini')
+    
+    def prompt_fingerprint(self) -> str:
+        """Hash of everything besides the input that shapes the analysis (model, prompt, generation config)"""
+        return content_key(
+            self.base_url,
+            ANALYSIS_PROMPT_TEMPLATE,
+            MAP_PROMPT_TEMPLATE,
+            REDUCE_PROMPT_TEMPLATE,
+            json.dumps(self.generation_config, sort_keys=True),
+            getattr(settings, 'GEMINI_MAP_REDUCE_ENABLED', True),
+            getattr(settings, 'GEMINI_MAP_REDUCE_THRESHOLD_TOKENS', 12000),
+            getattr(settings, 'GEMINI_MAP_REDUCE_WINDOW_TOKENS', 6000),
+        )
+    
+    def _use_map_reduce(self, text: str) -> bool:
+        return (getattr(settings, 'GEMINI_MAP_REDUCE_ENABLED', True) and
+                estimate_tokens(text) > getattr(settings, 'GEMINI_MAP_REDUCE_THRESHOLD_TOKENS', 12000))
+    
+    @staticmethod
+    def _empty_analysis() -> Dict[str, Any]:
+        return {
+            'summary': "No content available for summary",
+            'actionItems': [],
+            'keyDecisions': []
+        }
+    
+    @staticmethod
+    def _analysis_prompt(text: str, pre_meeting_notes: str) -> str:
+        # Build context-aware prompt
+        context_parts = []
+        
+        if pre_meeting_notes and pre_meeting_notes.strip():
+            context_parts.append(f"Pre-meeting context and notes:\n{pre_meeting_notes.strip()}")
+        
+        context_parts.append(f"Meeting transcript/content:\n{text}")
+        full_context = "\n\n".join(context_parts)
+        
+        # Enhanced prompt for better AI analysis
+        return ANALYSIS_PROMPT_TEMPLATE.format(full_context=full_context)
+    
+    def generate_summary_and_actions(self, text: str, pre_meeting_notes: str = "",
+                                     on_delta: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Generate summary and action items using Gemini AI.
+        
+        When ``on_delta`` is given the final generation call is streamed and
+        ``on_delta`` receives the summary text as it is produced.
+        """
+        try:
+            logger.info("Starting Gemini AI analysis...")
             
-            headers = {
-                'Content-Type': 'application/json',
-            }
-            
-            payload = {
-                "contents": [
-                    {
-                        "parts": [
-                            {
-                                "text": prompt
-                            }
-                        ]
-                    }
-                ],
-                "generationConfig": {
-                    "temperature": 0.3,
-                    "topK": 40,
-                    "topP": 0.95,
-                    "maxOutputTokens": 2048,
-                }
-            }
-            
-            url = f"{self.base_url}?key={self.api_key}"
-            
-            logger.info("Sending request to Gemini AI...")
-            response = requests.post(url, headers=headers, json=payload, timeout=60)
-            
-            if response.status_code != 200:
-                logger.error(f"Gemini API request failed: {response.status_code} - {response.text}")
-                raise APIError(f"Gemini AI request failed: {response.status_code}", response.status_code, "gemini")
+            if not text or text.strip() == "":
+                return self._empty_analysis()
             
-            result = response.json()
+            # Long transcripts are summarized window by window, then merged
+            if self._use_map_reduce(text):
+                return self._map_reduce_analysis(text, pre_meeting_notes, on_delta)
             
-            # Extract generated content
-            if 'candidates' not in result or not result['candidates']:
-                logger.error(f"No candidates in Gemini response: {result}")
-                raise APIError("No response from Gemini AI", 500, "gemini")
+            generated_text = self._generate(self._analysis_prompt(text, pre_meeting_notes), on_delta)
+            return self._parse_analysis(generated_text)
+                
+        except APIError:
+            raise
+        except Exception as e:
+            logger.error(f"Gemini AI error: {str(e)}")
+            raise APIError(f"AI analysis failed: {str(e)}", 500, "gemini")
+    
+    async def agenerate_summary_and_actions(self, text: str, pre_meeting_notes: str = "") -> Dict[str, Any]:
+        """Async variant of ``generate_summary_and_actions`` on the shared async HTTP client"""
+        try:
+            logger.info("Starting Gemini AI analysis (async)...")
             
-            candidate = result['candidates'][0]
-            if 'content' not in candidate or 'parts' not in candidate['content']:
-                logger.error(f"Invalid Gemini response structure: {candidate}")
-                raise APIError("Invalid Gemini AI response", 500, "gemini")
+            if not text or text.strip() == "":
+                return self._empty_analysis()
             
-            generated_text = candidate['content']['parts'][0]['text']
+            if self._use_map_reduce(text):
+                return await self._amap_reduce_analysis(text, pre_meeting_notes)
             
-            # Parse JSON response
-            try:
-                # Clean up the response (remove markdown code blocks if present)
-                cleaned_text = generated_text.strip()
-                if cleaned_text.startswith('```json'):
-                    cleaned_text = cleaned_text[7:]
-                if cleaned_text.endswith('```'):
-                    cleaned_text = cleaned_text[:-3]
-                cleaned_text = cleaned_text.strip()
-                
-                parsed_result = json.loads(cleaned_text)
-                
-                summary = parsed_result.get('summary', 'Summary not available')
-                action_items = parsed_result.get('actionItems', [])
-                key_decisions = parsed_result.get('keyDecisions', [])
-                
-                # Validate action items structure
-                validated_action_items = []
-                for item in action_items:
-                    if isinstance(item, dict):
-                        validated_action_items.append({
-                            'item': str(item.get('item', 'No description')),
-                            'assignee': str(item.get('assignee', 'Not specified')),
-                            'priority': str(item.get('priority', 'Medium')),
-                            'dueDate': str(item.get('dueDate', 'Not specified'))
-                        })
-                
-                # Validate key decisions
-                validated_key_decisions = []
-                for decision in key_decisions:
-                    if isinstance(decision, str):
-                        validated_key_decisions.append(decision)
-                
-                logger.info(f"Gemini AI analysis completed successfully")
-                logger.info(f"Summary length: {len(summary)} characters")
-                logger.info(f"Action items: {len(validated_action_items)} items")
-                logger.info(f"Key decisions: {len(validated_key_decisions)} decisions")
-                
-                return {
-                    'summary': summary,
-                    'actionItems': validated_action_items,
-                    'keyDecisions': validated_key_decisions
-                }
-                
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse Gemini JSON response: {str(e)}")
-                logger.error(f"Raw response: {generated_text}")
-                
-                # Fallback: create a basic summary from the raw text
-                return {
-                    'summary': generated_text if generated_text else "AI analysis completed but summary format was invalid",
-                    'actionItems': [],
-                    'keyDecisions': []
-                }
-                
+            generated_text = await self._agenerate(self._analysis_prompt(text, pre_meeting_notes))
+            return self._parse_analysis(generated_text)
+        
         except APIError:
             raise
         except Exception as e:
             logger.error(f"Gemini AI error: {str(e)}")
             raise APIError(f"AI analysis failed: {str(e)}", 500, "gemini")
+    
+    def _generate_payload(self, prompt: str) -> Dict[str, Any]:
+        return {
+            "contents": [
+                {
+                    "parts": [
+                        {
+                            "text": prompt
+                        }
+                    ]
+                }
+            ],
+            "generationConfig": self.generation_config
+        }
+    
+    @staticmethod
+    def _extract_generated_text(status_code: int, body_text: str, result_loader: Callable[[], Dict[str, Any]]) -> str:
+        """Validate a generateContent response and return its text"""
+        if status_code != 200:
+            logger.error("Gemini API request failed: %s - %s", status_code, logs.payload(body_text))
+            raise APIError(f"Gemini AI request failed: {status_code}", status_code, "gemini")
+        
+        with metrics.time_stage('json_parse'):
+            result = result_loader()
+        
+        # Extract generated content
+        if 'candidates' not in result or not result['candidates']:
+            logger.error("No candidates in Gemini response: %s", logs.payload(result))
+            raise APIError("No response from Gemini AI", 500, "gemini")
+        
+        candidate = result['candidates'][0]
+        if 'content' not in candidate or 'parts' not in candidate['content']:
+            logger.error("Invalid Gemini response structure: %s", logs.payload(candidate))
+            raise APIError("Invalid Gemini AI response", 500, "gemini")
+        
+        return candidate['content']['parts'][0]['text']
+    
+    def _generate(self, prompt: str, on_delta: Optional[Callable[[str], None]] = None) -> str:
+        """Send one prompt to Gemini and return the generated text"""
+        if on_delta is not None:
+            return self._generate_stream(prompt, on_delta)
+        
+        url = f"{self.base_url}?key={self.api_key}"
+        
+        logger.info("Sending request to Gemini AI...")
+        with metrics.time_stage('gemini_generate'), tracing.span('gemini.generate', {'prompt.chars': len(prompt)},
+                                                                 kind=tracing.KIND_CLIENT) as span:
+            payload = self._generate_payload(prompt)
+            response = self.upstream.call(
+                'generate',
+                lambda timeout: self.http.post(url, headers={'Content-Type': 'application/json'}, json=payload, timeout=timeout),
+                ceiling=60, size=len(prompt),
+            )
+            span.set_attribute('http.status_code', response.status_code)
+        return self._extract_generated_text(
+            response.status_code,
+            response.text if response.status_code != 200 else '',
+            response.json,
+        )
+    
+    async def _agenerate(self, prompt: str) -> str:
+        url = f"{self.base_url}?key={self.api_key}"
+        
+        logger.info("Sending request to Gemini AI (async)...")
+        with metrics.time_stage('gemini_generate'), tracing.span('gemini.generate', {'prompt.chars': len(prompt)},
+                                                                 kind=tracing.KIND_CLIENT) as span:
+            payload = self._generate_payload(prompt)
+            response = await self.upstream.acall(
+                'generate',
+                lambda timeout: self.async_http.post(url, headers={'Content-Type': 'application/json'}, json=payload, timeout=timeout),
+                ceiling=60, size=len(prompt),
+            )
+            span.set_attribute('http.status_code', response.status_code)
+        return self._extract_generated_text(
+            response.status_code,
+            response.text if response.status_code != 200 else '',
+            response.json,
+        )
+    
+    def _generate_stream(self, prompt: str, on_delta: Callable[[str], None]) -> str:
+        """Stream a prompt through streamGenerateContent, reporting summary text as it arrives"""
+        payload = {
+            "contents": [{"parts": [{"text": prompt}]}],
+            "generationConfig": self.generation_config
+        }
+        url = f"{self.stream_url}?alt=sse&key={self.api_key}"
+        
+        logger.info("Streaming request to Gemini AI...")
+        # The whole streamed answer counts as generation time
+        with metrics.time_stage('gemini_generate'), tracing.span('gemini.generate', {
+            'prompt.chars': len(prompt), 'gemini.streamed': True,
+        }, kind=tracing.KIND_CLIENT) as span:
+            # Not hedged: the summary is relayed to the client as it streams
+            response = self.upstream.call(
+                'stream_generate',
+                lambda timeout: self.http.post(url, headers={'Content-Type': 'application/json'}, json=payload, timeout=timeout, stream=True),
+                ceiling=60, size=len(prompt), hedge=False,
+            )
+            span.set_attribute('http.status_code', response.status_code)
+            
+            with response:
+                if response.status_code != 200:
+                    logger.error("Gemini streaming request failed: %s - %s", response.status_code, logs.payload(response.text))
+                    raise APIError(f"Gemini AI request failed: {response.status_code}", response.status_code, "gemini")
+                
+                extractor = SummaryStreamExtractor()
+                parts = []
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith('data:'):
+                        continue
+                    try:
+                        chunk = json.loads(line[5:].strip())
+                    except json.JSONDecodeError:
+                        continue
+                    for candidate in chunk.get('candidates', [])[:1]:
+                        for part in candidate.get('content', {}).get('parts', []):
+                            text = part.get('text', '')
+                            if not text:
+                                continue
+                            parts.append(text)
+                            summary_delta = extractor.feed(text)
+                            if summary_delta:
+                                on_delta(summary_delta)
+        
+        if not parts:
+            raise APIError("No response from Gemini AI", 500, "gemini")
+        return "".join(parts)
+    
+    def _parse_analysis(self, generated_text: str) -> Dict[str, Any]:
+        """Parse Gemini's JSON answer into summary, action items and key decisions"""
+        try:
+            # Clean up the response (remove markdown code blocks if present)
+            cleaned_text = generated_text.strip()
+            if cleaned_text.startswith('```json'):
+                cleaned_text = cleaned_text[7:]
+            if cleaned_text.endswith('```'):
+                cleaned_text = cleaned_text[:-3]
+            cleaned_text = cleaned_text.strip()
+            
+            with metrics.time_stage('json_parse'):
+                parsed_result = json.loads(cleaned_text)
+            
+            summary = parsed_result.get('summary', 'Summary not available')
+            action_items = parsed_result.get('actionItems', [])
+            key_decisions = parsed_result.get('keyDecisions', [])
+            
+            # Validate action items structure
+            validated_action_items = []
+            for item in action_items:
+                if isinstance(item, dict):
+                    validated_action_items.append({
+                        'item': str(item.get('item', 'No description')),
+                        'assignee': str(item.get('assignee', 'Not specified')),
+                        'priority': str(item.get('priority', 'Medium')),
+                        'dueDate': str(item.get('dueDate', 'Not specified'))
+                    })
+            
+            # Validate key decisions
+            validated_key_decisions = []
+            for decision in key_decisions:
+                if isinstance(decision, str):
+                    validated_key_decisions.append(decision)
+            
+            logger.info(f"Gemini AI analysis completed successfully")
+            logger.info(f"Summary length: {len(summary)} characters")
+            logger.info(f"Action items: {len(validated_action_items)} items")
+            logger.info(f"Key decisions: {len(validated_key_decisions)} decisions")
+            
+            return {
+                'summary': summary,
+                'actionItems': validated_action_items,
+                'keyDecisions': validated_key_decisions
+            }
+            
+        except (json.JSONDecodeError, AttributeError) as e:
+            logger.error(f"Failed to parse Gemini JSON response: {str(e)}")
+            logger.error("Raw response: %s", logs.payload(generated_text))
+            
+            # Fallback: create a basic summary from the raw text
+            return {
+                'summary': generated_text if generated_text else "AI analysis completed but summary format was invalid",
+                'actionItems': [],
+                'keyDecisions': []
+            }
+    
+    def _map_prompts(self, text: str, pre_meeting_notes: str) -> List[str]:
+        windows = split_into_windows(text, getattr(settings, 'GEMINI_MAP_REDUCE_WINDOW_TOKENS', 6000))
+        notes = pre_meeting_notes.strip() if pre_meeting_notes else ""
+        return [
+            MAP_PROMPT_TEMPLATE.format(
+                part=index + 1,
+                total=len(windows),
+                notes=notes or "None provided",
+                window=window,
+            )
+            for index, window in enumerate(windows)
+        ]
+    
+    @staticmethod
+    def _reduce_prompt(partials: List[Dict[str, Any]], pre_meeting_notes: str) -> tuple:
+        """Return (reduce prompt, locally merged action items, locally merged decisions)"""
+        notes = pre_meeting_notes.strip() if pre_meeting_notes else ""
+        candidate_items = dedupe_action_items([item for p in partials for item in p['actionItems']])
+        candidate_decisions = dedupe_strings([d for p in partials for d in p['keyDecisions']])
+        partial_summaries = "\n\n".join(
+            f"Part {i + 1}:\n{p['summary']}" for i, p in enumerate(partials)
+        )
+        prompt = REDUCE_PROMPT_TEMPLATE.format(
+            notes=notes or "None provided",
+            summaries=partial_summaries,
+            action_items=json.dumps(candidate_items, ensure_ascii=False, indent=2),
+            decisions=json.dumps(candidate_decisions, ensure_ascii=False, indent=2),
+        )
+        return prompt, candidate_items, candidate_decisions
+    
+    @staticmethod
+    def _finish_reduce(merged: Dict[str, Any], candidate_items: List[Dict[str, str]],
+                       candidate_decisions: List[str]) -> Dict[str, Any]:
+        # If the reduce answer could not be parsed, fall back to the locally merged windows
+        if not merged['actionItems'] and not merged['keyDecisions'] and (candidate_items or candidate_decisions):
+            merged['actionItems'] = candidate_items
+            merged['keyDecisions'] = candidate_decisions
+        
+        return {
+            'summary': merged['summary'],
+            'actionItems': dedupe_action_items(merged['actionItems']),
+            'keyDecisions': dedupe_strings(merged['keyDecisions'])
+        }
+    
+    def _map_reduce_analysis(self, text: str, pre_meeting_notes: str,
+                             on_delta: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """Analyze token-bounded windows concurrently, then merge them with one reduce call"""
+        prompts = self._map_prompts(text, pre_meeting_notes)
+        concurrency = max(1, getattr(settings, 'GEMINI_MAP_REDUCE_CONCURRENCY', 4))
+        logger.info(f"Map-reduce analysis: {len(prompts)} windows, concurrency {concurrency}")
+        
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(prompts)), thread_name_prefix='gemini-map') as executor:
+            partials = list(executor.map(tracing.bind(lambda prompt: self._parse_analysis(self._generate(prompt))), prompts))
+        
+        prompt, candidate_items, candidate_decisions = self._reduce_prompt(partials, pre_meeting_notes)
+        merged = self._parse_analysis(self._generate(prompt, on_delta))
+        return self._finish_reduce(merged, candidate_items, candidate_decisions)
+    
+    async def _amap_reduce_analysis(self, text: str, pre_meeting_notes: str) -> Dict[str, Any]:
+        prompts = self._map_prompts(text, pre_meeting_notes)
+        semaphore = asyncio.Semaphore(max(1, getattr(settings, 'GEMINI_MAP_REDUCE_CONCURRENCY', 4)))
+        logger.info(f"Map-reduce analysis (async): {len(prompts)} windows")
+        
+        async def analyze(prompt: str) -> Dict[str, Any]:
+            async with semaphore:
+                return self._parse_analysis(await self._agenerate(prompt))
+        
+        partials = await asyncio.gather(*(analyze(prompt) for prompt in prompts))
+        prompt, candidate_items, candidate_decisions = self._reduce_prompt(list(partials), pre_meeting_notes)
+        merged = self._parse_analysis(await self._agenerate(prompt))
+        return self._finish_reduce(merged, candidate_items, candidate_decisions)
 
 # Service instances
 _bhashini_service = None
 _gemini_service = None
+_service_lock = threading.Lock()
 
 def get_bhashini_service() -> BhashiniService:
     """Get or create Bhashini service instance"""
     global _bhashini_service
     if _bhashini_service is None:
-        _bhashini_service = BhashiniService()
+        with _service_lock:
+            if _bhashini_service is None:
+                _bhashini_service = BhashiniService()
     return _bhashini_service
 
 def get_gemini_service() -> GeminiService:
     """Get or create Gemini service instance"""
     global _gemini_service
     if _gemini_service is None:
-        _gemini_service = GeminiService()
+        with _service_lock:
+            if _gemini_service is None:
+                _gemini_service = GeminiService()
     return _gemini_service
 
+def get_connection_pool_stats() -> Dict[str, Any]:
+    """Connection pool stats for service instances created in this process"""
+    stats = {}
+    if _bhashini_service is not None:
+        stats['bhashini'] = _bhashini_service.http.pool_stats()
+    if _gemini_service is not None:
+        stats['gemini'] = _gemini_service.http.pool_stats()
+    return stats
+
+def get_upstream_stats() -> Dict[str, Any]:
+    """Circuit state, hedging counters and learned timeouts for service instances in this process"""
+    stats = {}
+    if _bhashini_service is not None:
+        stats['bhashini'] = _bhashini_service.upstream.stats()
+    if _gemini_service is not None:
+        stats['gemini'] = _gemini_service.upstream.stats()
+    return stats
+
 def validate_audio_file(audio_file) -> Dict[str, Any]:
     """Validate uploaded audio file"""
     try:
-        # Check file size (max 50MB)
-        max_size = 50 * 1024 * 1024  # 50MB
-        if audio_file.size > max_size:
+        if audio_file.size > MAX_AUDIO_BYTES:
             return {
                 "valid": False,
-                "error": f"File size too large. Maximum allowed size is {max_size // (1024*1024)}MB"
+                "error": f"File size too large. Maximum allowed size is {MAX_AUDIO_BYTES // (1024*1024)}MB"
             }
         
         # Check file extension
@@ -516,7 +1345,10 @@ def get_service_health() -> Dict[str, Any]:
         try:
             bhashini_service = get_bhashini_service()
             # Simple health check - just verify credentials are configured
-            if bhashini_service.user_id and bhashini_service.api_key:
+            if bhashini_service.user_id and bhashini_service.api_key and bhashini_service.upstream.breaker.state != 'closed':
+                health_data["services"]["bhashini"] = "degraded - circuit open"
+                health_data["status"] = "degraded"
+            elif bhashini_service.user_id and bhashini_service.api_key:
                 health_data["services"]["bhashini"] = "healthy"
             else:
                 health_data["services"]["bhashini"] = "unhealthy - credentials missing"
@@ -529,7 +1361,10 @@ def get_service_health() -> Dict[str, Any]:
         try:
             gemini_service = get_gemini_service()
             # Simple health check - just verify API key is configured
-            if gemini_service.api_key:
+            if gemini_service.api_key and gemini_service.upstream.breaker.state != 'closed':
+                health_data["services"]["gemini"] = "degraded - circuit open"
+                health_data["status"] = "degraded"
+            elif gemini_service.api_key:
                 health_data["services"]["gemini"] = "healthy"
             else:
                 health_data["services"]["gemini"] = "unhealthy - API key missing"
@@ -538,6 +1373,9 @@ def get_service_health() -> Dict[str, Any]:
             health_data["services"]["gemini"] = f"unhealthy - {str(e)}"
             health_data["status"] = "degraded"
         
+        health_data["connectionPools"] = get_connection_pool_stats()
+        health_data["upstreams"] = get_upstream_stats()
+        
         return health_data
         
     except Exception as e:
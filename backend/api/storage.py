@@ -0,0 +1,125 @@
+"""
+Small SQLite helpers for process-shared local state (jobs, caches, limits).
+
+Every gunicorn worker opens its own connections to the same database file,
+so state written by one worker is visible to the others and survives
+restarts. Connections are per thread and use WAL so readers never block the
+writer.
+
+Records owned by a worker (running jobs, admission slots) carry its
+``process_identity``, so another worker can tell when the owner is gone.
+"""
+import os
+import uuid
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional, Union
+
+
+def _process_start_time(pid: int) -> Optional[str]:
+    """Start time of ``pid`` in clock ticks since boot, or None without /proc (or once it has exited)"""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # Field 22; the command name before it is parenthesized and may contain spaces
+    return stat.rsplit(')', 1)[1].split()[19]
+
+
+_identity = None
+_identity_pid = None
+
+
+def process_identity() -> str:
+    """
+    This process as ``pid:start time``. Container PIDs are small and repeat
+    across restarts; the start time tells a recycled PID from the original.
+    """
+    global _identity, _identity_pid
+    pid = os.getpid()
+    if _identity_pid != pid:
+        _identity = f"{pid}:{_process_start_time(pid) or uuid.uuid4().hex}"
+        _identity_pid = pid
+    return _identity
+
+
+def process_alive(identity: Optional[str]) -> bool:
+    """Whether the process that recorded ``identity`` (see ``process_identity``) still runs"""
+    if not identity:
+        return False
+    if identity == process_identity():
+        return True
+    pid, _, started = str(identity).partition(':')
+    try:
+        pid = int(pid)
+    except ValueError:
+        return False
+    if pid == os.getpid():
+        # An earlier process that had this PID
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    current = _process_start_time(pid)
+    # Without /proc the start time cannot be compared; the PID is all there is
+    return current is None or current == started
+
+
+class SQLiteStore:
+    """Base class for stores backed by a single SQLite file"""
+
+    schema = ""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = str(path)
+        if self.path != ':memory:':
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, creating it (and the schema) on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and getattr(self._local, 'pid', None) == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA busy_timeout=30000')
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.executescript(self.schema)
+                    self._initialized = True
+        return conn
+
+    def transaction(self):
+        """Context manager for an immediate (write-locked) transaction"""
+        return _Transaction(self.connect())
+
+
+class _Transaction:
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.execute('COMMIT')
+        else:
+            self.conn.execute('ROLLBACK')
+        return False
@@ -0,0 +1,125 @@
+"""
+Minimal Bhashini task graphs.
+
+A request asks Bhashini only for the inference stages it needs:
+
+- ASR only, when the recording is already in the target language (hi -> hi);
+- ASR + translation, for a recording in another language;
+- translation only, for text that is already transcribed;
+- any of the above followed by TTS, for speech output.
+
+``TaskGraph`` builds the ``getModelsPipeline`` tasks for its stages, picks
+each stage's service out of the returned config, and builds the matching
+compute payload. Configs are cached per graph, so a same-language meeting
+never depends on a translation service existing for its language.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+ASR = 'asr'
+TRANSLATION = 'translation'
+TTS = 'tts'
+
+TASK_NAMES = {ASR: 'ASR', TRANSLATION: 'Translation', TTS: 'TTS'}
+
+
+class TaskGraph:
+    """An ordered list of Bhashini tasks for one source/target language pair"""
+
+    __slots__ = ('tasks', 'source_lang', 'target_lang')
+
+    def __init__(self, tasks: Sequence[str], source_lang: str, target_lang: str):
+        self.tasks = tuple(tasks)
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+
+    @classmethod
+    def plan(cls, source_lang: str, target_lang: Optional[str] = None, audio_input: bool = True,
+             speech_output: bool = False) -> 'TaskGraph':
+        """The fewest tasks that turn the input (audio or source-language text) into the requested output"""
+        source_lang = source_lang.split('-')[0].lower()
+        target_lang = (target_lang or source_lang).split('-')[0].lower()
+        tasks = [ASR] if audio_input else []
+        if target_lang != source_lang:
+            tasks.append(TRANSLATION)
+        if speech_output:
+            tasks.append(TTS)
+        if not tasks:
+            raise ValueError(f"Nothing to run for {source_lang} text without translation or speech output")
+        return cls(tasks, source_lang, target_lang)
+
+    @property
+    def name(self) -> str:
+        return '+'.join(self.tasks)
+
+    @property
+    def key(self) -> Tuple[Any, ...]:
+        return (self.tasks, self.source_lang, self.target_lang)
+
+    def _language(self, task: str) -> Dict[str, str]:
+        if task == ASR:
+            return {'sourceLanguage': self.source_lang}
+        if task == TRANSLATION:
+            return {'sourceLanguage': self.source_lang, 'targetLanguage': self.target_lang}
+        # Speech is synthesized in the output language
+        return {'sourceLanguage': self.target_lang}
+
+    def config_tasks(self) -> List[Dict[str, Any]]:
+        """``pipelineTasks`` for a getModelsPipeline request"""
+        return [{'taskType': task, 'config': {'language': self._language(task)}} for task in self.tasks]
+
+    def resolve(self, pipeline_config: Dict[str, Any], default_endpoint: str) -> Dict[str, Any]:
+        """
+        Pick each task's service and the compute endpoint out of a pipeline config.
+
+        Raises ``LookupError`` naming the first task without a service for its languages.
+        """
+        services = {}
+        for task in self.tasks:
+            language = self._language(task)
+            for task_config in pipeline_config['pipelineResponseConfig']:
+                if task_config['taskType'] != task:
+                    continue
+                services[task] = next((config for config in task_config['config']
+                                       if all(config['language'].get(k) == v for k, v in language.items())), None)
+                if services[task] is not None:
+                    break
+            if services.get(task) is None:
+                raise LookupError(f"{TASK_NAMES[task]} service not found for {' -> '.join(language.values())}")
+
+        compute_endpoint = default_endpoint
+        auth_token = None
+        if 'pipelineInferenceAPIEndPoint' in pipeline_config:
+            endpoint_config = pipeline_config['pipelineInferenceAPIEndPoint']
+            compute_endpoint = endpoint_config.get('callbackUrl', default_endpoint)
+            if 'inferenceApiKey' in endpoint_config:
+                auth_token = endpoint_config['inferenceApiKey']['value']
+
+        return {'services': services, 'compute_endpoint': compute_endpoint, 'auth_token': auth_token}
+
+    def compute_tasks(self, resolved: Dict[str, Any], audio_format: str = 'wav', sampling_rate: int = 16000,
+                      gender: str = 'female') -> List[Dict[str, Any]]:
+        """``pipelineTasks`` for a compute request, with the resolved service ids"""
+        tasks = []
+        for task in self.tasks:
+            config = {'language': self._language(task), 'serviceId': resolved['services'][task]['serviceId']}
+            if task == ASR:
+                config.update(audioFormat=audio_format, samplingRate=sampling_rate)
+            elif task == TTS:
+                config['gender'] = gender
+            tasks.append({'taskType': task, 'config': config})
+        return tasks
+
+    def compute_payload(self, resolved: Dict[str, Any], audio_content: Optional[str] = None,
+                        texts: Optional[List[str]] = None, **task_options) -> Dict[str, Any]:
+        """A full compute payload: audio input when the graph starts with ASR, text input otherwise"""
+        if self.tasks[0] == ASR:
+            input_data = {
+                'audio': [{'audioContent': audio_content}],
+                'input': [{'source': ''}],
+            }
+        else:
+            input_data = {'input': [{'source': text} for text in texts or []]}
+        return {'pipelineTasks': self.compute_tasks(resolved, **task_options), 'inputData': input_data}
+
+    def __repr__(self) -> str:
+        return f"TaskGraph({self.name}, {self.source_lang}->{self.target_lang})"
@@ -0,0 +1,474 @@
+import io
+import os
+import json
+import wave
+import hashlib
+import tempfile
+
+from unittest import mock
+
+import numpy as np
+
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from . import admission, audio, checkpoints, jobs, pipeline, storage, uploads, views
+from .services import MAX_AUDIO_BYTES, APIError
+
+
+class ClientRateLimitTests(SimpleTestCase):
+    """The per-client token bucket cannot be dodged with made-up credentials or headers"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.controller = admission.AdmissionController(
+            admission.AdmissionStore(os.path.join(self.tmp.name, 'admission.sqlite3')),
+            max_concurrent=4, queue_size=8, queue_timeout=1.0, client_rate=6.0, client_burst=3,
+        )
+        self.factory = RequestFactory()
+
+    def statuses(self, requests):
+        statuses = []
+        for request in requests:
+            try:
+                self.controller.acquire(admission.client_key(request), 'process_audio', needs_slot=False).release()
+                statuses.append(200)
+            except APIError as e:
+                statuses.append(e.status_code)
+        return statuses
+
+    def test_same_client_is_limited(self):
+        requests = [self.factory.post('/api/process-audio/', REMOTE_ADDR='10.0.0.1') for _ in range(6)]
+        self.assertEqual(self.statuses(requests), [200, 200, 200, 429, 429, 429])
+
+    def test_unknown_api_keys_do_not_get_their_own_bucket(self):
+        requests = [self.factory.post('/api/process-audio/', REMOTE_ADDR='10.0.0.1', HTTP_X_API_KEY=f'random-{i}')
+                    for i in range(6)]
+        self.assertEqual(self.statuses(requests), [200, 200, 200, 429, 429, 429])
+
+    @override_settings(ADMISSION_API_KEYS=['partner-key'])
+    def test_configured_api_key_gets_its_own_bucket(self):
+        keyed = self.factory.post('/api/process-audio/', REMOTE_ADDR='10.0.0.1', HTTP_AUTHORIZATION='Bearer partner-key')
+        anonymous = self.factory.post('/api/process-audio/', REMOTE_ADDR='10.0.0.1')
+        self.assertNotEqual(admission.client_key(keyed), admission.client_key(anonymous))
+        self.assertEqual(self.statuses([keyed] * 4), [200, 200, 200, 429])
+
+    def test_spoofed_forwarded_for_is_ignored_by_default(self):
+        requests = [self.factory.post('/api/process-audio/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'203.0.113.{i}')
+                    for i in range(6)]
+        self.assertEqual(self.statuses(requests), [200, 200, 200, 429, 429, 429])
+
+    @override_settings(ADMISSION_PROXY_HOPS=1)
+    def test_forwarded_for_is_used_behind_a_trusted_proxy(self):
+        request = self.factory.post('/api/process-audio/', REMOTE_ADDR='10.0.0.254',
+                                    HTTP_X_FORWARDED_FOR='198.51.100.7, 203.0.113.9')
+        self.assertEqual(admission.client_key(request), 'ip:203.0.113.9')
+
+    def test_browsers_may_send_api_keys(self):
+        response = views.add_cors_headers(views.JsonResponse({}))
+        self.assertIn('X-Api-Key', response['Access-Control-Allow-Headers'])
+
+
+class MeetingOwnershipTests(TestCase):
+    """Saved meetings are only reachable with the X-User-Id that saved them"""
+
+    owner = 'c0ffee00-1111-4222-8333-444455556666'
+    other = 'deadbeef-1111-4222-8333-444455556666'
+
+    def save(self, **headers):
+        body = {'title': 'Standup', 'data': {'transcript': 'budget review', 'summary': 'budget'}, 'metadata': {}}
+        return self.client.post('/api/meetings/', body, content_type='application/json', **headers)
+
+    def test_requests_without_an_owner_are_rejected(self):
+        self.assertEqual(self.save().status_code, 401)
+        self.assertEqual(self.save(HTTP_X_USER_ID='short').status_code, 401)
+        self.assertEqual(self.client.get('/api/meetings/').status_code, 401)
+        self.assertEqual(self.client.get('/api/meetings/search/?q=budget').status_code, 401)
+
+        meeting_id = self.save(HTTP_X_USER_ID=self.owner).json()['meeting']['id']
+        self.assertEqual(self.client.get(f'/api/meetings/{meeting_id}/').status_code, 401)
+        self.assertEqual(self.client.delete(f'/api/meetings/{meeting_id}/').status_code, 401)
+
+    def test_meetings_are_scoped_to_their_owner(self):
+        meeting_id = self.save(HTTP_X_USER_ID=self.owner).json()['meeting']['id']
+
+        self.assertEqual(len(self.client.get('/api/meetings/', HTTP_X_USER_ID=self.owner).json()['meetings']), 1)
+        self.assertEqual(self.client.get('/api/meetings/', HTTP_X_USER_ID=self.other).json()['meetings'], [])
+        self.assertEqual(
+            self.client.get('/api/meetings/search/?q=budget', HTTP_X_USER_ID=self.other).json()['results'], [])
+        self.assertEqual(self.client.get(f'/api/meetings/{meeting_id}/', HTTP_X_USER_ID=self.other).status_code, 404)
+        self.assertEqual(self.client.delete(f'/api/meetings/{meeting_id}/', HTTP_X_USER_ID=self.other).status_code, 404)
+        self.assertEqual(self.client.get(f'/api/meetings/{meeting_id}/', HTTP_X_USER_ID=self.owner).status_code, 200)
+
+    def test_search_errors_come_back_as_json(self):
+        with mock.patch.object(views.meeting_store, 'search_meetings', side_effect=RuntimeError("fts5: syntax error")):
+            response = self.client.get('/api/meetings/search/?q=budget', HTTP_X_USER_ID=self.owner)
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json()['service'], 'server')
+
+
+class UploadLifecycleTests(SimpleTestCase):
+    """Assembled uploads outlive failed jobs, and unfinished uploads are capped"""
+
+    chunk_size = uploads.MIN_CHUNK_SIZE
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.uploads = uploads.ChunkedUploads(
+            uploads.UploadStore(os.path.join(self.tmp.name, 'uploads.sqlite3')),
+            os.path.join(self.tmp.name, 'uploads'),
+            max_client_bytes=3 * self.chunk_size, max_total_bytes=5 * self.chunk_size,
+        )
+        buf = io.BytesIO()
+        with wave.open(buf, 'wb') as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(16000)
+            w.writeframes(b'\x00' * (2 * self.chunk_size - 44))
+        self.audio = buf.getvalue()
+
+    def create(self, client='ip:10.0.0.1', size=None):
+        return self.uploads.create('meeting.wav', size or len(self.audio), {}, chunk_size=self.chunk_size,
+                                   client=client)['id']
+
+    def put(self, upload_id, index):
+        chunk = self.audio[index * self.chunk_size:(index + 1) * self.chunk_size]
+        return self.uploads.write_chunk(upload_id, index, io.BytesIO(chunk), len(chunk),
+                                        hashlib.sha256(chunk).hexdigest())
+
+    def test_failed_job_keeps_the_file_and_can_be_reprocessed(self):
+        upload_id = self.create()
+        self.assertFalse(self.put(upload_id, 0))
+        self.assertTrue(self.put(upload_id, 1))
+        self.uploads.mark_processing(upload_id, 'job-1')
+        self.assertEqual(self.uploads.status(upload_id)['state'], uploads.PROCESSING)
+
+        self.uploads.processing_failed(upload_id, "Gemini AI request failed: 503")
+        status = self.uploads.status(upload_id)
+        self.assertEqual((status['state'], status['missingChunks']), (uploads.UPLOADING, []))
+        self.assertEqual(status['error'], "Gemini AI request failed: 503")
+        self.assertTrue(os.path.exists(self.uploads.file_path(upload_id)))
+
+        # Re-sending any chunk completes the upload again
+        self.assertTrue(self.put(upload_id, 0))
+        self.uploads.mark_processing(upload_id, 'job-2')
+        self.uploads.processed(upload_id)
+        self.assertEqual(self.uploads.status(upload_id)['state'], uploads.PROCESSED)
+        self.assertFalse(os.path.exists(self.uploads.file_path(upload_id)))
+
+    def test_job_finishing_before_it_is_recorded(self):
+        upload_id = self.create()
+        self.put(upload_id, 0)
+        self.put(upload_id, 1)
+        self.uploads.processed(upload_id)
+        self.uploads.mark_processing(upload_id, 'job-1')
+        status = self.uploads.status(upload_id)
+        self.assertEqual((status['state'], status['jobId']), (uploads.PROCESSED, 'job-1'))
+
+    def test_chunked_uploads_share_the_audio_size_limit(self):
+        with self.assertRaises(APIError) as raised:
+            self.create(size=MAX_AUDIO_BYTES + 1)
+        self.assertEqual(raised.exception.status_code, 400)
+
+    def test_one_request_writes_a_chunk_at_a_time(self):
+        upload_id = self.create()
+        chunk = self.audio[:self.chunk_size]
+        other = b'\xff' * self.chunk_size
+
+        # A second writer arriving while the first is still streaming its body
+        class SlowBody(io.BytesIO):
+            def read(inner, size=-1):
+                with self.assertRaises(APIError) as raised:
+                    self.uploads.write_chunk(upload_id, 0, io.BytesIO(other), len(other),
+                                             hashlib.sha256(other).hexdigest())
+                self.assertEqual(raised.exception.status_code, 409)
+                return io.BytesIO.read(inner, size)
+
+        self.uploads.write_chunk(upload_id, 0, SlowBody(chunk), len(chunk), hashlib.sha256(chunk).hexdigest())
+        with open(self.uploads.file_path(upload_id), 'rb') as f:
+            self.assertEqual(f.read(self.chunk_size), chunk)
+        self.assertEqual(self.uploads.status(upload_id)['missingChunks'], [1])
+
+    def test_failed_write_frees_the_chunk(self):
+        upload_id = self.create()
+        chunk = self.audio[:self.chunk_size]
+        with self.assertRaises(APIError):
+            self.uploads.write_chunk(upload_id, 0, io.BytesIO(chunk), len(chunk), '0' * 64)
+        self.assertFalse(self.put(upload_id, 0))
+        self.assertEqual(self.uploads.status(upload_id)['missingChunks'], [1])
+
+    def test_outstanding_bytes_are_capped_per_client_and_in_total(self):
+        self.create(size=2 * self.chunk_size)
+        with self.assertRaises(APIError) as raised:
+            self.create(size=2 * self.chunk_size)
+        self.assertEqual(raised.exception.status_code, 429)
+
+        self.create(client='ip:10.0.0.2', size=3 * self.chunk_size)
+        with self.assertRaises(APIError) as raised:
+            self.create(client='ip:10.0.0.3', size=self.chunk_size)
+        self.assertEqual(raised.exception.status_code, 503)
+
+    def test_processed_uploads_no_longer_count(self):
+        upload_id = self.create()
+        self.put(upload_id, 0)
+        self.put(upload_id, 1)
+        self.uploads.mark_processing(upload_id, 'job-1')
+        self.uploads.processed(upload_id)
+        self.create(size=3 * self.chunk_size)
+
+    @override_settings(ASYNC_JOBS_ENABLED=False)
+    def test_uploads_are_refused_without_async_jobs(self):
+        request = RequestFactory().post('/api/uploads/', json.dumps({'fileName': 'meeting.wav', 'size': 1024}),
+                                        content_type='application/json')
+        response = views.create_upload(request)
+        self.assertEqual(response.status_code, 400)
+
+
+class CheckpointClaimTests(SimpleTestCase):
+    """Only one request at a time runs under an Idempotency-Key"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = checkpoints.CheckpointStore(os.path.join(self.tmp.name, 'checkpoints.sqlite3'), claim_ttl=60)
+        patcher = mock.patch.object(checkpoints, 'get_checkpoint_store', return_value=self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def open(self, key='retry-1', *parts):
+        return checkpoints.open_checkpoint(key, 'ip:10.0.0.1', 'audio-sha', *parts)
+
+    def test_concurrent_retry_is_refused_until_the_first_attempt_ends(self):
+        first = self.open()
+        first.save('transcription', {'transcript': 'hello'})
+        with self.assertRaises(APIError) as raised:
+            self.open()
+        self.assertEqual(raised.exception.status_code, 409)
+        self.assertEqual(raised.exception.retry_after, checkpoints.CLAIM_RETRY_AFTER)
+
+        first.release()
+        retry = self.open()
+        self.assertEqual(retry.get('transcription'), {'transcript': 'hello'})
+        retry.release()
+
+    def test_other_requests_are_not_blocked(self):
+        first = self.open()
+        self.open('retry-2').release()
+        self.open('retry-1', 'other notes').release()
+        first.release()
+
+    def test_claim_of_a_dead_request_lapses(self):
+        self.open()
+        with mock.patch.object(checkpoints.time, 'time', return_value=checkpoints.time.time() + 61):
+            self.open().release()
+
+
+@override_settings(RESULT_CACHE_ENABLED=False)
+class TranslationErrorTests(SimpleTestCase):
+    """One extra language failing does not cost the request its other translations"""
+
+    stored = {'transcript': 'namaste', 'translations': {}, 'sourceLanguage': 'hi', 'targetLanguage': 'en',
+              'contentHash': 'abc', 'meetingId': None}
+
+    def setUp(self):
+        def translate_text(text, source_lang, target_lang):
+            if target_lang == 'ta':
+                raise APIError("Bhashini compute failed: 503", 503, "bhashini")
+            return f"{text} ({target_lang})"
+
+        service = mock.Mock()
+        service.translate_many = lambda text, source_lang, langs: pipeline.BhashiniService.translate_many(
+            service, text, source_lang, langs)
+        service.translate_text = translate_text
+        patcher = mock.patch.object(pipeline, 'get_bhashini_service', return_value=service)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_failed_language_is_reported_beside_the_others(self):
+        translations, errors = pipeline.translate_extra_targets('namaste', 'hi', ['en', 'ta', 'bn'])
+        self.assertEqual(translations, {'en': 'namaste (en)', 'bn': 'namaste (bn)'})
+        self.assertEqual(errors, {'ta': {'message': "Bhashini compute failed: 503", 'service': 'bhashini',
+                                         'statusCode': 503}})
+
+    def test_retranslation_returns_what_succeeded(self):
+        result = pipeline.retranslate_transcript(self.stored, ['ta', 'en'])
+        self.assertEqual(result['data']['translations'], {'en': 'namaste (en)'})
+        self.assertEqual(list(result['data']['translationErrors']), ['ta'])
+
+    def test_retranslation_fails_when_nothing_translated(self):
+        with self.assertRaises(APIError) as raised:
+            pipeline.retranslate_transcript(self.stored, ['ta'])
+        self.assertEqual(raised.exception.status_code, 503)
+
+
+class OrphanedJobTests(SimpleTestCase):
+    """Jobs left behind by a worker that is gone are failed, even when its PID is reused"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = jobs.JobStore(os.path.join(self.tmp.name, 'jobs.sqlite3'))
+
+    def job_of(self, worker):
+        job_id = self.store.create('process-audio', {}, ['transcription'])
+        self.store.connect().execute("UPDATE jobs SET worker = ? WHERE id = ?", (worker, job_id))
+        return job_id
+
+    def test_recycled_pid_does_not_keep_a_job_running(self):
+        # What a restarted container's worker with the same PID looks like
+        job_id = self.job_of(f"{os.getpid()}:0")
+        self.assertEqual(self.store.get(job_id)['status'], jobs.JOB_FAILED)
+
+    def test_live_workers_keep_their_jobs(self):
+        parent = os.getppid()
+        job_id = self.job_of(f"{parent}:{storage._process_start_time(parent)}")
+        self.assertEqual(self.store.get(job_id)['status'], jobs.JOB_QUEUED)
+        self.assertEqual(self.store.get(self.store.create('process-audio', {}, []))['status'], jobs.JOB_QUEUED)
+
+    def test_sweep_fails_orphans_at_startup(self):
+        orphan = self.job_of(f"{os.getppid()}:0")
+        running = self.store.create('process-audio', {}, ['transcription'])
+        self.assertEqual(self.store.sweep(), 1)
+        row = self.store.connect().execute("SELECT status FROM jobs WHERE id = ?", (orphan,)).fetchone()
+        self.assertEqual(row['status'], jobs.JOB_FAILED)
+        row = self.store.connect().execute("SELECT status FROM jobs WHERE id = ?", (running,)).fetchone()
+        self.assertEqual(row['status'], jobs.JOB_QUEUED)
+
+
+def wav_bytes(samples, rate, sample_width=2):
+    """16-bit PCM WAV of float ``samples``, shaped ``(frames,)`` or ``(frames, channels)``"""
+    samples = np.asarray(samples, dtype=np.float64)
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as writer:
+        writer.setnchannels(samples.shape[1])
+        writer.setsampwidth(sample_width)
+        writer.setframerate(rate)
+        writer.writeframes(np.clip(np.round(samples * 32768.0), -32768, 32767).astype('<i2').tobytes())
+    return buffer.getvalue()
+
+
+def read_wav(source):
+    with source.open() as f, wave.open(f, 'rb') as reader:
+        params = reader.getparams()
+        return params, audio.pcm_to_float(reader.readframes(params.nframes), params.sampwidth, params.nchannels)
+
+
+class ResamplerTests(SimpleTestCase):
+    """Block-wise resampling matches one-shot resampling and keeps the recording's length"""
+
+    def tone(self, rate, seconds=1.0, hz=440.0):
+        return 0.5 * np.sin(2 * np.pi * hz * np.arange(int(rate * seconds)) / rate)
+
+    def resample(self, samples, source_rate, target_rate, block=None):
+        resampler = audio.StreamingResampler(source_rate, target_rate)
+        block = block or len(samples)
+        parts = [resampler.process(samples[i:i + block]) for i in range(0, len(samples), block)]
+        return np.concatenate(parts + [resampler.flush()])
+
+    def test_output_length_follows_rate_ratio(self):
+        for source_rate, target_rate in [(48000, 16000), (44100, 16000), (22050, 16000), (8000, 16000)]:
+            samples = self.tone(source_rate, seconds=2.0)
+            output = self.resample(samples, source_rate, target_rate)
+            self.assertLessEqual(abs(len(output) - 2 * target_rate), 1, (source_rate, target_rate))
+
+    def test_blocks_join_without_seams(self):
+        samples = self.tone(44100, seconds=2.0)
+        whole = self.resample(samples, 44100, 16000)
+        # Odd block sizes put the boundaries at every phase of the filter and interpolation
+        for block in (1000, 4099, 44100):
+            chunked = self.resample(samples, 44100, 16000, block=block)
+            self.assertEqual(len(chunked), len(whole))
+            np.testing.assert_allclose(chunked, whole, atol=1e-9)
+
+    def test_tone_survives_resampling(self):
+        output = self.resample(self.tone(48000), 48000, 16000)
+        expected = self.tone(16000)
+        # Skip the filter's start-up and tail, where the input is zero-padded
+        np.testing.assert_allclose(output[200:-200], expected[200:-200], atol=1e-3)
+
+    def test_short_blocks_are_buffered(self):
+        resampler = audio.StreamingResampler(48000, 16000)
+        self.assertEqual(len(resampler.process(np.ones(10))), 0)
+        self.assertGreater(len(resampler.flush()), 0)
+
+
+class NormalizeWavTests(SimpleTestCase):
+    """Uploads are downmixed to mono 16-bit at the ASR sample rate"""
+
+    def test_stereo_is_averaged_to_mono(self):
+        left = 0.5 * np.sin(2 * np.pi * 300 * np.arange(16000) / 16000)
+        stereo = np.stack([left, np.zeros_like(left)], axis=1)
+        params, samples = read_wav(audio.normalize_wav(audio.AudioSource('wav', content=wav_bytes(stereo, 16000))))
+        self.assertEqual((params.nchannels, params.sampwidth, params.framerate), (1, 2, 16000))
+        self.assertEqual(params.nframes, 16000)
+        np.testing.assert_allclose(samples[:, 0], left / 2, atol=2 / 32768)
+
+    def test_opposite_channels_cancel(self):
+        left = 0.5 * np.sin(2 * np.pi * 300 * np.arange(16000) / 16000)
+        stereo = np.stack([left, -left], axis=1)
+        _, samples = read_wav(audio.normalize_wav(audio.AudioSource('wav', content=wav_bytes(stereo, 16000))))
+        self.assertLessEqual(np.abs(samples).max(), 1 / 32768)
+
+    def test_stereo_is_resampled(self):
+        tone = 0.5 * np.sin(2 * np.pi * 440 * np.arange(44100 * 3) / 44100)
+        source = audio.AudioSource('wav', content=wav_bytes(np.stack([tone, tone], axis=1), 44100))
+        with mock.patch.object(audio, 'NORMALIZE_BLOCK_FRAMES', 10007):
+            params, samples = read_wav(audio.normalize_wav(source))
+        self.assertEqual((params.nchannels, params.framerate), (1, 16000))
+        self.assertLessEqual(abs(params.nframes - 3 * 16000), 1)
+        expected = 0.5 * np.sin(2 * np.pi * 440 * np.arange(params.nframes) / 16000)
+        np.testing.assert_allclose(samples[200:-200, 0], expected[200:-200], atol=2e-3)
+
+    def test_already_normalized_audio_is_left_alone(self):
+        source = audio.AudioSource('wav', content=wav_bytes(np.zeros(1600), 16000))
+        self.assertIsNone(audio.normalize_wav(source))
+
+
+class SilenceTrimTests(SimpleTestCase):
+    """Trimmed offsets map back to where they were in the original recording"""
+
+    # 30 ms analysis frames at 16 kHz are 480 samples; keep every section frame-aligned
+    FRAME = 480
+
+    def recording(self, *sections):
+        parts = []
+        for voiced, frames in sections:
+            n = frames * self.FRAME
+            parts.append(0.5 * np.sin(2 * np.pi * 440 * np.arange(n) / 16000) if voiced else np.zeros(n))
+        return audio.AudioSource('wav', content=wav_bytes(np.concatenate(parts), 16000))
+
+    def test_long_silence_is_compressed(self):
+        # 1.98 s speech, 3 s silence, 1.98 s speech; 150 ms of the pause is kept on each side
+        trimmed, time_map = audio.trim_silence(self.recording((True, 66), (False, 100), (True, 66)))
+        self.assertEqual(time_map.spans, [(0, 0, 2130), (2130, 4830, 2130)])
+        self.assertEqual(time_map.original_ms, 6960)
+        self.assertEqual(time_map.trimmed_ms, 4260)
+        params, _ = read_wav(trimmed)
+        self.assertEqual(params.nframes, (71 + 71) * self.FRAME)
+
+        self.assertEqual(time_map.to_original(0), 0)
+        self.assertEqual(time_map.to_original(1000), 1000)
+        self.assertEqual(time_map.to_original(2129), 2129)
+        self.assertEqual(time_map.to_original(2130), 4830)
+        self.assertEqual(time_map.to_original(3000), 5700)
+        self.assertEqual(time_map.to_original(4260), 6960)
+
+    def test_offsets_are_clamped_to_the_recording(self):
+        time_map = audio.TimeMap([(0, 500, 1000), (1000, 3000, 1000)], 5000)
+        self.assertEqual(time_map.to_original(-10), 500)
+        self.assertEqual(time_map.to_original(9999), 4000)
+        self.assertEqual(time_map.trimmed_percent, 60.0)
+        self.assertEqual(audio.TimeMap([], 5000).to_original(1234), 1234)
+
+    def test_short_pauses_are_kept(self):
+        self.assertIsNone(audio.trim_silence(self.recording((True, 66), (False, 20), (True, 66))))
+
+    def test_plan_voiced_spans(self):
+        levels = np.array([-10.0] * 10 + [-100.0] * 50 + [-10.0] * 10)
+        self.assertEqual(audio.plan_voiced_spans(levels, 30), [(0, 15), (55, 70)])
+        self.assertEqual(audio.plan_voiced_spans(np.zeros(0), 30), [])
+        # A steady level is never below itself, so nothing counts as silence
+        self.assertEqual(audio.plan_voiced_spans(np.full(10, -100.0), 30), [(0, 10)])
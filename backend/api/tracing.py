@@ -0,0 +1,368 @@
+"""
+Lightweight request tracing with OTLP-compatible JSON export.
+
+A trace starts at the view (``start_trace``) and stages below it open child
+spans with ``span``. The active span lives in a context variable, so it follows
+asyncio tasks and ``asyncio.to_thread`` automatically; work handed to thread
+pools is wrapped with ``bind`` to keep its parent (and the request deadline).
+
+Every request gets a trace id (returned as ``X-Trace-Id``), but only sampled
+traces record spans: unsampled ones hand out a shared no-op span, so leaving
+tracing on costs a context-variable lookup per stage. Finished spans of
+sampled traces are queued and written in batches by a background thread,
+either as OTLP/HTTP JSON to a collector (``TRACE_OTLP_ENDPOINT``) or as one
+ExportTraceServiceRequest per line to a local file (``TRACE_EXPORT_PATH``).
+A full queue drops spans rather than slowing requests down.
+"""
+import os
+import json
+import time
+import queue
+import random
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = 'meeting-assistant-backend'
+
+# OTLP span kinds and status codes
+KIND_INTERNAL, KIND_SERVER, KIND_CLIENT = 1, 2, 3
+STATUS_OK, STATUS_ERROR = 1, 2
+
+
+class Span:
+    """One timed operation; only created for sampled traces"""
+
+    __slots__ = ('trace_id', 'span_id', 'parent_span_id', 'name', 'kind', 'start_ns', 'end_ns',
+                 'attributes', 'status', 'status_message', 'sampled')
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: str = '', kind: int = KIND_INTERNAL,
+                 attributes: Optional[Dict[str, Any]] = None, sampled: bool = True):
+        self.trace_id = trace_id
+        self.span_id = _random_hex(8)
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = dict(attributes) if attributes else {}
+        self.status = 0
+        self.status_message = ''
+        self.sampled = sampled
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def record_error(self, error: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = getattr(error, 'message', None) or str(error)
+        self.attributes['error.type'] = type(error).__name__
+        for attr, key in (('status_code', 'error.status_code'), ('service', 'error.service')):
+            if hasattr(error, attr):
+                self.attributes[key] = getattr(error, attr)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+        }
+        if self.parent_span_id:
+            span['parentSpanId'] = self.parent_span_id
+        if self.status:
+            span['status'] = {'code': self.status, 'message': self.status_message}
+        return span
+
+
+class _UnsampledSpan:
+    """Stands in for spans of unsampled traces; carries the trace id and records nothing"""
+
+    sampled = False
+    span_id = ''
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def record_error(self, error: BaseException) -> None:
+        pass
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar('trace_span', default=None)
+# Context variables ``bind`` hands to pool threads; a whole copied context would also
+# carry Django's per-thread state (database connections) across threads
+_propagated: List[contextvars.ContextVar] = [_current]
+
+
+def _random_hex(nbytes: int) -> str:
+    return random.getrandbits(nbytes * 8).to_bytes(nbytes, 'big').hex()
+
+
+def new_trace_id() -> str:
+    return _random_hex(16)
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        encoded = {'boolValue': value}
+    elif isinstance(value, int):
+        encoded = {'intValue': str(value)}
+    elif isinstance(value, float):
+        encoded = {'doubleValue': value}
+    else:
+        encoded = {'stringValue': str(value)}
+    return {'key': key, 'value': encoded}
+
+
+def parse_traceparent(header: str) -> Optional[tuple]:
+    """Return (trace_id, parent_span_id, sampled) from a W3C traceparent header, or None"""
+    parts = header.strip().split('-')
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    if parts[1] == '0' * 32:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+def _settings():
+    from django.conf import settings
+    return settings
+
+
+@contextmanager
+def start_trace(name: str, attributes: Optional[Dict[str, Any]] = None, traceparent: str = '',
+                kind: int = KIND_SERVER, trace_id: Optional[str] = None) -> Iterator[Any]:
+    """
+    Open the root span of a trace.
+
+    A valid ``traceparent`` header continues the caller's trace and follows its
+    sampling decision; otherwise a new trace (with ``trace_id`` if given) is
+    sampled at TRACE_SAMPLE_RATE.
+    """
+    settings = _settings()
+    parent = parse_traceparent(traceparent) if traceparent else None
+    if parent:
+        trace_id, parent_span_id, sampled = parent
+    else:
+        trace_id, parent_span_id = trace_id or new_trace_id(), ''
+        sampled = random.random() < getattr(settings, 'TRACE_SAMPLE_RATE', 0.1)
+    sampled = sampled and getattr(settings, 'TRACING_ENABLED', True)
+
+    root = Span(name, trace_id, parent_span_id, kind, attributes) if sampled else _UnsampledSpan(trace_id)
+    with _activate(root):
+        yield root
+
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict[str, Any]] = None, kind: int = KIND_INTERNAL) -> Iterator[Any]:
+    """Open a child of the current span (a no-op outside a sampled trace)"""
+    parent = _current.get()
+    if parent is None or not parent.sampled:
+        yield parent if parent is not None else _NO_TRACE
+        return
+    with _activate(Span(name, parent.trace_id, parent.span_id, kind, attributes)) as child:
+        yield child
+
+
+@contextmanager
+def _activate(current) -> Iterator[Any]:
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.record_error(e)
+        raise
+    finally:
+        _current.reset(token)
+        if current.sampled:
+            current.end_ns = time.time_ns()
+            if current.status == 0:
+                current.status = STATUS_OK
+            get_exporter().enqueue(current)
+
+
+def current_span():
+    """The active span (possibly a no-op), or None outside any trace"""
+    return _current.get()
+
+
+def current_trace_id() -> Optional[str]:
+    current = _current.get()
+    return current.trace_id if current is not None and current.trace_id else None
+
+
+def set_attribute(key: str, value: Any) -> None:
+    """Attach an attribute to the active span, if it is recording"""
+    current = _current.get()
+    if current is not None:
+        current.set_attribute(key, value)
+
+
+def propagate(var: contextvars.ContextVar) -> contextvars.ContextVar:
+    """Have ``bind`` carry ``var`` over to pool threads along with the current span"""
+    _propagated.append(var)
+    return var
+
+
+def bind(func: Callable) -> Callable:
+    """Wrap ``func`` so it runs under the caller's current span (and ``propagate``d state), e.g. on a pool thread"""
+    values = [(var, var.get()) for var in _propagated]
+
+    def bound(*args, **kwargs):
+        tokens = [(var, var.set(value)) for var, value in values]
+        try:
+            return func(*args, **kwargs)
+        finally:
+            for var, token in reversed(tokens):
+                var.reset(token)
+
+    return bound
+
+
+_NO_TRACE = _UnsampledSpan('')
+
+
+class SpanExporter:
+    """Batches finished spans and ships them from a background thread"""
+
+    def __init__(self, otlp_endpoint: str = '', path: str = '', max_queue: int = 4096,
+                 batch_size: int = 256, interval: float = 5.0, max_file_bytes: int = 64 * 1024 * 1024):
+        self.otlp_endpoint = otlp_endpoint
+        self.path = path
+        self.max_file_bytes = max_file_bytes
+        self.batch_size = batch_size
+        self.interval = interval
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.exported = 0
+        self._thread = threading.Thread(target=self._run, name='trace-exporter', daemon=True)
+        self._thread.start()
+
+    def enqueue(self, finished: Span) -> None:
+        try:
+            self.queue.put_nowait(finished)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            batch, flushed = self._next_batch()
+            if batch:
+                try:
+                    self.export(batch)
+                    self.exported += len(batch)
+                except Exception as e:
+                    logger.warning(f"Trace export of {len(batch)} spans failed: {str(e)}")
+            if flushed is not None:
+                flushed.set()
+
+    def _next_batch(self) -> tuple:
+        """Collect up to ``batch_size`` spans or whatever arrives within ``interval``; stop early at a flush request"""
+        batch = []
+        deadline = None
+        while len(batch) < self.batch_size:
+            try:
+                if deadline is None:
+                    item = self.queue.get()
+                    deadline = time.monotonic() + self.interval
+                else:
+                    item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if isinstance(item, threading.Event):
+                return batch, item
+            batch.append(item)
+        return batch, None
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Export every span queued so far; returns False if that did not finish within ``timeout``"""
+        flushed = threading.Event()
+        self.queue.put(flushed, timeout=timeout)
+        return flushed.wait(timeout)
+
+    @staticmethod
+    def to_otlp(batch: List[Span]) -> Dict[str, Any]:
+        """An OTLP ExportTraceServiceRequest in its JSON encoding"""
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': [
+                    _otlp_attribute('service.name', SERVICE_NAME),
+                    _otlp_attribute('process.pid', os.getpid()),
+                ]},
+                'scopeSpans': [{
+                    'scope': {'name': __name__},
+                    'spans': [finished.to_otlp() for finished in batch],
+                }],
+            }]
+        }
+
+    def export(self, batch: List[Span], timeout: float = 10.0) -> None:
+        """Send one batch to the collector, or append it to the export file"""
+        payload = self.to_otlp(batch)
+        if self.otlp_endpoint:
+            response = requests.post(self.otlp_endpoint, json=payload, timeout=timeout)
+            if response.status_code >= 300:
+                raise RuntimeError(f"collector answered {response.status_code}")
+        elif self.path:
+            try:
+                if os.path.getsize(self.path) > self.max_file_bytes:
+                    # Keep one previous file around, like a size-rotated log
+                    os.replace(self.path, self.path + '.1')
+            except FileNotFoundError:
+                pass
+            # One request per line; O_APPEND keeps lines from several workers intact
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(payload, separators=(',', ':')) + '\n')
+
+
+_exporter: Optional[SpanExporter] = None
+_exporter_pid: Optional[int] = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter() -> SpanExporter:
+    """Get or create this process's exporter (recreated after a fork, like the HTTP clients)"""
+    global _exporter, _exporter_pid
+    pid = os.getpid()
+    if _exporter is None or _exporter_pid != pid:
+        with _exporter_lock:
+            if _exporter is None or _exporter_pid != pid:
+                settings = _settings()
+                path = str(getattr(settings, 'TRACE_EXPORT_PATH', '') or '')
+                if path:
+                    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+                _exporter = SpanExporter(
+                    otlp_endpoint=getattr(settings, 'TRACE_OTLP_ENDPOINT', ''),
+                    path=path,
+                    max_queue=getattr(settings, 'TRACE_EXPORT_MAX_QUEUE', 4096),
+                    batch_size=getattr(settings, 'TRACE_EXPORT_BATCH_SIZE', 256),
+                    interval=getattr(settings, 'TRACE_EXPORT_INTERVAL', 5.0),
+                    max_file_bytes=getattr(settings, 'TRACE_EXPORT_MAX_BYTES', 64 * 1024 * 1024),
+                )
+                _exporter_pid = pid
+    return _exporter
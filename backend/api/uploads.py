@@ -0,0 +1,405 @@
+"""
+Resumable chunked uploads for large recordings.
+
+A client creates an upload with the file's name, size and processing
+options, then PUTs fixed-size chunks, in any order and in parallel, each
+with its SHA-256. Chunks are written straight into place in one file
+preallocated under ``UPLOAD_DIR``, so the recording is assembled on disk as
+the last chunk lands. Chunk 0 is probed for a supported audio container as
+soon as it arrives, so a file that is not audio is refused before the rest
+is sent. Re-sending a stored chunk is a no-op, and the status reports which
+chunks are missing and how many leading bytes are complete, for resuming
+after a dropped connection.
+
+The assembled file is kept until its processing job succeeds. When the job
+fails the upload is reopened with the error recorded, and re-sending any
+chunk processes it again. Bytes held by unfinished uploads are capped per
+client and in total, so uploads cannot fill the disk.
+
+Upload records live in a SQLite file shared by the gunicorn workers, so
+chunks of one upload may land on different workers. Unfinished uploads
+expire ``UPLOAD_TTL_SECONDS`` after their last chunk.
+"""
+import os
+import json
+import time
+import uuid
+import hashlib
+import logging
+import threading
+from typing import Any, BinaryIO, Dict, Optional
+
+from django.conf import settings
+
+from .audio import probe_format
+from .services import MAX_AUDIO_BYTES, APIError, get_audio_format_from_filename
+from .storage import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+UPLOADING = 'uploading'
+COMPLETE = 'complete'
+PROCESSING = 'processing'
+PROCESSED = 'processed'
+FAILED = 'failed'
+
+# States whose file is still on disk
+OUTSTANDING = (UPLOADING, COMPLETE, PROCESSING)
+
+MIN_CHUNK_SIZE = 256 * 1024
+MAX_CHUNK_SIZE = 16 * 1024 * 1024
+
+# How long a request writing a chunk holds its index against concurrent writers
+CHUNK_WRITE_LEASE = 10 * 60
+
+# Bytes of chunk 0 kept for format probing
+PROBE_BYTES = 64
+
+READ_BLOCK_SIZE = 256 * 1024
+
+
+class UploadStore(SQLiteStore):
+    """Upload records and the checksums of their stored chunks"""
+
+    schema = """
+    CREATE TABLE IF NOT EXISTS uploads (
+        id TEXT PRIMARY KEY,
+        client TEXT NOT NULL,
+        file_name TEXT NOT NULL,
+        format TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        chunk_size INTEGER NOT NULL,
+        chunks INTEGER NOT NULL,
+        options TEXT NOT NULL,
+        state TEXT NOT NULL,
+        error TEXT,
+        job_id TEXT,
+        created_at REAL NOT NULL,
+        expires_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS uploads_expires_at ON uploads (expires_at);
+    CREATE INDEX IF NOT EXISTS uploads_client ON uploads (client, state);
+    CREATE TABLE IF NOT EXISTS upload_chunks (
+        upload_id TEXT NOT NULL,
+        idx INTEGER NOT NULL,
+        sha256 TEXT NOT NULL,
+        -- 0 while one request writes the chunk, which holds the index until claimed_until
+        stored INTEGER NOT NULL,
+        claimed_until REAL NOT NULL,
+        PRIMARY KEY (upload_id, idx)
+    );
+    """
+
+
+class ChunkedUploads:
+    """Creates uploads, stores their chunks on disk and reports what is still missing"""
+
+    def __init__(self, store: UploadStore, upload_dir: str, max_bytes: int = MAX_AUDIO_BYTES,
+                 chunk_size: int = 4 * 1024 * 1024, ttl: float = 24 * 60 * 60,
+                 max_client_bytes: int = 1024 * 1024 * 1024, max_total_bytes: int = 4 * 1024 * 1024 * 1024):
+        self.store = store
+        self.upload_dir = str(upload_dir)
+        self.max_bytes = max_bytes
+        self.max_client_bytes = max_client_bytes
+        self.max_total_bytes = max_total_bytes
+        self.chunk_size = chunk_size
+        self.ttl = ttl
+        os.makedirs(self.upload_dir, exist_ok=True)
+
+    def file_path(self, upload_id: str) -> str:
+        return os.path.join(self.upload_dir, f"{upload_id}.part")
+
+    def create(self, file_name: str, size: int, options: Dict[str, Any],
+               chunk_size: Optional[int] = None, client: str = '') -> Dict[str, Any]:
+        """
+        Register an upload and preallocate its file; ``options`` are the processing options to run with.
+
+        Raises a 429 ``APIError`` when ``client`` already holds ``max_client_bytes``
+        in unfinished uploads, and a 503 when all clients together hold ``max_total_bytes``.
+        """
+        if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+            raise APIError("size must be a positive number of bytes", 400, "validation")
+        if size > self.max_bytes:
+            raise APIError(f"File size too large. Maximum allowed size is {self.max_bytes // (1024 * 1024)}MB",
+                           400, "validation")
+        chunk_size = chunk_size or self.chunk_size
+        if not isinstance(chunk_size, int) or not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+            raise APIError(f"chunkSize must be between {MIN_CHUNK_SIZE} and {MAX_CHUNK_SIZE} bytes", 400, "validation")
+        self.expire()
+
+        upload_id = uuid.uuid4().hex
+        now = time.time()
+        with self.store.transaction() as conn:
+            self._check_outstanding(conn, client, size)
+            conn.execute(
+                'INSERT INTO uploads (id, client, file_name, format, size, chunk_size, chunks, options, state, '
+                'created_at, expires_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (upload_id, client, file_name, get_audio_format_from_filename(file_name), size, chunk_size,
+                 -(-size // chunk_size), json.dumps(options), UPLOADING, now, now + self.ttl),
+            )
+        try:
+            # Sparse until written; parallel chunks each fill their own range
+            with open(self.file_path(upload_id), 'wb') as f:
+                f.truncate(size)
+        except Exception:
+            self.store.connect().execute('DELETE FROM uploads WHERE id = ?', (upload_id,))
+            self._remove_file(upload_id)
+            raise
+        logger.info(f"Created upload {upload_id}: {file_name} ({size} bytes, {chunk_size}-byte chunks)")
+        return self.status(upload_id)
+
+    def _check_outstanding(self, conn, client: str, size: int) -> None:
+        """Refuse an upload that would take a client, or the server, past its cap on bytes awaiting processing"""
+        placeholders = ', '.join('?' * len(OUTSTANDING))
+        client_bytes = conn.execute(
+            f'SELECT COALESCE(SUM(size), 0) FROM uploads WHERE client = ? AND state IN ({placeholders})',
+            (client, *OUTSTANDING),
+        ).fetchone()[0]
+        if client_bytes + size > self.max_client_bytes:
+            raise APIError("Too many unfinished uploads; finish, abort or wait for earlier ones", 429, "uploads",
+                           retry_after=60)
+        total_bytes = conn.execute(
+            f'SELECT COALESCE(SUM(size), 0) FROM uploads WHERE state IN ({placeholders})', OUTSTANDING,
+        ).fetchone()[0]
+        if total_bytes + size > self.max_total_bytes:
+            raise APIError("Upload storage is full, please retry later", 503, "uploads", retry_after=60)
+
+    def _row(self, conn, upload_id: str):
+        row = conn.execute('SELECT * FROM uploads WHERE id = ?', (upload_id,)).fetchone()
+        if row is None or (row['state'] == UPLOADING and row['expires_at'] < time.time()):
+            raise APIError("Upload not found or expired", 404, "uploads")
+        return row
+
+    def get(self, upload_id: str) -> Dict[str, Any]:
+        """The upload record with its options decoded; raises a 404 ``APIError`` if it does not exist"""
+        upload = dict(self._row(self.store.connect(), upload_id))
+        upload['options'] = json.loads(upload['options'])
+        return upload
+
+    def status(self, upload_id: str) -> Dict[str, Any]:
+        """Client-facing progress: stored and missing chunks, and the contiguous offset to resume from"""
+        conn = self.store.connect()
+        row = self._row(conn, upload_id)
+        received = {r['idx'] for r in conn.execute('SELECT idx FROM upload_chunks WHERE upload_id = ? AND stored = 1',
+                                                   (upload_id,))}
+        missing = [index for index in range(row['chunks']) if index not in received]
+        offset = row['size'] if not missing else missing[0] * row['chunk_size']
+        return {
+            'id': row['id'],
+            'fileName': row['file_name'],
+            'format': row['format'],
+            'size': row['size'],
+            'chunkSize': row['chunk_size'],
+            'chunks': row['chunks'],
+            'receivedChunks': len(received),
+            'missingChunks': missing,
+            'offset': offset,
+            'state': row['state'],
+            'error': row['error'],
+            'jobId': row['job_id'],
+            'expiresAt': row['expires_at'],
+        }
+
+    def write_chunk(self, upload_id: str, index: int, stream: BinaryIO, length: int,
+                    checksum: str) -> bool:
+        """
+        Store chunk ``index`` read from ``stream`` if it matches ``checksum`` (hex SHA-256).
+
+        Returns True for exactly one caller: the one whose chunk completed the
+        upload, which is then responsible for starting the processing.
+        """
+        upload = self.get(upload_id)
+        if upload['state'] == FAILED:
+            raise APIError(upload['error'] or "Upload failed", 409, "uploads")
+        if upload['state'] != UPLOADING:
+            # Already complete: a retried final chunk
+            return False
+        if not 0 <= index < upload['chunks']:
+            raise APIError(f"Chunk index must be between 0 and {upload['chunks'] - 1}", 400, "validation")
+        offset = index * upload['chunk_size']
+        expected = min(upload['chunk_size'], upload['size'] - offset)
+        if length != expected:
+            raise APIError(f"Chunk {index} must be {expected} bytes, got {length}", 400, "validation")
+        checksum = (checksum or '').strip().lower()
+        if len(checksum) != 64 or any(c not in '0123456789abcdef' for c in checksum):
+            raise APIError("X-Chunk-Sha256 header with the chunk's hex SHA-256 is required", 400, "validation")
+
+        if self._claim_chunk(upload_id, index, checksum):
+            try:
+                header = self._write_range(upload_id, stream, offset, length, checksum)
+                if index == 0:
+                    self._probe(upload, header)
+            except BaseException:
+                self._release_chunk(upload_id, index, checksum)
+                raise
+        return self._commit_chunk(upload_id, index, checksum)
+
+    def _claim_chunk(self, upload_id: str, index: int, checksum: str) -> bool:
+        """
+        Take chunk ``index`` for writing; False if it is already stored with this checksum.
+
+        Only one request writes an index at a time, so the bytes on disk are
+        always those of the checksum that gets recorded.
+        """
+        now = time.time()
+        with self.store.transaction() as conn:
+            row = conn.execute('SELECT sha256, stored, claimed_until FROM upload_chunks WHERE upload_id = ? AND idx = ?',
+                               (upload_id, index)).fetchone()
+            if row is not None and row['stored']:
+                if row['sha256'] != checksum:
+                    raise APIError(f"Chunk {index} was already stored with different content", 409, "uploads")
+                return False
+            if row is not None and row['claimed_until'] > now:
+                raise APIError(f"Chunk {index} is being written by another request", 409, "uploads", retry_after=5)
+            conn.execute('INSERT OR REPLACE INTO upload_chunks (upload_id, idx, sha256, stored, claimed_until) '
+                         'VALUES (?, ?, ?, 0, ?)', (upload_id, index, checksum, now + CHUNK_WRITE_LEASE))
+        return True
+
+    def _release_chunk(self, upload_id: str, index: int, checksum: str) -> None:
+        """Give up a claimed index after a failed write; the chunk stays missing"""
+        self.store.connect().execute(
+            'DELETE FROM upload_chunks WHERE upload_id = ? AND idx = ? AND sha256 = ? AND stored = 0',
+            (upload_id, index, checksum),
+        )
+
+    def _write_range(self, upload_id: str, stream: BinaryIO, offset: int, length: int, checksum: str) -> bytes:
+        """Copy ``length`` bytes from ``stream`` into place, verifying them as they pass; returns the first bytes"""
+        digest = hashlib.sha256()
+        header = b''
+        try:
+            fd = os.open(self.file_path(upload_id), os.O_WRONLY)
+        except FileNotFoundError:
+            # Failed or aborted while this chunk was on its way
+            raise APIError("Upload not found or no longer accepting chunks", 409, "uploads")
+        try:
+            position, remaining = offset, length
+            while remaining:
+                block = stream.read(min(READ_BLOCK_SIZE, remaining))
+                if not block:
+                    raise APIError("Chunk body ended early", 400, "validation")
+                digest.update(block)
+                if len(header) < PROBE_BYTES:
+                    header += block[:PROBE_BYTES - len(header)]
+                position += os.pwrite(fd, block, position)
+                remaining -= len(block)
+        finally:
+            os.close(fd)
+        if digest.hexdigest() != checksum:
+            # The range is left as is; the chunk is not recorded, so it stays missing
+            raise APIError("Chunk checksum mismatch", 400, "validation")
+        return header
+
+    def _probe(self, upload: Dict[str, Any], header: bytes) -> None:
+        """Check the container as soon as the start of the file is in, so a bad file is refused early"""
+        audio_format = probe_format(header)
+        if audio_format is None:
+            message = "Unsupported file format. Supported formats: .wav, .mp3, .flac, .m4a, .ogg"
+            self.fail(upload['id'], message)
+            raise APIError(message, 400, "validation")
+        if audio_format != upload['format']:
+            logger.info(f"Upload {upload['id']} is {audio_format}, not {upload['format']} as its name suggests")
+            self.store.connect().execute('UPDATE uploads SET format = ? WHERE id = ?', (audio_format, upload['id']))
+
+    def _commit_chunk(self, upload_id: str, index: int, checksum: str) -> bool:
+        with self.store.transaction() as conn:
+            recorded = conn.execute('UPDATE upload_chunks SET stored = 1 WHERE upload_id = ? AND idx = ? AND sha256 = ?',
+                                    (upload_id, index, checksum)).rowcount
+            if not recorded:
+                # The claim lapsed and another request took the index over
+                raise APIError(f"Chunk {index} was overwritten by another request; send it again", 409, "uploads")
+            row = conn.execute('SELECT chunks, state FROM uploads WHERE id = ?', (upload_id,)).fetchone()
+            if row is None or row['state'] != UPLOADING:
+                return False
+            received = conn.execute('SELECT COUNT(*) FROM upload_chunks WHERE upload_id = ? AND stored = 1',
+                                    (upload_id,)).fetchone()[0]
+            if received < row['chunks']:
+                conn.execute('UPDATE uploads SET expires_at = ? WHERE id = ?', (time.time() + self.ttl, upload_id))
+                return False
+            conn.execute('UPDATE uploads SET state = ? WHERE id = ?', (COMPLETE, upload_id))
+        logger.info(f"Upload {upload_id} complete")
+        return True
+
+    def mark_processing(self, upload_id: str, job_id: str) -> None:
+        """Record the job processing the assembled file; it stays on disk until ``processed``"""
+        # A quick job may already have finished and moved the upload on
+        self.store.connect().execute(
+            'UPDATE uploads SET job_id = ?, expires_at = ?, '
+            'state = CASE WHEN state = ? THEN ? ELSE state END, error = CASE WHEN state = ? THEN NULL ELSE error END '
+            'WHERE id = ?',
+            (job_id, time.time() + self.ttl, COMPLETE, PROCESSING, COMPLETE, upload_id),
+        )
+
+    def processed(self, upload_id: str) -> None:
+        """The job succeeded: the file is no longer needed"""
+        self.store.connect().execute('UPDATE uploads SET state = ?, error = NULL WHERE id = ? AND state IN (?, ?)',
+                                     (PROCESSED, upload_id, COMPLETE, PROCESSING))
+        self._remove_file(upload_id)
+
+    def processing_failed(self, upload_id: str, error: str) -> None:
+        """The job failed: keep the file and reopen the upload, so re-sending any chunk processes it again"""
+        self.store.connect().execute(
+            'UPDATE uploads SET state = ?, error = ?, expires_at = ? WHERE id = ? AND state IN (?, ?)',
+            (UPLOADING, error, time.time() + self.ttl, upload_id, COMPLETE, PROCESSING),
+        )
+        logger.info(f"Upload {upload_id} reopened after failed processing: {error}")
+
+    def reopen(self, upload_id: str) -> None:
+        """Undo completion when processing could not be started, so re-sending the last chunk retries it"""
+        self.store.connect().execute('UPDATE uploads SET state = ? WHERE id = ? AND state = ?',
+                                     (UPLOADING, upload_id, COMPLETE))
+
+    def fail(self, upload_id: str, error: str) -> None:
+        self.store.connect().execute('UPDATE uploads SET state = ?, error = ? WHERE id = ?',
+                                     (FAILED, error, upload_id))
+        self._remove_file(upload_id)
+
+    def delete(self, upload_id: str) -> bool:
+        """Abort an upload that is not being processed"""
+        with self.store.transaction() as conn:
+            deleted = conn.execute('DELETE FROM uploads WHERE id = ? AND state IN (?, ?)',
+                                   (upload_id, UPLOADING, FAILED)).rowcount
+            if deleted:
+                conn.execute('DELETE FROM upload_chunks WHERE upload_id = ?', (upload_id,))
+        if deleted:
+            self._remove_file(upload_id)
+        return bool(deleted)
+
+    def expire(self) -> int:
+        """Drop expired records and any files they still have"""
+        now = time.time()
+        with self.store.transaction() as conn:
+            rows = conn.execute('SELECT id, state FROM uploads WHERE expires_at < ?', (now,)).fetchall()
+            for row in rows:
+                conn.execute('DELETE FROM uploads WHERE id = ?', (row['id'],))
+                conn.execute('DELETE FROM upload_chunks WHERE upload_id = ?', (row['id'],))
+        for row in rows:
+            # A processing record only expires long after its job ended, e.g. with a worker that died
+            self._remove_file(row['id'])
+        return len(rows)
+
+    def _remove_file(self, upload_id: str) -> None:
+        try:
+            os.remove(self.file_path(upload_id))
+        except FileNotFoundError:
+            pass
+
+
+_uploads = None
+_uploads_lock = threading.Lock()
+
+
+def get_chunked_uploads() -> ChunkedUploads:
+    """Get or create the chunked upload manager"""
+    global _uploads
+    if _uploads is None:
+        with _uploads_lock:
+            if _uploads is None:
+                _uploads = ChunkedUploads(
+                    UploadStore(settings.UPLOAD_STORE_PATH),
+                    settings.UPLOAD_DIR,
+                    chunk_size=getattr(settings, 'UPLOAD_CHUNK_SIZE', 4 * 1024 * 1024),
+                    ttl=getattr(settings, 'UPLOAD_TTL_SECONDS', 24 * 60 * 60),
+                    max_client_bytes=getattr(settings, 'UPLOAD_MAX_CLIENT_BYTES', 1024 * 1024 * 1024),
+                    max_total_bytes=getattr(settings, 'UPLOAD_MAX_TOTAL_BYTES', 4 * 1024 * 1024 * 1024),
+                )
+    return _uploads
@@ -1,12 +1,32 @@
 """
 URL configuration for the API endpoints.
 """
+from django.conf import settings
 from django.urls import path
 from . import views
 
 urlpatterns = [
-    # Main audio processing endpoint
-    path('process-audio/', views.process_audio, name='process_audio'),
+    # Main audio processing endpoint (native async under ASGI)
+    path('process-audio/', views.process_audio_async if settings.ASYNC_VIEWS else views.process_audio, name='process_audio'),
+    path('process-audio/stream/', views.process_audio_stream, name='process_audio_stream'),
+    path('process-audio/batch/', views.process_audio_batch, name='process_audio_batch'),
+    
+    # Background job status for asynchronous processing
+    path('jobs/<str:job_id>/', views.job_status, name='job_status'),
+    
+    # Downstream stages only, on a stored transcript
+    path('reanalyze/', views.reanalyze, name='reanalyze'),
+    path('retranslate/', views.retranslate, name='retranslate'),
+    
+    # Resumable chunked uploads
+    path('uploads/', views.create_upload, name='create_upload'),
+    path('uploads/<str:upload_id>/', views.upload_detail, name='upload_detail'),
+    path('uploads/<str:upload_id>/chunks/<int:index>/', views.upload_chunk, name='upload_chunk'),
+    
+    # Saved meetings and search
+    path('meetings/', views.meetings, name='meetings'),
+    path('meetings/search/', views.search_meetings, name='search_meetings'),
+    path('meetings/<str:meeting_id>/', views.meeting_detail, name='meeting_detail'),
     
     # Utility endpoints
     path('health/', views.health_check, name='health_check'),
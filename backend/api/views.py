@@ -2,14 +2,22 @@
 API views for the meeting assistant backend.
 Handles audio processing, transcription, translation, and AI analysis.
 """
+import re
 import json
 import logging
 import base64
+import binascii
 import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Any
 
-from django.http import JsonResponse
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, Http404, JsonResponse, StreamingHttpResponse, HttpResponseNotAllowed
+from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils.decorators import method_decorator
@@ -18,20 +26,59 @@ from django.core.files.uploadedfile import InMemoryUploadedFile
 
 from .services import (
     get_bhashini_service, 
-    get_gemini_service, 
     validate_audio_file, 
     get_audio_format_from_filename,
     get_service_health,
     APIError
 )
+from .audio import AudioSource
+from .pipeline import (
+    STAGES, run_meeting_pipeline, arun_meeting_pipeline, reanalyze_transcript, retranslate_transcript,
+)
+from .jobs import get_job_runner, get_job_store
+from .uploads import get_chunked_uploads
+from .checkpoints import open_checkpoint
+from . import meetings as meeting_store
+from . import admission, deadlines, metrics, tracing
 
 logger = logging.getLogger(__name__)
 
 def add_cors_headers(response):
     """Add CORS headers to response"""
     response["Access-Control-Allow-Origin"] = "*"
-    response["Access-Control-Allow-Methods"] = "GET, POST, OPTIONS"
-    response["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
+    response["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
+    response["Access-Control-Allow-Headers"] = "Content-Type, Authorization, X-User-Id, X-Api-Key, X-Chunk-Sha256, Idempotency-Key, traceparent"
+    response["Access-Control-Expose-Headers"] = "X-Trace-Id, Retry-After, Upload-Offset"
+    return response
+
+def trace_request(request, route: str):
+    """Root tracing span for a request, continuing the caller's W3C traceparent if one was sent"""
+    return tracing.start_trace(
+        f"{request.method} {route}",
+        {'http.method': request.method, 'http.route': route},
+        traceparent=request.META.get('HTTP_TRACEPARENT', ''),
+    )
+
+def annotate_trace(params: Dict[str, Any]) -> None:
+    """Record what is being processed on the active span"""
+    span = tracing.current_span()
+    if span is not None:
+        span.set_attributes({
+            'audio.bytes': params['audio'].size,
+            'audio.format': params['audio'].format,
+            'language.source': params['source_lang'],
+            'language.target': params['target_lang'],
+            'language.extra_targets': len(params['extra_target_langs']),
+        })
+
+def _finish_trace(response, error: APIError = None):
+    span = tracing.current_span()
+    if span is not None:
+        span.set_attribute('http.status_code', response.status_code)
+        if error is not None:
+            span.record_error(error)
+        if span.trace_id:
+            response['X-Trace-Id'] = span.trace_id
     return response
 
 def log_request_info(request, endpoint_name):
@@ -45,6 +92,7 @@ def create_error_response(error: APIError, request_start_time: float) -> JsonRes
     """Create standardized error response"""
     duration = time.time() - request_start_time
     logger.error(f"API error after {duration:.2f}s: {error.message}")
+    metrics.record_api_error(error)
     
     response = JsonResponse({
         'success': False,
@@ -52,10 +100,12 @@ def create_error_response(error: APIError, request_start_time: float) -> JsonRes
         'service': error.service,
         'duration': f"{duration:.2f}s"
     }, status=error.status_code)
+    if error.retry_after is not None:
+        response['Retry-After'] = str(error.retry_after)
     
-    return add_cors_headers(response)
+    return _finish_trace(add_cors_headers(response), error)
 
-def create_success_response(data: Dict[str, Any], request_start_time: float) -> JsonResponse:
+def create_success_response(data: Dict[str, Any], request_start_time: float, status: int = 200) -> JsonResponse:
     """Create standardized success response"""
     duration = time.time() - request_start_time
     logger.info(f"Request completed successfully in {duration:.2f}s")
@@ -66,8 +116,257 @@ def create_success_response(data: Dict[str, Any], request_start_time: float) ->
         **data
     }
     
-    response = JsonResponse(response_data)
-    return add_cors_headers(response)
+    response = JsonResponse(response_data, status=status)
+    return _finish_trace(add_cors_headers(response))
+
+@metrics.time_stage('upload_read')
+@tracing.span('upload_read')
+def parse_audio_request(request) -> Dict[str, Any]:
+    """Extract audio and processing options from a multipart or JSON request"""
+    idempotency_key = request.META.get('HTTP_IDEMPOTENCY_KEY', '').strip()
+    if len(idempotency_key) > 255:
+        raise APIError("Idempotency-Key must be at most 255 characters", 400, "validation")
+    
+    if request.content_type and 'multipart/form-data' in request.content_type:
+        # Handle multipart form data
+        audio_file = request.FILES.get('audio')
+        source_lang = request.POST.get('sourceLanguage', 'hi')
+        target_lang = request.POST.get('targetLanguage')
+        target_langs = request.POST.getlist('targetLanguages')
+        pre_meeting_notes = request.POST.get('preMeetingNotes', '')
+        async_requested = request.POST.get('async', '')
+        
+        if not audio_file:
+            raise APIError("No audio file provided", 400, "validation")
+        
+        # Validate audio file
+        validation_result = validate_audio_file(audio_file)
+        if not validation_result['valid']:
+            raise APIError(validation_result['error'], 400, "validation")
+        
+        # Keep the upload on disk (or in memory if small); it is streamed to Bhashini later
+        audio_format = get_audio_format_from_filename(audio_file.name)
+        audio = AudioSource.from_upload(audio_file, audio_format, spool_dir=settings.AUDIO_SPOOL_DIR)
+        
+        logger.info(f"Processing: {audio_file.name} ({audio.size} bytes) | {source_lang}")
+        
+    else:
+        # Handle JSON data
+        try:
+            data = json.loads(request.body)
+        except json.JSONDecodeError:
+            raise APIError("Invalid JSON data", 400, "validation")
+        
+        audio_base64 = data.get('audioData')
+        source_lang = data.get('sourceLanguage', 'hi')
+        target_lang = data.get('targetLanguage')
+        target_langs = data.get('targetLanguages') or []
+        pre_meeting_notes = data.get('preMeetingNotes', '')
+        audio_format = data.get('audioFormat', 'wav')
+        async_requested = data.get('async', '')
+        
+        audio = decode_audio_data(audio_base64, audio_format)
+        
+        logger.info(f"Processing: JSON audio data ({len(audio_base64)} chars) | {source_lang}")
+    
+    # Normalize language codes
+    source_lang = source_lang.split('-')[0].lower()
+    try:
+        target_langs = parse_target_languages(target_lang, target_langs)
+    except APIError:
+        audio.cleanup()
+        raise
+    logger.info(f"Target languages: {', '.join(target_langs)}")
+    
+    # Log pre-meeting notes status
+    logger.info(f"Pre-meeting notes provided: {'Yes' if pre_meeting_notes.strip() else 'No'}")
+    
+    return {
+        'audio': audio,
+        'source_lang': source_lang,
+        'target_lang': target_langs[0],
+        'extra_target_langs': target_langs[1:],
+        'pre_meeting_notes': pre_meeting_notes,
+        'async': _is_truthy(async_requested) or async_requested_in_headers(request),
+        'idempotency_key': idempotency_key,
+        'client': admission.client_key(request),
+    }
+
+def decode_audio_data(audio_base64, audio_format: str) -> AudioSource:
+    """Audio from a JSON ``audioData`` field (bare base64 or a data URL)"""
+    if not audio_base64:
+        raise APIError("No audio data provided", 400, "validation")
+    if not isinstance(audio_base64, str):
+        raise APIError("audioData must be a base64 string", 400, "validation")
+    
+    # Accept data URLs ("data:audio/wav;base64,...") as well as bare base64
+    if audio_base64.startswith('data:') and ',' in audio_base64:
+        audio_base64 = audio_base64.split(',', 1)[1]
+    
+    try:
+        return AudioSource(audio_format, content=base64.b64decode(audio_base64))
+    except (binascii.Error, ValueError):
+        raise APIError("audioData is not valid base64", 400, "validation")
+
+def async_requested_in_headers(request) -> bool:
+    """Whether background processing was asked for before the body is read (?async=true or Prefer: respond-async)"""
+    return _is_truthy(request.GET.get('async', '')) or 'respond-async' in request.META.get('HTTP_PREFER', '')
+
+def parse_target_languages(target_lang, target_langs) -> list:
+    """
+    Ordered, de-duplicated target languages; the first one feeds the AI analysis.
+    
+    ``targetLanguages`` may be a list, repeated form fields or a comma-separated
+    string. A separate ``targetLanguage`` is treated as the primary target.
+    """
+    if isinstance(target_langs, str):
+        target_langs = [target_langs]
+    if not isinstance(target_langs, list):
+        raise APIError("targetLanguages must be a list of language codes", 400, "validation")
+    
+    candidates = [target_lang] if target_lang else []
+    for value in target_langs:
+        if not isinstance(value, str):
+            raise APIError("targetLanguages must be a list of language codes", 400, "validation")
+        candidates.extend(value.split(','))
+    
+    languages = []
+    for code in candidates:
+        code = code.strip().split('-')[0].lower()
+        if code and code not in languages:
+            languages.append(code)
+    if not languages:
+        languages = ['en']
+    
+    max_targets = getattr(settings, 'MAX_TARGET_LANGUAGES', 8)
+    if len(languages) > max_targets:
+        raise APIError(f"At most {max_targets} target languages are supported per request", 400, "validation")
+    return languages
+
+def _is_truthy(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+def request_checkpoint(params: Dict[str, Any]):
+    """
+    Stage checkpoint of a request sent with an Idempotency-Key, scoped to its
+    client, upload and options; the caller releases it when the run ends.
+    """
+    if not params.get('idempotency_key'):
+        return None
+    return open_checkpoint(
+        params['idempotency_key'],
+        params['client'],
+        params['audio'].sha256(),
+        params['audio'].format,
+        params['source_lang'],
+        params['target_lang'],
+        ','.join(params['extra_target_langs']),
+        params['pre_meeting_notes'],
+    )
+
+def _run_and_cleanup(params: Dict[str, Any], on_stage=None, on_event=None) -> Dict[str, Any]:
+    with params['audio'], metrics.audio_in_flight(params['audio'].size):
+        checkpoint = request_checkpoint(params)
+        try:
+            return run_meeting_pipeline(
+                params['audio'],
+                params['source_lang'],
+                params['target_lang'],
+                params['pre_meeting_notes'],
+                on_stage=on_stage,
+                on_event=on_event,
+                extra_target_langs=params['extra_target_langs'],
+                checkpoint=checkpoint,
+            )
+        finally:
+            if checkpoint:
+                checkpoint.release()
+
+def queue_audio_job(params: Dict[str, Any], run=None) -> str:
+    """
+    Queue the pipeline as a background job that deletes owned audio when done;
+    the caller keeps it if queueing fails. ``run(on_stage)`` replaces the
+    default job body, e.g. to report the outcome.
+    """
+    if not getattr(settings, 'ASYNC_JOBS_ENABLED', True):
+        raise APIError("Asynchronous processing is disabled", 400, "validation")
+    
+    return get_job_runner().submit(
+        'process-audio',
+        {
+            'sourceLanguage': params['source_lang'],
+            'targetLanguage': params['target_lang'],
+            'targetLanguages': [params['target_lang'], *params['extra_target_langs']],
+            'audioFormat': params['audio'].format,
+        },
+        STAGES,
+        run or (lambda on_stage: _run_and_cleanup(params, on_stage)),
+    )
+
+def job_accepted_response(job_id: str, request_start_time: float, extra: Dict[str, Any] = None) -> JsonResponse:
+    """202 pointing at the job's status URL"""
+    status_url = reverse('job_status', args=[job_id])
+    response = create_success_response({
+        'jobId': job_id,
+        'status': 'queued',
+        'statusUrl': status_url,
+        **(extra or {}),
+    }, request_start_time, status=202)
+    response['Location'] = status_url
+    return response
+
+def queue_pending_analysis(response_data: Dict[str, Any], pre_meeting_notes: str) -> None:
+    """
+    Finish an analysis the request deadline cut off as a background job and
+    link it from the response metadata. Without a job the transcript can still
+    be re-analyzed through /api/reanalyze/ by its ``contentHash``.
+    """
+    data, metadata = response_data['data'], response_data['metadata']
+    if not getattr(settings, 'ASYNC_JOBS_ENABLED', True):
+        return
+    
+    stored = {
+        'transcript': data['transcript'],
+        'translations': data['translations'],
+        'sourceLanguage': metadata['sourceLanguage'],
+        'targetLanguage': metadata['targetLanguage'],
+        'contentHash': metadata['contentHash'],
+    }
+    
+    def run(on_stage):
+        on_stage('analysis', 'running')
+        result = reanalyze_transcript(stored, pre_meeting_notes)
+        on_stage('analysis', 'completed')
+        return result
+    
+    try:
+        job_id = get_job_runner().submit(
+            'reanalyze',
+            {'sourceLanguage': stored['sourceLanguage'], 'targetLanguage': stored['targetLanguage'],
+             'contentHash': stored['contentHash']},
+            ['analysis'],
+            run,
+        )
+    except APIError as e:
+        logger.warning(f"Could not queue the pending analysis: {e.message}")
+        return
+    metadata['summaryJobId'] = job_id
+    metadata['summaryStatusUrl'] = reverse('job_status', args=[job_id])
+
+def request_budget() -> float:
+    """Seconds a synchronous pipeline request may take in total (0: no deadline)"""
+    return getattr(settings, 'REQUEST_DEADLINE_SECONDS', 110)
+
+def submit_audio_job(params: Dict[str, Any], request_start_time: float) -> JsonResponse:
+    """Queue the pipeline as a background job and answer 202 with its status URL"""
+    try:
+        job_id = queue_audio_job(params)
+    except Exception:
+        params['audio'].cleanup()
+        raise
+    return job_accepted_response(job_id, request_start_time)
 
 @csrf_exempt
 @require_http_methods(["POST", "OPTIONS"])
@@ -80,109 +379,793 @@ def process_audio(request):
     request_start_time = time.time()
     log_request_info(request, "audio processing")
     
-    try:
-        # Parse request data
-        if request.content_type and 'multipart/form-data' in request.content_type:
-            # Handle multipart form data
-            audio_file = request.FILES.get('audio')
-            source_lang = request.POST.get('sourceLanguage', 'hi')
-            target_lang = request.POST.get('targetLanguage', 'en')
-            pre_meeting_notes = request.POST.get('preMeetingNotes', '')
+    # Every upstream call gets what is left of the budget, so the worker answers before gunicorn's timeout
+    with metrics.track_in_flight('process_audio'), trace_request(request, '/api/process-audio/'), deadlines.budget(request_budget()):
+        try:
+            # Background jobs only need a rate-limit token; the job pool bounds their concurrency
+            with admission.admit(request, 'process_audio', needs_slot=not async_requested_in_headers(request)) as admitted:
+                params = parse_audio_request(request)
+                annotate_trace(params)
+                
+                if params['async']:
+                    admitted.release()
+                    return submit_audio_job(params, request_start_time)
+                
+                response_data = _run_and_cleanup(params)
+                admitted.completed = True
+            if response_data['data']['summaryPending']:
+                queue_pending_analysis(response_data, params['pre_meeting_notes'])
+            metrics.observe_stage('total', time.time() - request_start_time)
             
-            if not audio_file:
-                raise APIError("No audio file provided", 400, "validation")
+            return create_success_response(response_data, request_start_time)
             
-            # Validate audio file
-            validation_result = validate_audio_file(audio_file)
-            if not validation_result['valid']:
-                raise APIError(validation_result['error'], 400, "validation")
-            
-            # Read and encode audio file
-            audio_content = audio_file.read()
-            audio_base64 = base64.b64encode(audio_content).decode('utf-8')
-            audio_format = get_audio_format_from_filename(audio_file.name)
+        except APIError as e:
+            return create_error_response(e, request_start_time)
+        except Exception as e:
+            logger.error(f"Unexpected error in audio processing: {str(e)}")
+            error = APIError(f"Internal server error: {str(e)}", 500, "server")
+            return create_error_response(error, request_start_time)
+
+async def process_audio_async(request):
+    """
+    Native async variant of ``process_audio``, routed when ASYNC_VIEWS is on (ASGI deployments).
+    
+    Upstream calls are awaited on pooled async clients, so a worker holds no
+    thread while Bhashini and Gemini are busy. Django 4.2's view decorators
+    are sync-only, hence the inline method and CSRF handling.
+    """
+    if request.method == "OPTIONS":
+        response = JsonResponse({})
+        return add_cors_headers(response)
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST", "OPTIONS"])
+    
+    request_start_time = time.time()
+    log_request_info(request, "audio processing (async)")
+    
+    with metrics.track_in_flight('process_audio'), trace_request(request, '/api/process-audio/'), deadlines.budget(request_budget()):
+        try:
+            async with admission.aadmit(request, 'process_audio', needs_slot=not async_requested_in_headers(request)) as admitted:
+                # Multipart parsing and spooling are blocking file I/O
+                params = await sync_to_async(parse_audio_request)(request)
+                annotate_trace(params)
+                
+                if params['async']:
+                    await sync_to_async(admitted.release)()
+                    return await sync_to_async(submit_audio_job)(params, request_start_time)
+                
+                with params['audio'], metrics.audio_in_flight(params['audio'].size):
+                    checkpoint = await sync_to_async(request_checkpoint)(params)
+                    try:
+                        response_data = await arun_meeting_pipeline(
+                            params['audio'],
+                            params['source_lang'],
+                            params['target_lang'],
+                            params['pre_meeting_notes'],
+                            extra_target_langs=params['extra_target_langs'],
+                            checkpoint=checkpoint,
+                        )
+                    finally:
+                        if checkpoint:
+                            await sync_to_async(checkpoint.release)()
+                admitted.completed = True
+            if response_data['data']['summaryPending']:
+                await sync_to_async(queue_pending_analysis)(response_data, params['pre_meeting_notes'])
+            metrics.observe_stage('total', time.time() - request_start_time)
             
-            logger.info(f"Processing: {audio_file.name} ({len(audio_content)} bytes) | {source_lang} -> {target_lang}")
+            return create_success_response(response_data, request_start_time)
             
-        else:
-            # Handle JSON data
+        except APIError as e:
+            return create_error_response(e, request_start_time)
+        except Exception as e:
+            logger.error(f"Unexpected error in audio processing: {str(e)}")
+            error = APIError(f"Internal server error: {str(e)}", 500, "server")
+            return create_error_response(error, request_start_time)
+
+process_audio_async.csrf_exempt = True
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Encode one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _stream_pipeline_events(params: Dict[str, Any], request_start_time: float, trace: Dict[str, str], admitted):
+    """
+    Run the pipeline on a helper thread and yield its events as SSE messages.
+    
+    The trace is opened on the helper thread, which outlives the view call;
+    ``trace`` carries the id already sent in X-Trace-Id and any caller traceparent.
+    The admission slot is held until the pipeline finishes, even if the client disconnects.
+    """
+    events = queue.Queue()
+    done = object()
+    
+    def worker():
+        with tracing.start_trace('POST /api/process-audio/stream/', {
+            'http.method': 'POST', 'http.route': '/api/process-audio/stream/',
+        }, traceparent=trace['traceparent'], trace_id=trace['trace_id']):
+            annotate_trace(params)
+            run_pipeline()
+    
+    def run_pipeline():
+        try:
+            result = _run_and_cleanup(params, on_event=lambda name, data: events.put((name, data)))
+            admitted.completed = True
+            duration = time.time() - request_start_time
+            metrics.observe_stage('total', duration)
+            events.put(('result', {'success': True, 'duration': f"{duration:.2f}s", **result}))
+        except APIError as e:
+            metrics.record_api_error(e)
+            events.put(('error', {'success': False, 'error': e.message, 'service': e.service, 'status': e.status_code}))
+        except Exception as e:
+            logger.error(f"Unexpected error in streamed audio processing: {str(e)}")
+            metrics.record_api_error(APIError(str(e), 500, "server"))
+            events.put(('error', {'success': False, 'error': f"Internal server error: {str(e)}", 'service': 'server', 'status': 500}))
+        finally:
+            admitted.release()
+            events.put(done)
+    
+    threading.Thread(target=worker, name='sse-pipeline', daemon=True).start()
+    
+    with metrics.track_in_flight('process_audio_stream'):
+        yield format_sse('upload_validated', {
+            'sourceLanguage': params['source_lang'],
+            'targetLanguage': params['target_lang'],
+            'targetLanguages': [params['target_lang'], *params['extra_target_langs']],
+            'audioFormat': params['audio'].format,
+            'audioBytes': params['audio'].size,
+        })
+        keepalive = getattr(settings, 'SSE_KEEPALIVE_SECONDS', 15)
+        while True:
             try:
-                data = json.loads(request.body)
-            except json.JSONDecodeError:
-                raise APIError("Invalid JSON data", 400, "validation")
-            
-            audio_base64 = data.get('audioData')
-            source_lang = data.get('sourceLanguage', 'hi')
-            target_lang = data.get('targetLanguage', 'en')
-            pre_meeting_notes = data.get('preMeetingNotes', '')
-            audio_format = data.get('audioFormat', 'wav')
+                item = events.get(timeout=keepalive)
+            except queue.Empty:
+                # Comment line so proxies do not close an idle stream during long ASR runs
+                yield ": keep-alive\n\n"
+                continue
+            if item is done:
+                break
+            name, data = item
+            yield format_sse(name, data)
+
+@csrf_exempt
+@require_http_methods(["POST", "OPTIONS"])
+def process_audio_stream(request):
+    """Process audio and stream per-stage progress and partial results as Server-Sent Events"""
+    if request.method == "OPTIONS":
+        response = JsonResponse({})
+        return add_cors_headers(response)
+    
+    request_start_time = time.time()
+    log_request_info(request, "streamed audio processing")
+    
+    traceparent = request.META.get('HTTP_TRACEPARENT', '')
+    parent = tracing.parse_traceparent(traceparent) if traceparent else None
+    trace = {'traceparent': traceparent, 'trace_id': parent[0] if parent else tracing.new_trace_id()}
+    
+    try:
+        admitted = admission.acquire(request, 'process_audio_stream')
+        try:
+            params = parse_audio_request(request)
+        except BaseException:
+            admitted.release()
+            raise
+    except APIError as e:
+        response = create_error_response(e, request_start_time)
+        response['X-Trace-Id'] = trace['trace_id']
+        return response
+    
+    response = StreamingHttpResponse(
+        _stream_pipeline_events(params, request_start_time, trace, admitted),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    response['X-Trace-Id'] = trace['trace_id']
+    return add_cors_headers(response)
+
+# Per-item fields a batch manifest may override
+BATCH_ITEM_OPTIONS = ('sourceLanguage', 'targetLanguage', 'targetLanguages', 'preMeetingNotes')
+
+@metrics.time_stage('upload_read')
+@tracing.span('upload_read')
+def parse_batch_request(request) -> list:
+    """
+    Extract the recordings of a batch, each with its processing options.
+    
+    Multipart requests repeat the ``audio`` field and may add a ``manifest``
+    field: a JSON list of per-file overrides in upload order. JSON requests
+    carry the recordings as an ``items`` list of ``{audioData, audioFormat,
+    fileName, ...}``. Top-level ``sourceLanguage``/``targetLanguage(s)``/
+    ``preMeetingNotes`` apply to every item that does not override them.
+    
+    An item that fails validation carries its ``error`` instead of ``params``,
+    so one bad file does not reject the batch.
+    """
+    if request.content_type and 'multipart/form-data' in request.content_type:
+        shared = {
+            'sourceLanguage': request.POST.get('sourceLanguage', 'hi'),
+            'targetLanguage': request.POST.get('targetLanguage'),
+            'targetLanguages': request.POST.getlist('targetLanguages'),
+            'preMeetingNotes': request.POST.get('preMeetingNotes', ''),
+        }
+        uploads = request.FILES.getlist('audio')
+        try:
+            overrides = json.loads(request.POST.get('manifest') or '[]')
+        except json.JSONDecodeError:
+            raise APIError("manifest is not valid JSON", 400, "validation")
+    else:
+        try:
+            data = json.loads(request.body)
+        except json.JSONDecodeError:
+            raise APIError("Invalid JSON data", 400, "validation")
+        if not isinstance(data, dict):
+            raise APIError("Invalid JSON data", 400, "validation")
+        shared = {
+            'sourceLanguage': data.get('sourceLanguage', 'hi'),
+            'targetLanguage': data.get('targetLanguage'),
+            'targetLanguages': data.get('targetLanguages') or [],
+            'preMeetingNotes': data.get('preMeetingNotes', ''),
+        }
+        uploads = None
+        overrides = data.get('items') or []
+    
+    if not isinstance(overrides, list) or not all(isinstance(entry, dict) for entry in overrides):
+        raise APIError("manifest must be a list of objects", 400, "validation")
+    count = len(uploads) if uploads is not None else len(overrides)
+    if not count:
+        raise APIError("No audio files provided", 400, "validation")
+    max_files = getattr(settings, 'BATCH_MAX_FILES', 20)
+    if count > max_files:
+        raise APIError(f"At most {max_files} files are supported per batch", 400, "validation")
+    
+    items = []
+    try:
+        for index in range(count):
+            override = overrides[index] if index < len(overrides) else {}
+            upload = uploads[index] if uploads is not None else None
+            options = dict(shared)
+            if 'targetLanguage' in override or 'targetLanguages' in override:
+                # Per-item targets replace the shared ones rather than adding to them
+                options.update(targetLanguage=None, targetLanguages=[])
+            options.update((key, override[key]) for key in BATCH_ITEM_OPTIONS if key in override)
             
-            if not audio_base64:
-                raise APIError("No audio data provided", 400, "validation")
+            item = {'index': index, 'fileName': upload.name if upload else str(override.get('fileName') or f"item-{index}")}
+            try:
+                item['params'] = _batch_item_params(options, upload, override)
+            except APIError as e:
+                item['error'] = e
+            items.append(item)
+    except BaseException:
+        for item in items:
+            if 'params' in item:
+                item['params']['audio'].cleanup()
+        raise
+    
+    logger.info(f"Batch of {count} files ({sum('params' in item for item in items)} valid)")
+    return items
+
+def _batch_item_params(options: Dict[str, Any], upload, override: Dict[str, Any]) -> Dict[str, Any]:
+    source_lang = options['sourceLanguage'] or 'hi'
+    pre_meeting_notes = options['preMeetingNotes'] or ''
+    if not isinstance(source_lang, str) or not isinstance(pre_meeting_notes, str):
+        raise APIError("sourceLanguage and preMeetingNotes must be strings", 400, "validation")
+    target_langs = parse_target_languages(options['targetLanguage'], options['targetLanguages'])
+    
+    if upload is not None:
+        validation_result = validate_audio_file(upload)
+        if not validation_result['valid']:
+            raise APIError(validation_result['error'], 400, "validation")
+        audio_format = get_audio_format_from_filename(upload.name)
+        audio = AudioSource.from_upload(upload, audio_format, spool_dir=settings.AUDIO_SPOOL_DIR)
+    else:
+        audio = decode_audio_data(override.get('audioData'), override.get('audioFormat') or 'wav')
+    
+    return {
+        'audio': audio,
+        'source_lang': source_lang.split('-')[0].lower(),
+        'target_lang': target_langs[0],
+        'extra_target_langs': target_langs[1:],
+        'pre_meeting_notes': pre_meeting_notes,
+    }
+
+def _resolve_pipeline_config(pair: tuple) -> None:
+    """Warm the pipeline config cache for one language pair; items report failures themselves"""
+    try:
+        get_bhashini_service().get_pipeline_config(*pair)
+    except Exception as e:
+        logger.warning(f"Could not resolve pipeline config for {pair[0]}->{pair[1]}: {str(e)}")
+
+def _run_batch_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the pipeline for one batch item, timing its stages; failures become the item's error"""
+    started = time.perf_counter()
+    running, stages = {}, {}
+    
+    def on_stage(stage: str, status: str) -> None:
+        if status == 'running':
+            running[stage] = time.perf_counter()
+        else:
+            stages[stage] = round(time.perf_counter() - running.pop(stage, started), 3)
+    
+    result = {'index': item['index'], 'fileName': item['fileName']}
+    try:
+        with tracing.span('batch_item', {'batch.index': item['index']}):
+            annotate_trace(item['params'])
+            result.update(success=True, **_run_and_cleanup(item['params'], on_stage))
+    except APIError as e:
+        metrics.record_api_error(e)
+        result.update(success=False, error=e.message, service=e.service, status=e.status_code)
+    except Exception as e:
+        logger.error(f"Unexpected error in batch item {item['index']}: {str(e)}")
+        metrics.record_api_error(APIError(str(e), 500, "server"))
+        result.update(success=False, error=f"Internal server error: {str(e)}", service='server', status=500)
+    result['duration'] = f"{time.perf_counter() - started:.2f}s"
+    result['stages'] = stages
+    return result
+
+def summarize_batch(results: list, stage_seconds: Dict[str, list], concurrency: int, request_start_time: float) -> Dict[str, Any]:
+    """Batch totals plus, per stage, the time summed over files and the slowest file"""
+    for result in results:
+        for stage, seconds in result.get('stages', {}).items():
+            stage_seconds.setdefault(stage, []).append(seconds)
+    succeeded = sum(1 for result in results if result['success'])
+    return {
+        'files': len(results),
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'concurrency': concurrency,
+        'totalSeconds': round(time.time() - request_start_time, 3),
+        'stages': {
+            stage: {'totalSeconds': round(sum(values), 3), 'maxSeconds': round(max(values), 3)}
+            for stage, values in stage_seconds.items() if values
+        },
+    }
+
+@csrf_exempt
+@require_http_methods(["POST", "OPTIONS"])
+def process_audio_batch(request):
+    """
+    Process several recordings in one request.
+    
+    Pipeline configs are resolved once per language pair before any file
+    starts; files then run on up to BATCH_CONCURRENCY threads, limited to the
+    admission slots that are free. Each file gets its own result or error.
+    """
+    if request.method == "OPTIONS":
+        response = JsonResponse({})
+        return add_cors_headers(response)
+    
+    request_start_time = time.time()
+    log_request_info(request, "batch audio processing")
+    
+    with metrics.track_in_flight('process_audio_batch'), trace_request(request, '/api/process-audio/batch/'):
+        try:
+            with admission.admit(request, 'process_audio_batch') as admitted:
+                parse_start = time.perf_counter()
+                items = parse_batch_request(request)
+                stage_seconds = {'upload_read': [time.perf_counter() - parse_start]}
+                runnable = [item for item in items if 'params' in item]
+                results = {
+                    item['index']: {
+                        'index': item['index'], 'fileName': item['fileName'], 'success': False,
+                        'error': item['error'].message, 'service': item['error'].service,
+                        'status': item['error'].status_code,
+                    }
+                    for item in items if 'error' in item
+                }
+                
+                concurrency = 0
+                try:
+                    if runnable:
+                        concurrency = admitted.widen(min(getattr(settings, 'BATCH_CONCURRENCY', 4), len(runnable)) - 1)
+                        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='batch') as executor:
+                            pairs = sorted({(item['params']['source_lang'], item['params']['target_lang']) for item in runnable})
+                            config_start = time.perf_counter()
+                            with tracing.span('pipeline_config', {'batch.language_pairs': len(pairs)}):
+                                list(executor.map(tracing.bind(_resolve_pipeline_config), pairs))
+                            stage_seconds['pipeline_config'] = [time.perf_counter() - config_start]
+                            for result in executor.map(tracing.bind(_run_batch_item), runnable):
+                                results[result['index']] = result
+                finally:
+                    for item in runnable:
+                        item['params']['audio'].cleanup()
             
-            logger.info(f"Processing: JSON audio data ({len(audio_base64)} chars) | {source_lang} -> {target_lang}")
+            ordered = [results[index] for index in sorted(results)]
+            return create_success_response({
+                'results': ordered,
+                'summary': summarize_batch(ordered, stage_seconds, concurrency, request_start_time),
+            }, request_start_time)
         
-        # Normalize language codes
-        source_lang = source_lang.split('-')[0].lower()
-        target_lang = target_lang.split('-')[0].lower()
-        
-        # Log pre-meeting notes status
-        logger.info(f"Pre-meeting notes provided: {'Yes' if pre_meeting_notes.strip() else 'No'}")
+        except APIError as e:
+            return create_error_response(e, request_start_time)
+        except Exception as e:
+            logger.error(f"Unexpected error in batch audio processing: {str(e)}")
+            error = APIError(f"Internal server error: {str(e)}", 500, "server")
+            return create_error_response(error, request_start_time)
+
+@csrf_exempt
+@require_http_methods(["GET", "OPTIONS"])
+def job_status(request, job_id):
+    """Report status, per-stage progress and results of a background job"""
+    if request.method == "OPTIONS":
+        response = JsonResponse({})
+        return add_cors_headers(response)
+    
+    job = get_job_store().get(job_id)
+    if job is None:
+        response = JsonResponse({
+            'success': False,
+            'error': f"Job not found: {job_id}"
+        }, status=404)
+        return add_cors_headers(response)
+    
+    response = JsonResponse({
+        'success': job['status'] != 'failed',
+        'job': job
+    })
+    return add_cors_headers(response)
+
+@csrf_exempt
+@require_http_methods(["POST", "OPTIONS"])
+def create_upload(request):
+    """
+    Start a resumable chunked upload.
+    
+    Takes ``fileName``, ``size`` (bytes), optional ``chunkSize`` and the usual
+    processing options, which are applied once the last chunk is in.
+    """
+    if request.method == "OPTIONS":
+        response = JsonResponse({})
+        return add_cors_headers(response)
+    
+    request_start_time = time.time()
+    try:
+        try:
+            data = json.loads(request.body)
+        except json.JSONDecodeError:
+            raise APIError("Invalid JSON data", 400, "validation")
+        if not isinstance(data, dict):
+            raise APIError("Invalid JSON data", 400, "validation")
         
-        # Process audio through Bhashini
-        bhashini_service = get_bhashini_service()
-        bhashini_result = bhashini_service.process_audio(
-            audio_base64, source_lang, target_lang, audio_format
-        )
+        file_name = data.get('fileName')
+        source_lang = data.get('sourceLanguage', 'hi')
+        pre_meeting_notes = data.get('preMeetingNotes', '')
+        if not isinstance(file_name, str) or not file_name.strip():
+            raise APIError("fileName is required", 400, "validation")
+        if not isinstance(source_lang, str) or not isinstance(pre_meeting_notes, str):
+            raise APIError("sourceLanguage and preMeetingNotes must be strings", 400, "validation")
+        target_langs = parse_target_languages(data.get('targetLanguage'), data.get('targetLanguages') or [])
+        # Completed uploads are processed as background jobs; refuse before any bytes are sent
+        if not getattr(settings, 'ASYNC_JOBS_ENABLED', True):
+            raise APIError("Chunked uploads need asynchronous processing, which is disabled", 400, "validation")
         
-        # Extract transcript and translation from Bhashini result
-        transcript = ""
-        translation = ""
+        # One rate-limit token per upload, not per chunk
+        admission.acquire(request, 'upload', needs_slot=False).release()
+        upload = get_chunked_uploads().create(file_name.strip(), data.get('size'), {
+            'sourceLanguage': source_lang.split('-')[0].lower(),
+            'targetLanguages': target_langs,
+            'preMeetingNotes': pre_meeting_notes,
+        }, chunk_size=data.get('chunkSize'), client=admission.client_key(request))
+    except APIError as e:
+        return create_error_response(e, request_start_time)
+    
+    upload_url = reverse('upload_detail', args=[upload['id']])
+    response = create_success_response({'upload': upload, 'uploadUrl': upload_url}, request_start_time, status=201)
+    response['Location'] = upload_url
+    return response
+
+@csrf_exempt
+@require_http_methods(["GET", "DELETE", "OPTIONS"])
+def upload_detail(request, upload_id):
+    """Report which chunks of an upload are stored (GET, to resume) or abort it (DELETE)"""
+    if request.method == "OPTIONS":
+        response = JsonResponse({})
+        return add_cors_headers(response)
+    
+    request_start_time = time.time()
+    uploads = get_chunked_uploads()
+    try:
+        if request.method == "DELETE":
+            if not uploads.delete(upload_id):
+                raise APIError("Upload not found or already processing", 404, "uploads")
+            return add_cors_headers(HttpResponse(status=204))
+        upload = uploads.status(upload_id)
+        if upload['state'] == 'processing':
+            # The job's worker may have died without reporting back
+            job = get_job_store().get(upload['jobId'])
+            if job is None or job['status'] == 'failed':
+                error = (job or {}).get('error') or {}
+                uploads.processing_failed(upload_id, error.get('message') or "Processing was lost")
+                upload = uploads.status(upload_id)
+    except APIError as e:
+        return create_error_response(e, request_start_time)
+    
+    response = create_success_response({'upload': upload}, request_start_time)
+    response['Upload-Offset'] = str(upload['offset'])
+    return response
+
+@csrf_exempt
+@require_http_methods(["PUT", "OPTIONS"])
+def upload_chunk(request, upload_id, index):
+    """
+    Store one chunk (raw bytes, ``X-Chunk-Sha256: <hex>``). Chunks may be sent
+    in parallel; the one that completes the upload queues its processing and
+    answers 202 with the job's status URL.
+    """
+    if request.method == "OPTIONS":
+        response = JsonResponse({})
+        return add_cors_headers(response)
+    
+    request_start_time = time.time()
+    uploads = get_chunked_uploads()
+    with metrics.track_in_flight('upload_chunk'), trace_request(request, '/api/uploads/<id>/chunks/<index>/'):
+        try:
+            try:
+                length = int(request.META.get('CONTENT_LENGTH') or 0)
+            except ValueError:
+                raise APIError("Invalid Content-Length", 400, "validation")
+            completed = uploads.write_chunk(upload_id, index, request, length,
+                                            request.META.get('HTTP_X_CHUNK_SHA256', ''))
+            if completed:
+                return _process_completed_upload(uploads, upload_id, request_start_time)
+            upload = uploads.status(upload_id)
+        except APIError as e:
+            return create_error_response(e, request_start_time)
+        except Exception as e:
+            logger.error(f"Unexpected error storing chunk {index} of upload {upload_id}: {str(e)}")
+            error = APIError(f"Internal server error: {str(e)}", 500, "server")
+            return create_error_response(error, request_start_time)
         
-        if 'pipelineResponse' in bhashini_result:
-            for response in bhashini_result['pipelineResponse']:
-                if response['taskType'] == 'asr' and response.get('output'):
-                    transcript = response['output'][0].get('source', '')
-                elif response['taskType'] == 'translation' and response.get('output'):
-                    translation = response['output'][0].get('target', '')
+        response = create_success_response({'upload': upload}, request_start_time)
+        response['Upload-Offset'] = str(upload['offset'])
+        return response
+
+def _process_completed_upload(uploads, upload_id: str, request_start_time: float) -> JsonResponse:
+    """
+    Process the assembled file as a background job. The file is kept until the
+    job succeeds; if the job fails or cannot start, the upload is reopened and
+    re-sending a chunk processes it again.
+    """
+    upload = uploads.get(upload_id)
+    options = upload['options']
+    params = {
+        'audio': AudioSource(upload['format'], path=uploads.file_path(upload_id)),
+        'source_lang': options['sourceLanguage'],
+        'target_lang': options['targetLanguages'][0],
+        'extra_target_langs': options['targetLanguages'][1:],
+        'pre_meeting_notes': options['preMeetingNotes'],
+    }
+    annotate_trace(params)
+    
+    def run(on_stage):
+        try:
+            result = _run_and_cleanup(params, on_stage)
+        except APIError as e:
+            uploads.processing_failed(upload_id, e.message)
+            raise
+        except Exception as e:
+            uploads.processing_failed(upload_id, f"Internal server error: {str(e)}")
+            raise
+        uploads.processed(upload_id)
+        return result
+    
+    try:
+        job_id = queue_audio_job(params, run)
+    except Exception:
+        uploads.reopen(upload_id)
+        raise
+    uploads.mark_processing(upload_id, job_id)
+    return job_accepted_response(job_id, request_start_time, {'upload': uploads.status(upload_id)})
+
+# Random per-browser ids only: short or guessable ids would let one client read another's meetings
+USER_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{16,128}$')
+
+def _request_user_id(request, required: bool = True) -> str:
+    """
+    Owner key for saved meetings. There are no accounts yet, so each browser
+    generates a random X-User-Id once and sends it with every meetings call;
+    without one a request is rejected rather than sharing a common owner.
+    """
+    user_id = request.META.get('HTTP_X_USER_ID', '').strip()
+    if USER_ID_PATTERN.match(user_id):
+        return user_id
+    if required or user_id:
+        raise APIError("An X-User-Id header of 16-128 letters, digits, '-' or '_' is required", 401, "meetings")
+    return ''
+
+@csrf_exempt
+@require_http_methods(["GET", "POST", "OPTIONS"])
+def meetings(request):
+    """List saved meetings (newest first, keyset paginated) or save a processed meeting"""
+    if request.method == "OPTIONS":
+        response = JsonResponse({})
+        return add_cors_headers(response)
+    
+    request_start_time = time.time()
+    
+    try:
+        user_id = _request_user_id(request)
+        if request.method == "GET":
+            page, next_cursor = meeting_store.list_meetings(
+                user_id,
+                limit=meeting_store.page_size(request.GET.get('limit')),
+                cursor=request.GET.get('cursor') or None,
+            )
+            return create_success_response({'meetings': page, 'nextCursor': next_cursor}, request_start_time)
         
-        # If no translation was performed (same language), use transcript as translation
-        if not translation and transcript:
-            translation = transcript
+        try:
+            body = json.loads(request.body)
+        except json.JSONDecodeError:
+            raise APIError("Invalid JSON data", 400, "validation")
+        if not isinstance(body, dict) or not isinstance(body.get('data'), dict):
+            raise APIError("A processed meeting 'data' object is required", 400, "validation")
         
-        # Generate AI summary using Gemini
-        gemini_service = get_gemini_service()
-        ai_analysis = gemini_service.generate_summary_and_actions(
-            translation or transcript, pre_meeting_notes
+        meeting = meeting_store.save_meeting(
+            {'data': body['data'], 'metadata': body.get('metadata') or {}},
+            user_id=user_id,
+            title=str(body.get('title') or body.get('fileName') or ''),
+            pre_meeting_notes=str(body.get('preMeetingNotes') or ''),
         )
+        meeting = meeting_store.get_meeting(meeting.id, user_id)
+        return create_success_response({'meeting': meeting_store.meeting_detail(meeting)}, request_start_time, status=201)
+    
+    except APIError as e:
+        return create_error_response(e, request_start_time)
+    except Exception as e:
+        logger.error(f"Unexpected error in meetings endpoint: {str(e)}")
+        error = APIError(f"Internal server error: {str(e)}", 500, "server")
+        return create_error_response(error, request_start_time)
+
+@csrf_exempt
+@require_http_methods(["GET", "DELETE", "OPTIONS"])
+def meeting_detail(request, meeting_id):
+    """Fetch or delete one saved meeting"""
+    if request.method == "OPTIONS":
+        response = add_cors_headers(JsonResponse({}))
+        response["Access-Control-Allow-Methods"] = "GET, DELETE, OPTIONS"
+        return response
+    
+    request_start_time = time.time()
+    try:
+        user_id = _request_user_id(request)
+    except APIError as e:
+        return create_error_response(e, request_start_time)
+    meeting = meeting_store.get_meeting(meeting_id, user_id)
+    if meeting is None:
+        return create_error_response(APIError(f"Meeting not found: {meeting_id}", 404, "meetings"), request_start_time)
+    
+    if request.method == "DELETE":
+        meeting_store.delete_meeting(meeting)
+        return create_success_response({'deleted': meeting_id}, request_start_time)
+    return create_success_response({'meeting': meeting_store.meeting_detail(meeting)}, request_start_time)
+
+def _reuse_request(request, endpoint: str) -> Dict[str, Any]:
+    """JSON body of a re-analysis/re-translation request and the stored transcript it names"""
+    try:
+        body = json.loads(request.body)
+    except json.JSONDecodeError:
+        raise APIError("Invalid JSON data", 400, "validation")
+    if not isinstance(body, dict):
+        raise APIError("Invalid JSON data", 400, "validation")
+    source_lang = body.get('sourceLanguage')
+    if source_lang is not None and not isinstance(source_lang, str):
+        raise APIError("sourceLanguage must be a language code", 400, "validation")
+    
+    # Saved meetings need their owner; a contentHash alone can still hit the result cache
+    meeting_id = str(body.get('meetingId') or '') or None
+    user_id = _request_user_id(request, required=bool(meeting_id))
+    
+    # A rate-limit token only: these runs skip ASR, the stage slots exist for
+    admission.acquire(request, endpoint, needs_slot=False).release()
+    stored = meeting_store.load_stored_transcript(
+        meeting_id=meeting_id,
+        content_hash=body.get('contentHash'),
+        user_id=user_id,
+        source_lang=source_lang.split('-')[0].lower() if source_lang else None,
+    )
+    if not stored['transcript'].strip():
+        raise APIError("The stored transcript is empty", 400, "validation")
+    return {'body': body, 'stored': stored}
+
+@csrf_exempt
+@require_http_methods(["POST", "OPTIONS"])
+def reanalyze(request):
+    """
+    Re-run only the AI analysis of a stored transcript (``meetingId`` or
+    ``contentHash``), e.g. with new ``preMeetingNotes`` or on another
+    ``targetLanguage``'s translation. No audio is uploaded and ASR is skipped.
+    """
+    if request.method == "OPTIONS":
+        response = JsonResponse({})
+        return add_cors_headers(response)
+    
+    request_start_time = time.time()
+    log_request_info(request, "re-analysis")
+    
+    with metrics.track_in_flight('reanalyze'), trace_request(request, '/api/reanalyze/'):
+        try:
+            reuse = _reuse_request(request, 'reanalyze')
+            pre_meeting_notes = reuse['body'].get('preMeetingNotes', '')
+            if not isinstance(pre_meeting_notes, str):
+                raise APIError("preMeetingNotes must be a string", 400, "validation")
+            target_lang = reuse['body'].get('targetLanguage')
+            if target_lang:
+                target_lang = parse_target_languages(target_lang, [])[0]
+            
+            response_data = reanalyze_transcript(reuse['stored'], pre_meeting_notes, target_lang)
+            return create_success_response(response_data, request_start_time)
         
-        # Prepare response data
-        response_data = {
-            'data': {
-                'transcript': transcript,
-                'translation': translation,
-                'summary': ai_analysis['summary'],
-                'actionItems': ai_analysis['actionItems'],
-                'keyDecisions': ai_analysis['keyDecisions']
-            },
-            'metadata': {
-                'sourceLanguage': source_lang,
-                'targetLanguage': target_lang,
-                'audioFormat': audio_format,
-                'processedAt': datetime.now().isoformat(),
-                'preMeetingNotesProvided': bool(pre_meeting_notes.strip())
-            }
-        }
-        
-        return create_success_response(response_data, request_start_time)
+        except APIError as e:
+            return create_error_response(e, request_start_time)
+        except Exception as e:
+            logger.error(f"Unexpected error in re-analysis: {str(e)}")
+            error = APIError(f"Internal server error: {str(e)}", 500, "server")
+            return create_error_response(error, request_start_time)
+
+@csrf_exempt
+@require_http_methods(["POST", "OPTIONS"])
+def retranslate(request):
+    """
+    Translate a stored transcript (``meetingId`` or ``contentHash``) into new
+    ``targetLanguage(s)`` with translation-only Bhashini calls, skipping ASR.
+    """
+    if request.method == "OPTIONS":
+        response = JsonResponse({})
+        return add_cors_headers(response)
+    
+    request_start_time = time.time()
+    log_request_info(request, "re-translation")
+    
+    with metrics.track_in_flight('retranslate'), trace_request(request, '/api/retranslate/'):
+        try:
+            reuse = _reuse_request(request, 'retranslate')
+            body = reuse['body']
+            if not body.get('targetLanguage') and not body.get('targetLanguages'):
+                raise APIError("targetLanguage or targetLanguages is required", 400, "validation")
+            target_langs = parse_target_languages(body.get('targetLanguage'), body.get('targetLanguages') or [])
+            
+            response_data = retranslate_transcript(reuse['stored'], target_langs)
+            return create_success_response(response_data, request_start_time)
         
+        except APIError as e:
+            return create_error_response(e, request_start_time)
+        except Exception as e:
+            logger.error(f"Unexpected error in re-translation: {str(e)}")
+            error = APIError(f"Internal server error: {str(e)}", 500, "server")
+            return create_error_response(error, request_start_time)
+
+@csrf_exempt
+@require_http_methods(["GET", "OPTIONS"])
+def search_meetings(request):
+    """Ranked full-text search over transcripts, translations, summaries and action items"""
+    if request.method == "OPTIONS":
+        response = JsonResponse({})
+        return add_cors_headers(response)
+    
+    request_start_time = time.time()
+    try:
+        user_id = _request_user_id(request)
+        results, next_cursor = meeting_store.search_meetings(
+            request.GET.get('q', ''),
+            user_id,
+            limit=meeting_store.page_size(request.GET.get('limit')),
+            cursor=request.GET.get('cursor') or None,
+        )
+        return create_success_response({'results': results, 'nextCursor': next_cursor}, request_start_time)
     except APIError as e:
         return create_error_response(e, request_start_time)
     except Exception as e:
-        logger.error(f"Unexpected error in audio processing: {str(e)}")
+        logger.error(f"Unexpected error in meeting search: {str(e)}")
         error = APIError(f"Internal server error: {str(e)}", 500, "server")
         return create_error_response(error, request_start_time)
 
+@require_http_methods(["GET"])
+def prometheus_metrics(request):
+    """Prometheus scrape endpoint; samples from every gunicorn worker are aggregated"""
+    if not getattr(settings, 'METRICS_ENABLED', True):
+        raise Http404("Metrics are disabled")
+    body, content_type = metrics.render()
+    return HttpResponse(body, content_type=content_type)
+
 @csrf_exempt
 @require_http_methods(["GET", "OPTIONS"])
 def health_check(request):
@@ -0,0 +1,4 @@
+"""
+Benchmarks for the meeting assistant backend. Run from the backend directory, e.g.
+``python -m benchmarks.upload_memory``.
+"""
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Request capacity of the sync (WSGI) and native async (ASGI) process-audio paths.
+
+Starts the stub upstreams from ``benchmarks.stubs`` with realistic latency,
+then serves the backend twice with the same number of worker processes:
+gunicorn sync workers on meeting_assistant.wsgi, and uvicorn on
+meeting_assistant.asgi. Each server is driven with concurrent JSON uploads and
+throughput and latency percentiles are reported. The result cache is disabled
+so every request reaches the upstreams.
+
+    python -m benchmarks.asgi_capacity --concurrency 16 64 --requests 256
+"""
+import os
+import sys
+import json
+import time
+import base64
+import socket
+import argparse
+import statistics
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.stubs import start_stub_server, stub_environment  # noqa: E402
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _server_command(kind: str, port: int, workers: int) -> list:
+    if kind == 'wsgi':
+        return [sys.executable, '-m', 'gunicorn', 'meeting_assistant.wsgi:application',
+                '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--worker-class', 'sync',
+                '--timeout', '300', '--log-level', 'warning']
+    return [sys.executable, '-m', 'uvicorn', 'meeting_assistant.asgi:application',
+            '--host', '127.0.0.1', '--port', str(port), '--workers', str(workers), '--log-level', 'warning']
+
+
+def _wait_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not become ready")
+
+
+def _percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _drive(url: str, body: bytes, concurrency: int, total: int) -> dict:
+    def one(_):
+        start = time.perf_counter()
+        try:
+            response = requests.post(url, data=body, headers={'Content-Type': 'application/json'}, timeout=300)
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        return ok, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(one, range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for ok, latency in outcomes if ok]
+    return {
+        'requests': total,
+        'errors': sum(1 for ok, _ in outcomes if not ok),
+        'elapsedSeconds': round(elapsed, 2),
+        'throughputRps': round(len(latencies) / elapsed, 2),
+        'latencyMs': {
+            'p50': round(statistics.median(latencies) * 1000, 1) if latencies else None,
+            'p95': round(_percentile(latencies, 95) * 1000, 1) if latencies else None,
+            'p99': round(_percentile(latencies, 99) * 1000, 1) if latencies else None,
+        },
+    }
+
+
+def run(concurrency_levels, total_requests, workers, latency, audio_kb):
+    stub = start_stub_server(latency)
+    env = dict(os.environ, **stub_environment(stub), RESULT_CACHE_ENABLED='False', ASYNC_JOBS_ENABLED='False',
+               ADMISSION_ENABLED='False')
+    env.pop('DJANGO_ASYNC_VIEWS', None)
+    body = json.dumps({
+        'audioData': base64.b64encode(os.urandom(audio_kb * 1024)).decode('ascii'),
+        'audioFormat': 'wav',
+        'sourceLanguage': 'hi',
+        'targetLanguage': 'en',
+    }).encode('utf-8')
+
+    results = []
+    try:
+        for kind in ('wsgi', 'asgi'):
+            port = _free_port()
+            server = subprocess.Popen(_server_command(kind, port, workers), cwd=BACKEND_DIR, env=env,
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                base = f"http://127.0.0.1:{port}/api"
+                _wait_ready(f"{base}/supported-languages/")
+                _drive(f"{base}/process-audio/", body, 1, 2)  # warm up pools and pipeline config
+                for concurrency in concurrency_levels:
+                    row = _drive(f"{base}/process-audio/", body, concurrency, total_requests)
+                    results.append({'server': kind, 'workers': workers, 'concurrency': concurrency, **row})
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+    finally:
+        stub.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[8, 32, 64], help='concurrent clients')
+    parser.add_argument('--requests', type=int, default=128, help='requests per concurrency level')
+    parser.add_argument('--workers', type=int, default=2, help='server worker processes')
+    parser.add_argument('--compute-latency', type=float, default=0.5, help='stub Bhashini compute delay (s)')
+    parser.add_argument('--gemini-latency', type=float, default=0.5, help='stub Gemini delay (s)')
+    parser.add_argument('--audio-kb', type=int, default=64, help='uploaded audio size in KB')
+    parser.add_argument('--json', action='store_true', help='print machine-readable JSON only')
+    args = parser.parse_args()
+
+    latency = {'config': 0.1, 'compute': args.compute_latency, 'gemini': args.gemini_latency}
+    results = run(args.concurrency, args.requests, args.workers, latency, args.audio_kb)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'server':<7} {'conc':>5} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for row in results:
+        lat = row['latencyMs']
+        print(f"{row['server']:<7} {row['concurrency']:>5} {row['throughputRps']:>8} "
+              f"{lat['p50']!s:>9} {lat['p95']!s:>9} {lat['p99']!s:>9} {row['errors']:>7}")
+
+
+if __name__ == '__main__':
+    main()
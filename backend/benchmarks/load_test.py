@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test of POST /api/process-audio/ against stub upstreams.
+
+Starts the stub Bhashini and Gemini servers from ``benchmarks.stubs`` with the
+given latency distributions and error rates, then for every combination of
+audio length and concurrency serves the backend in a fresh gunicorn (WSGI) or
+uvicorn (ASGI) process group and drives it with multipart WAV uploads, as the
+frontend sends them. Each configuration reports throughput, p50/p95/p99
+latency, error counts, upstream call counts and the peak resident memory of
+the server process tree. The result cache is disabled so every request runs
+the whole pipeline, and admission control is off unless ``--admission-control``
+is given, since every request comes from one client.
+
+The report is JSON tagged with the current commit, so runs can be diffed
+across commits:
+
+    python -m benchmarks.load_test --concurrency 1 8 32 --audio-seconds 15 60 \\
+        --compute-latency lognormal:1.5:4 --gemini-latency lognormal:2:6 \\
+        --compute-error-rate 0.02 --output load-$(git rev-parse --short HEAD).json
+"""
+import io
+import os
+import sys
+import json
+import time
+import wave
+import platform
+import argparse
+import threading
+import subprocess
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.asgi_capacity import _free_port, _percentile, _server_command, _wait_ready  # noqa: E402
+from benchmarks.stubs import parse_latency, start_stub_server, stub_environment  # noqa: E402
+
+UPSTREAMS = ('config', 'compute', 'gemini')
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def speech_like_wav(seconds: float, sample_rate: int = 44100, channels: int = 2) -> bytes:
+    """
+    A 16-bit PCM recording shaped like speech: syllable-rate modulated tones
+    with a pause every few seconds, so resampling and silence trimming do the
+    same work they do on real meetings.
+    """
+    rng = np.random.default_rng(7)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    voice = np.sin(2 * np.pi * 180 * t) + 0.5 * np.sin(2 * np.pi * 360 * t) + 0.05 * rng.standard_normal(t.size)
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 4 * t))
+    # 1.5 s of near-silence at the end of every 6 s
+    envelope[(t % 6.0) > 4.5] = 0.002
+    samples = (voice * envelope * 8000).astype('<i2')
+
+    out = io.BytesIO()
+    with wave.open(out, 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(np.repeat(samples[:, None], channels, axis=1).tobytes())
+    return out.getvalue()
+
+
+def _process_tree(root: int) -> list:
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The command name may contain spaces; ppid is the 2nd field after it
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    tree, pending = [], [root]
+    while pending:
+        pid = pending.pop()
+        tree.append(pid)
+        pending.extend(children.get(pid, []))
+    return tree
+
+
+def _tree_rss_bytes(root: int) -> int:
+    total = 0
+    for pid in _process_tree(root):
+        try:
+            with open(f'/proc/{pid}/statm') as f:
+                total += int(f.read().split()[1]) * PAGE_SIZE
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+
+class MemorySampler:
+    """Tracks the peak RSS summed over a process and its descendants"""
+
+    def __init__(self, pid: int, interval: float = 0.05):
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _tree_rss_bytes(self.pid))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = _tree_rss_bytes(self.pid)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _drive(url: str, audio: bytes, fields: dict, concurrency: int, total: int) -> dict:
+    statuses = {}
+    lock = threading.Lock()
+
+    def one(_):
+        start = time.perf_counter()
+        try:
+            response = requests.post(url, data=fields, files={'audio': ('meeting.wav', audio, 'audio/wav')},
+                                     timeout=600)
+            status = response.status_code
+        except requests.RequestException:
+            status = 'connection_error'
+        with lock:
+            statuses[status] = statuses.get(status, 0) + 1
+        return status == 200, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(one, range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for ok, latency in outcomes if ok]
+
+    def pct(p):
+        return round(_percentile(latencies, p) * 1000, 1) if latencies else None
+
+    return {
+        'requests': total,
+        'succeeded': len(latencies),
+        'errors': total - len(latencies),
+        'statusCounts': {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        'elapsedSeconds': round(elapsed, 3),
+        'throughputRps': round(len(latencies) / elapsed, 3),
+        'latencyMs': {'p50': pct(50), 'p95': pct(95), 'p99': pct(99)},
+    }
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run(args) -> dict:
+    latency = {
+        'config': parse_latency(args.config_latency),
+        'compute': parse_latency(args.compute_latency),
+        'gemini': parse_latency(args.gemini_latency),
+    }
+    error_rates = {
+        'config': args.config_error_rate,
+        'compute': args.compute_error_rate,
+        'gemini': args.gemini_error_rate,
+    }
+    stub = start_stub_server(latency, error_rates=error_rates)
+    env = dict(os.environ, **stub_environment(stub), RESULT_CACHE_ENABLED='False', ASYNC_JOBS_ENABLED='False',
+               ADMISSION_ENABLED=str(args.admission_control))
+    env.pop('DJANGO_ASYNC_VIEWS', None)
+    fields = {'sourceLanguage': 'hi', 'targetLanguage': 'en'}
+
+    results = []
+    try:
+        for seconds in args.audio_seconds:
+            audio = speech_like_wav(seconds)
+            for concurrency in args.concurrency:
+                port = _free_port()
+                server = subprocess.Popen(_server_command(args.server, port, args.workers), cwd=BACKEND_DIR,
+                                          env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                try:
+                    base = f"http://127.0.0.1:{port}/api"
+                    _wait_ready(f"{base}/supported-languages/")
+                    # Warm up imports, pools and the pipeline config cache outside the measurement
+                    _drive(f"{base}/process-audio/", audio, fields, 1, args.workers)
+                    counts_before = dict(stub.counts)
+                    errors_before = dict(stub.errors)
+                    idle_rss = _tree_rss_bytes(server.pid)
+                    with MemorySampler(server.pid) as sampler:
+                        row = _drive(f"{base}/process-audio/", audio, fields, concurrency,
+                                     args.requests or concurrency * 4)
+                finally:
+                    server.terminate()
+                    server.wait(timeout=30)
+
+                results.append({
+                    'server': args.server,
+                    'workers': args.workers,
+                    'audioSeconds': seconds,
+                    'audioBytes': len(audio),
+                    'concurrency': concurrency,
+                    **row,
+                    'memory': {
+                        'idleRssMb': round(idle_rss / 2**20, 1),
+                        'peakRssMb': round(sampler.peak / 2**20, 1),
+                    },
+                    'upstreamCalls': {kind: stub.counts[kind] - counts_before[kind] for kind in UPSTREAMS},
+                    'upstreamErrors': {kind: stub.errors[kind] - errors_before[kind] for kind in UPSTREAMS},
+                })
+                if not args.quiet:
+                    last = results[-1]
+                    print(f"{seconds:>6}s  conc {concurrency:>3}  {last['throughputRps']:>7} req/s  "
+                          f"p50 {last['latencyMs']['p50']!s:>8}  p99 {last['latencyMs']['p99']!s:>8} ms  "
+                          f"peak {last['memory']['peakRssMb']:>7} MB  errors {last['errors']}", file=sys.stderr)
+    finally:
+        stub.shutdown()
+
+    return {
+        'commit': _commit(),
+        'startedAt': datetime.now(timezone.utc).isoformat(),
+        'host': {'python': platform.python_version(), 'machine': platform.machine(), 'cpus': os.cpu_count()},
+        'settings': {
+            'server': args.server,
+            'workers': args.workers,
+            'latency': {
+                'config': args.config_latency,
+                'compute': args.compute_latency,
+                'gemini': args.gemini_latency,
+            },
+            'errorRates': error_rates,
+            'admissionControl': args.admission_control,
+        },
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--server', choices=('wsgi', 'asgi'), default='wsgi', help='entry point to serve')
+    parser.add_argument('--workers', type=int, default=2, help='server worker processes')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16], help='concurrent clients')
+    parser.add_argument('--audio-seconds', type=float, nargs='+', default=[15, 60],
+                        help='length of the uploaded 44.1 kHz stereo WAV')
+    parser.add_argument('--requests', type=int, default=0,
+                        help='requests per configuration (default: 4 x concurrency)')
+    parser.add_argument('--config-latency', default='0.1', help='getModelsPipeline delay spec')
+    parser.add_argument('--compute-latency', default='lognormal:0.5:1.5', help='Bhashini compute delay spec')
+    parser.add_argument('--gemini-latency', default='lognormal:0.8:2.5', help='Gemini generateContent delay spec')
+    parser.add_argument('--config-error-rate', type=float, default=0.0, help='share of config calls failing with 503')
+    parser.add_argument('--compute-error-rate', type=float, default=0.0, help='share of compute calls failing with 503')
+    parser.add_argument('--gemini-error-rate', type=float, default=0.0, help='share of Gemini calls failing with 503')
+    parser.add_argument('--admission-control', action='store_true',
+                        help='keep admission control on (all load comes from one client IP, so expect 429/503s)')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--quiet', action='store_true', help='no per-configuration progress on stderr')
+    args = parser.parse_args()
+
+    report = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
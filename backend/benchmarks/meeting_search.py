@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Latency of saved-meeting search and keyset pagination.
+
+Seeds a throwaway SQLite database with synthetic meetings (transcript,
+translation, summary, action items) and reports per-query latency for FTS5
+search, deep keyset pages and a LIKE scan for comparison.
+
+    python -m benchmarks.meeting_search --meetings 5000
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+WORDS = (
+    "budget hiring roadmap launch customer invoice vendor contract design review sprint release "
+    "marketing campaign pricing forecast revenue churn onboarding support escalation outage "
+    "migration database security audit compliance training offsite partner renewal quota"
+).split()
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)) + "."
+
+
+def _timed(func, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'p50Ms': round(statistics.median(samples), 2),
+        'p95Ms': round(samples[min(len(samples) - 1, int(0.95 * len(samples)))], 2),
+    }
+
+
+def run(meeting_count: int, transcript_words: int, repeat: int) -> dict:
+    db_dir = tempfile.mkdtemp(prefix='meeting-search-')
+    os.environ['DATABASE_PATH'] = os.path.join(db_dir, 'db.sqlite3')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'meeting_assistant.settings')
+
+    import logging
+    import django
+    django.setup()
+    logging.disable(logging.INFO)
+    from django.core.management import call_command
+    from django.db.models import Q
+    from api import meetings as store
+    from api.models import Meeting
+
+    call_command('migrate', verbosity=0)
+
+    rng = random.Random(42)
+    start = time.perf_counter()
+    for i in range(meeting_count):
+        store.save_meeting({
+            'data': {
+                'transcript': _text(rng, transcript_words),
+                'translation': _text(rng, transcript_words),
+                'summary': _text(rng, 60),
+                'actionItems': [{'item': _text(rng, 8), 'assignee': 'Team', 'priority': 'High', 'dueDate': ''}
+                                for _ in range(3)],
+                'keyDecisions': [_text(rng, 10)],
+            },
+            'metadata': {'sourceLanguage': 'hi', 'targetLanguage': 'en'},
+        }, title=f"Meeting {i}")
+    seed_seconds = time.perf_counter() - start
+
+    queries = ['budget', 'roadmap launch', 'invoice vendor contract', 'secur', 'churn escalation outage']
+    results = {'meetings': meeting_count, 'transcriptWords': transcript_words, 'seedSeconds': round(seed_seconds, 1)}
+    for query in queries:
+        results[f"fts:{query}"] = _timed(lambda: store.search_meetings(query, limit=20), repeat)
+
+    def like_scan():
+        matches = Meeting.objects.filter(Q(summary__icontains='roadmap') | Q(transcript__text__icontains='roadmap'))
+        list(matches.order_by('-created_at')[:20])
+    results['like:roadmap'] = _timed(like_scan, repeat)
+
+    def deep_page():
+        cursor = None
+        for _ in range(10):
+            _, cursor = store.list_meetings(limit=50, cursor=cursor)
+    results['keyset:10 pages x 50'] = _timed(deep_page, max(1, repeat // 5))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--meetings', type=int, default=5000, help='meetings to seed')
+    parser.add_argument('--transcript-words', type=int, default=1500, help='words per transcript and translation')
+    parser.add_argument('--repeat', type=int, default=50, help='timed runs per query')
+    args = parser.parse_args()
+    print(json.dumps(run(args.meetings, args.transcript_words, args.repeat), indent=2))
+
+
+if __name__ == '__main__':
+    main()
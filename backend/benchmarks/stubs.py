@@ -0,0 +1,198 @@
+"""
+Local stand-ins for the Bhashini and Gemini APIs.
+
+One threaded HTTP server answers getModelsPipeline, the Bhashini compute call
+and Gemini generateContent (plain or streamed) with canned responses after a configurable delay,
+so the backend can be load tested without network access or API quotas.
+Delays can be fixed or drawn from a distribution (see ``parse_latency``), and
+each upstream can fail a share of calls with 503 to exercise error paths.
+``stub_environment`` returns the environment variables that point the
+services at it.
+"""
+import json
+import math
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Union
+
+CONFIG_PATH = '/ulca/apis/v0/model/getModelsPipeline'
+COMPUTE_PATH = '/services/inference/pipeline'
+GEMINI_PATH = '/v1beta/models/gemini-stub:generateContent'
+
+ANALYSIS = {
+    'summary': 'Stub meeting summary.',
+    'actionItems': [{'task': 'Follow up', 'assignee': 'Team', 'deadline': 'Not specified', 'priority': 'Medium'}],
+    'keyDecisions': ['Ship the stub'],
+}
+
+
+Latency = Union[float, Callable[[], float]]
+
+# z-score of the 95th percentile of a standard normal
+_Z95 = 1.6449
+
+
+def parse_latency(spec: str) -> Latency:
+    """
+    Parse a latency spec from the command line.
+
+    ``0.5`` or ``fixed:0.5`` is a constant delay, ``uniform:0.2:0.8`` is drawn
+    uniformly, and ``lognormal:0.5:2.0`` is log-normal with a 0.5 s median and
+    a 2.0 s p95, the long-tailed shape real inference endpoints show.
+    """
+    kind, _, rest = spec.partition(':')
+    if not rest:
+        return float(kind)
+    values = [float(part) for part in rest.split(':')]
+    if kind == 'fixed' and len(values) == 1:
+        return values[0]
+    if kind == 'uniform' and len(values) == 2:
+        low, high = values
+        return lambda: random.uniform(low, high)
+    if kind == 'lognormal' and len(values) == 2:
+        median, p95 = values
+        if median <= 0 or p95 < median:
+            raise ValueError(f"lognormal latency needs 0 < median <= p95, got {spec!r}")
+        mu, sigma = math.log(median), math.log(p95 / median) / _Z95
+        return lambda: random.lognormvariate(mu, sigma)
+    raise ValueError(f"Unrecognised latency spec {spec!r}")
+
+
+def _sample(latency: Optional[Latency]) -> float:
+    if latency is None:
+        return 0.0
+    return max(0.0, latency() if callable(latency) else latency)
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Enough backlog for load tests that open hundreds of connections at once
+    request_queue_size = 1024
+
+    def __init__(self, address, latency: Dict[str, Latency], error_rates: Dict[str, float]):
+        super().__init__(address, StubHandler)
+        self.latency = latency
+        self.error_rates = error_rates
+        self.counts = {'config': 0, 'compute': 0, 'gemini': 0}
+        self.errors = {'config': 0, 'compute': 0, 'gemini': 0}
+        self.lock = threading.Lock()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        remaining = int(self.headers.get('Content-Length', 0))
+        chunks = []
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, 1024 * 1024))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        body = b''.join(chunks)
+
+        path = self.path.split('?', 1)[0]
+        if path == CONFIG_PATH:
+            kind, response = 'config', self._config_response(json.loads(body or b'{}'))
+        elif path == COMPUTE_PATH:
+            kind, response = 'compute', self._compute_response(body)
+        elif path.endswith(':generateContent') or path.endswith(':streamGenerateContent'):
+            kind, response = 'gemini', self._gemini_response()
+        else:
+            self.send_error(404)
+            return
+
+        failed = random.random() < self.server.error_rates.get(kind, 0.0)
+        with self.server.lock:
+            self.server.counts[kind] += 1
+            if failed:
+                self.server.errors[kind] += 1
+        time.sleep(_sample(self.server.latency.get(kind)))
+
+        status = 200
+        if failed:
+            status, response = 503, {'error': {'code': 503, 'message': f"Injected {kind} failure"}}
+        content_type = 'application/json'
+        encoded = json.dumps(response).encode('utf-8')
+        if status == 200 and path.endswith(':streamGenerateContent'):
+            # One SSE event carrying the whole answer is enough for clients that stream
+            content_type, encoded = 'text/event-stream', b'data: ' + encoded + b'\r\n\r\n'
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def _config_response(self, request: dict) -> dict:
+        tasks = []
+        for task in request.get('pipelineTasks', []):
+            language = task['config']['language']
+            tasks.append({
+                'taskType': task['taskType'],
+                'config': [{'serviceId': f"stub-{task['taskType']}", 'language': language}],
+            })
+        host, port = self.server.server_address[:2]
+        return {
+            'pipelineResponseConfig': tasks,
+            'pipelineInferenceAPIEndPoint': {
+                'callbackUrl': f"http://{host}:{port}{COMPUTE_PATH}",
+                'inferenceApiKey': {'name': 'Authorization', 'value': 'stub-token'},
+            },
+        }
+
+    def _compute_response(self, body: bytes) -> dict:
+        request = json.loads(body or b'{}')
+        tasks = [task['taskType'] for task in request.get('pipelineTasks', [])]
+        if tasks == ['translation']:
+            target = request['pipelineTasks'][0]['config']['language']['targetLanguage']
+            inputs = request.get('inputData', {}).get('input', [])
+            return {
+                'pipelineResponse': [{
+                    'taskType': 'translation',
+                    'output': [{'source': item['source'], 'target': f"[{target}] {item['source']}"} for item in inputs],
+                }]
+            }
+        outputs = {
+            'asr': {'taskType': 'asr', 'output': [{'source': f"stub transcript of {len(body)} request bytes"}]},
+            'translation': {'taskType': 'translation', 'output': [{'target': f"stub translation of {len(body)} request bytes"}]},
+        }
+        # Answer only the tasks asked for, like the real pipeline (ASR-only for same-language audio)
+        return {'pipelineResponse': [outputs[task] for task in tasks if task in outputs]}
+
+    def _gemini_response(self) -> dict:
+        return {'candidates': [{'content': {'parts': [{'text': json.dumps(ANALYSIS)}]}}]}
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_server(latency: Optional[Dict[str, Latency]] = None, host: str = '127.0.0.1',
+                      port: int = 0, error_rates: Optional[Dict[str, float]] = None) -> _StubServer:
+    """
+    Serve the stub upstreams on a background thread.
+
+    ``latency`` maps ``config``/``compute``/``gemini`` to seconds of delay per
+    call, or to a callable returning one. ``error_rates`` maps the same keys to
+    the share of calls answered with 503. Call ``shutdown()`` on the returned
+    server to stop it.
+    """
+    server = _StubServer((host, port), latency or {}, error_rates or {})
+    threading.Thread(target=server.serve_forever, name='upstream-stub', daemon=True).start()
+    return server
+
+
+def stub_environment(server: _StubServer) -> Dict[str, str]:
+    """Environment variables that route the backend's upstream calls to ``server``"""
+    host, port = server.server_address[:2]
+    base = f"http://{host}:{port}"
+    return {
+        'BHASHINI_USER_ID': 'stub-user',
+        'BHASHINI_API_KEY': 'stub-key',
+        'GEMINI_API_KEY': 'stub-key',
+        'BHASHINI_CONFIG_BASE_URL': base,
+        'BHASHINI_COMPUTE_URL': f"{base}{COMPUTE_PATH}",
+        'GEMINI_API_URL': f"{base}{GEMINI_PATH}",
+    }
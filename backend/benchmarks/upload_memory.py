@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Peak-memory benchmark for the Bhashini compute upload path.
+
+Compares the original path (read the whole upload, base64 encode it, let
+requests serialize the JSON payload) with the streamed path (AudioSource on
+disk + StreamingJSONBody). Every measurement runs in a fresh process that
+POSTs to a local sink server, and reports peak RSS growth per MB of audio.
+
+    python -m benchmarks.upload_memory --sizes 5 10 25 50
+"""
+import os
+import sys
+import json
+import base64
+import argparse
+import resource
+import tempfile
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MB = 1024 * 1024
+
+
+class SinkHandler(BaseHTTPRequestHandler):
+    """Reads and discards the request body, then answers with an empty compute result"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        remaining = int(self.headers.get('Content-Length', 0))
+        while remaining > 0:
+            remaining -= len(self.rfile.read(min(remaining, 1024 * 1024)))
+        body = b'{"pipelineResponse": []}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve(port_queue):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SinkHandler)
+    port_queue.put(server.server_port)
+    server.serve_forever()
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is reported in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _compute_payload(audio_content):
+    return {
+        "pipelineTasks": [
+            {"taskType": "asr", "config": {"language": {"sourceLanguage": "hi"}, "serviceId": "asr", "audioFormat": "wav", "samplingRate": 16000}},
+            {"taskType": "translation", "config": {"language": {"sourceLanguage": "hi", "targetLanguage": "en"}, "serviceId": "nmt"}},
+        ],
+        "inputData": {
+            "audio": [{"audioContent": audio_content}],
+            "input": [{"source": ""}],
+        },
+    }
+
+
+def _measure(mode, path, url, result_queue):
+    import requests
+    from api.audio import AudioSource, StreamingJSONBody
+
+    session = requests.Session()
+    session.post(url, data=b'{}')  # warm up imports and the connection
+    baseline = _peak_rss_mb()
+
+    if mode == 'buffered':
+        # Original views.process_audio + BhashiniService.process_audio behaviour
+        with open(path, 'rb') as f:
+            audio_content = f.read()
+        audio_base64 = base64.b64encode(audio_content).decode('utf-8')
+        session.post(url, json=_compute_payload(audio_base64), timeout=120)
+    else:
+        audio = AudioSource('wav', path=path)
+        body = StreamingJSONBody(_compute_payload(StreamingJSONBody.PLACEHOLDER), audio)
+        session.post(url, data=body, headers={'Content-Type': 'application/json'}, timeout=120)
+
+    result_queue.put(_peak_rss_mb() - baseline)
+
+
+def run(sizes_mb):
+    ctx = multiprocessing.get_context('spawn')
+    port_queue = ctx.Queue()
+    server = ctx.Process(target=_serve, args=(port_queue,), daemon=True)
+    server.start()
+    url = f"http://127.0.0.1:{port_queue.get()}/services/inference/pipeline"
+
+    results = []
+    try:
+        for size_mb in sizes_mb:
+            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as f:
+                for _ in range(size_mb):
+                    f.write(os.urandom(MB))
+                path = f.name
+            try:
+                for mode in ('buffered', 'streamed'):
+                    result_queue = ctx.Queue()
+                    worker = ctx.Process(target=_measure, args=(mode, path, url, result_queue))
+                    worker.start()
+                    growth = result_queue.get(timeout=300)
+                    worker.join()
+                    results.append({
+                        'mode': mode,
+                        'audioMB': size_mb,
+                        'peakRssGrowthMB': round(growth, 1),
+                        'peakRssPerAudioMB': round(growth / size_mb, 2),
+                    })
+            finally:
+                os.remove(path)
+    finally:
+        server.terminate()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5, 10, 25, 50], help='audio sizes in MB')
+    parser.add_argument('--json', action='store_true', help='print machine-readable JSON only')
+    args = parser.parse_args()
+
+    results = run(args.sizes)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'mode':<10} {'audio MB':>9} {'peak RSS +MB':>13} {'RSS MB / audio MB':>18}")
+    for row in results:
+        print(f"{row['mode']:<10} {row['audioMB']:>9} {row['peakRssGrowthMB']:>13} {row['peakRssPerAudioMB']:>18}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""
+gunicorn configuration, loaded automatically from the working directory.
+
+Points prometheus_client at a shared directory so /metrics aggregates every
+worker, wipes samples left by a previous server run, and retires the live
+gauges of workers that exit.
+
+Workers run several threads so requests beyond the admission limit reach
+Django and get a quick 429/503 instead of waiting unseen in the listen
+backlog; ADMISSION_MAX_CONCURRENT, not the thread count, bounds how many
+pipelines run.
+"""
+import os
+import shutil
+from pathlib import Path
+
+os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR',
+    str(Path(os.getenv('LOCAL_STATE_DIR', Path(__file__).resolve().parent / 'var')) / 'prometheus'),
+)
+
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+
+
+def on_starting(server):
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
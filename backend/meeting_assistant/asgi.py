@@ -0,0 +1,21 @@
+"""
+ASGI config for meeting_assistant project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Serving through this entry point switches POST /api/process-audio/ to its
+native async view, e.g.::
+
+    uvicorn meeting_assistant.asgi:application --workers 2
+
+For more information on this file, see
+https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'meeting_assistant.settings')
+os.environ.setdefault('DJANGO_ASYNC_VIEWS', 'True')
+
+application = get_asgi_application()
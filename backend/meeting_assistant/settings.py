@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -95,7 +96,11 @@ WSGI_APPLICATION = 'meeting_assistant.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.getenv('DATABASE_PATH', BASE_DIR / 'db.sqlite3'),
+        'OPTIONS': {
+            # Seconds to wait for another worker's write lock (WAL is enabled in api.apps)
+            'timeout': 20,
+        },
     }
 }
 
@@ -172,8 +177,16 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'x-user-id',
+    'x-api-key',
+    'x-chunk-sha256',
+    'idempotency-key',
+    'traceparent',
 ]
 
+# Let browsers read the trace id, Retry-After and the resume offset of uploads
+CORS_EXPOSE_HEADERS = ['x-trace-id', 'retry-after', 'upload-offset']
+
 # Security settings for production
 if not DEBUG:
     SECURE_BROWSER_XSS_FILTER = True
@@ -184,10 +197,158 @@ if not DEBUG:
     SECURE_HSTS_PRELOAD = True
 
 # File upload settings
-FILE_UPLOAD_MAX_MEMORY_SIZE = 52428800  # 50MB
+# Uploads above 2.5MB are spooled to disk and streamed to Bhashini from there
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.getenv('FILE_UPLOAD_MAX_MEMORY_SIZE', '2621440'))
 DATA_UPLOAD_MAX_MEMORY_SIZE = 52428800  # 50MB
+AUDIO_SPOOL_DIR = os.getenv('AUDIO_SPOOL_DIR', tempfile.gettempdir())
+
+# Bhashini pipeline config cache
+BHASHINI_PIPELINE_CACHE_TTL = int(os.getenv('BHASHINI_PIPELINE_CACHE_TTL', '21600'))  # 6 hours
+BHASHINI_PIPELINE_CACHE_SIZE = int(os.getenv('BHASHINI_PIPELINE_CACHE_SIZE', '128'))
+
+# Upstream HTTP connection pools (connections kept per host, per worker process)
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '10'))
+BHASHINI_CONFIG_POOL_MAXSIZE = int(os.getenv('BHASHINI_CONFIG_POOL_MAXSIZE', '4'))
+BHASHINI_COMPUTE_POOL_MAXSIZE = int(os.getenv('BHASHINI_COMPUTE_POOL_MAXSIZE', '10'))
+GEMINI_POOL_MAXSIZE = int(os.getenv('GEMINI_POOL_MAXSIZE', '10'))
+
+# Upload normalization: PCM WAV is downmixed to mono and resampled before upload
+BHASHINI_NORMALIZE_AUDIO = os.getenv('BHASHINI_NORMALIZE_AUDIO', 'True').lower() == 'true'
+BHASHINI_TARGET_SAMPLE_RATE = int(os.getenv('BHASHINI_TARGET_SAMPLE_RATE', '16000'))
+
+# Energy-based voice activity trimming: silences longer than BHASHINI_VAD_MIN_SILENCE_MS
+# (frames BHASHINI_VAD_MARGIN_DB below the recording's level) shrink to BHASHINI_VAD_KEEP_SILENCE_MS
+BHASHINI_VAD_ENABLED = os.getenv('BHASHINI_VAD_ENABLED', 'True').lower() == 'true'
+BHASHINI_VAD_MARGIN_DB = float(os.getenv('BHASHINI_VAD_MARGIN_DB', '16'))
+BHASHINI_VAD_MIN_SILENCE_MS = int(os.getenv('BHASHINI_VAD_MIN_SILENCE_MS', '1000'))
+BHASHINI_VAD_KEEP_SILENCE_MS = int(os.getenv('BHASHINI_VAD_KEEP_SILENCE_MS', '300'))
+
+# Multi-target translation: extra targetLanguages are translated from the transcript concurrently
+MAX_TARGET_LANGUAGES = int(os.getenv('MAX_TARGET_LANGUAGES', '8'))
+BHASHINI_TRANSLATION_CONCURRENCY = int(os.getenv('BHASHINI_TRANSLATION_CONCURRENCY', '4'))
+BHASHINI_TRANSLATION_MAX_CHARS = int(os.getenv('BHASHINI_TRANSLATION_MAX_CHARS', '2000'))
+
+# Chunked ASR for long recordings (split on silence, processed concurrently)
+BHASHINI_CHUNKING_ENABLED = os.getenv('BHASHINI_CHUNKING_ENABLED', 'True').lower() == 'true'
+BHASHINI_CHUNK_MIN_AUDIO_SECONDS = int(os.getenv('BHASHINI_CHUNK_MIN_AUDIO_SECONDS', '180'))  # only chunk longer recordings
+BHASHINI_CHUNK_MAX_SECONDS = int(os.getenv('BHASHINI_CHUNK_MAX_SECONDS', '60'))
+BHASHINI_CHUNK_MIN_SECONDS = int(os.getenv('BHASHINI_CHUNK_MIN_SECONDS', '20'))
+BHASHINI_CHUNK_CONCURRENCY = int(os.getenv('BHASHINI_CHUNK_CONCURRENCY', '4'))
+
+# Map-reduce analysis of long transcripts (token counts are estimated at ~4 chars/token)
+GEMINI_MAP_REDUCE_ENABLED = os.getenv('GEMINI_MAP_REDUCE_ENABLED', 'True').lower() == 'true'
+GEMINI_MAP_REDUCE_THRESHOLD_TOKENS = int(os.getenv('GEMINI_MAP_REDUCE_THRESHOLD_TOKENS', '12000'))
+GEMINI_MAP_REDUCE_WINDOW_TOKENS = int(os.getenv('GEMINI_MAP_REDUCE_WINDOW_TOKENS', '6000'))
+GEMINI_MAP_REDUCE_CONCURRENCY = int(os.getenv('GEMINI_MAP_REDUCE_CONCURRENCY', '4'))
+
+# Server-Sent Events progress stream (POST /api/process-audio/stream/)
+SSE_KEEPALIVE_SECONDS = int(os.getenv('SSE_KEEPALIVE_SECONDS', '15'))
+
+# Local state shared by worker processes (job store, caches)
+LOCAL_STATE_DIR = Path(os.getenv('LOCAL_STATE_DIR', BASE_DIR / 'var'))
+
+# Asynchronous processing jobs (POST /api/process-audio/?async=true)
+ASYNC_JOBS_ENABLED = os.getenv('ASYNC_JOBS_ENABLED', 'True').lower() == 'true'
+JOB_STORE_PATH = LOCAL_STATE_DIR / 'jobs.sqlite3'
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))  # pipeline threads per worker process
+JOB_QUEUE_SIZE = int(os.getenv('JOB_QUEUE_SIZE', '8'))  # jobs waiting beyond the running ones
+JOB_RETENTION_SECONDS = int(os.getenv('JOB_RETENTION_SECONDS', '86400'))
+
+# Content-addressed result cache for repeated uploads (transcripts and AI analysis)
+RESULT_CACHE_ENABLED = os.getenv('RESULT_CACHE_ENABLED', 'True').lower() == 'true'
+RESULT_CACHE_PATH = LOCAL_STATE_DIR / 'results.sqlite3'
+RESULT_CACHE_MAX_BYTES = int(os.getenv('RESULT_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+RESULT_CACHE_TTL = int(os.getenv('RESULT_CACHE_TTL', str(7 * 24 * 60 * 60)))  # 7 days
+
+# Stage checkpoints (api/checkpoints.py): requests sent with an Idempotency-Key header save each finished
+# stage, so a retry with the same key and upload resumes after the last stage that succeeded
+CHECKPOINTS_ENABLED = os.getenv('CHECKPOINTS_ENABLED', 'True').lower() == 'true'
+CHECKPOINT_STORE_PATH = LOCAL_STATE_DIR / 'checkpoints.sqlite3'
+CHECKPOINT_MAX_BYTES = int(os.getenv('CHECKPOINT_MAX_BYTES', str(64 * 1024 * 1024)))
+CHECKPOINT_TTL_SECONDS = int(os.getenv('CHECKPOINT_TTL_SECONDS', '3600'))
+CHECKPOINT_CLAIM_SECONDS = int(os.getenv('CHECKPOINT_CLAIM_SECONDS', '300'))  # in-flight claim, renewed with every saved stage
+
+# Admission control for audio processing (api/admission.py), shared by all workers through ADMISSION_STORE_PATH
+ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'True').lower() == 'true'
+ADMISSION_STORE_PATH = LOCAL_STATE_DIR / 'admission.sqlite3'
+ADMISSION_MAX_CONCURRENT = int(os.getenv('ADMISSION_MAX_CONCURRENT', '4'))  # pipelines running at once, all workers
+ADMISSION_QUEUE_SIZE = int(os.getenv('ADMISSION_QUEUE_SIZE', '8'))  # requests waiting for a slot before 503s
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', '10'))  # longest wait for a slot
+ADMISSION_CLIENT_RATE = float(os.getenv('ADMISSION_CLIENT_RATE', '6'))  # requests per minute per client; 0 disables
+ADMISSION_CLIENT_BURST = int(os.getenv('ADMISSION_CLIENT_BURST', '3'))
+# Only these keys (comma separated, sent as X-Api-Key or Authorization: Bearer) get a bucket of their own;
+# any other credential is ignored and the client is keyed by IP
+ADMISSION_API_KEYS = [key.strip() for key in os.getenv('ADMISSION_API_KEYS', '').split(',') if key.strip()]
+# Trusted reverse proxies appending to X-Forwarded-For; 0 (default) uses REMOTE_ADDR, as the header is client-supplied.
+# Deploys behind a proxy must set it (railway.toml and vercel.json set 1), or all clients share the proxy's bucket
+ADMISSION_PROXY_HOPS = int(os.getenv('ADMISSION_PROXY_HOPS', '0'))
+ADMISSION_LEASE_SECONDS = float(os.getenv('ADMISSION_LEASE_SECONDS', '900'))  # slots of hung requests are reclaimed
+ADMISSION_DEFAULT_DURATION = float(os.getenv('ADMISSION_DEFAULT_DURATION', '30'))  # Retry-After basis until measured
+
+# Resumable chunked uploads (/api/uploads/), assembled in UPLOAD_DIR and processed as background jobs
+UPLOAD_STORE_PATH = LOCAL_STATE_DIR / 'uploads.sqlite3'
+UPLOAD_DIR = Path(os.getenv('UPLOAD_DIR', LOCAL_STATE_DIR / 'uploads'))
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(4 * 1024 * 1024)))  # default; clients may pick 256KB-16MB
+UPLOAD_TTL_SECONDS = int(os.getenv('UPLOAD_TTL_SECONDS', '86400'))  # unfinished uploads are dropped after this idle time
+# Caps on bytes held by uploads not yet processed, per client (API key or address) and in total
+UPLOAD_MAX_CLIENT_BYTES = int(os.getenv('UPLOAD_MAX_CLIENT_BYTES', str(1024 * 1024 * 1024)))
+UPLOAD_MAX_TOTAL_BYTES = int(os.getenv('UPLOAD_MAX_TOTAL_BYTES', str(4 * 1024 * 1024 * 1024)))
+
+# Batch processing (/api/process-audio/batch/)
+BATCH_MAX_FILES = int(os.getenv('BATCH_MAX_FILES', '20'))
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', '4'))  # files in flight per batch, capped by free admission slots
+
+# Native async views and upstream clients (enabled by meeting_assistant.asgi)
+ASYNC_VIEWS = os.getenv('DJANGO_ASYNC_VIEWS', 'False').lower() == 'true'
+ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv('ASYNC_HTTP_MAX_CONNECTIONS', '200'))
+
+# Upstream resilience (api/resilience.py). Timeouts shrink to a multiple of each endpoint's observed
+# p99 but never exceed the fixed per-call ceilings (30s config, 120s compute, 60s Gemini)
+UPSTREAM_ADAPTIVE_TIMEOUTS = os.getenv('UPSTREAM_ADAPTIVE_TIMEOUTS', 'True').lower() == 'true'
+UPSTREAM_TIMEOUT_MULTIPLIER = float(os.getenv('UPSTREAM_TIMEOUT_MULTIPLIER', '3'))
+UPSTREAM_TIMEOUT_MIN_SECONDS = float(os.getenv('UPSTREAM_TIMEOUT_MIN_SECONDS', '5'))
+UPSTREAM_LATENCY_WINDOW = int(os.getenv('UPSTREAM_LATENCY_WINDOW', '200'))  # recent calls per endpoint
+UPSTREAM_LATENCY_MIN_SAMPLES = int(os.getenv('UPSTREAM_LATENCY_MIN_SAMPLES', '20'))  # before timeouts adapt or hedging starts
+UPSTREAM_HEDGING_ENABLED = os.getenv('UPSTREAM_HEDGING_ENABLED', 'True').lower() == 'true'
+UPSTREAM_HEDGE_MAX_RATIO = float(os.getenv('UPSTREAM_HEDGE_MAX_RATIO', '0.1'))  # hedges per call at most
+UPSTREAM_HEDGE_MAX_BODY_BYTES = int(os.getenv('UPSTREAM_HEDGE_MAX_BODY_BYTES', str(4 * 1024 * 1024)))
+UPSTREAM_HEDGE_POOL_SIZE = int(os.getenv('UPSTREAM_HEDGE_POOL_SIZE', '64'))
+UPSTREAM_RETRY_ATTEMPTS = int(os.getenv('UPSTREAM_RETRY_ATTEMPTS', '2'))  # retries after the first attempt
+UPSTREAM_RETRY_BASE_DELAY = float(os.getenv('UPSTREAM_RETRY_BASE_DELAY', '0.5'))
+UPSTREAM_RETRY_MAX_DELAY = float(os.getenv('UPSTREAM_RETRY_MAX_DELAY', '8'))
+CIRCUIT_BREAKER_FAILURES = int(os.getenv('CIRCUIT_BREAKER_FAILURES', '5'))  # consecutive failures that open it
+CIRCUIT_BREAKER_RESET_SECONDS = float(os.getenv('CIRCUIT_BREAKER_RESET_SECONDS', '30'))
+
+# Request deadlines (api/deadlines.py): a synchronous /api/process-audio/ request gets REQUEST_DEADLINE_SECONDS
+# in total, below gunicorn's --timeout 120, and each upstream call only what is left of it (0 disables).
+# With less than DEADLINE_MIN_ANALYSIS_SECONDS left for Gemini the transcript is returned with
+# summaryPending and the analysis finishes as a background job
+REQUEST_DEADLINE_SECONDS = float(os.getenv('REQUEST_DEADLINE_SECONDS', '110'))
+DEADLINE_MIN_ANALYSIS_SECONDS = float(os.getenv('DEADLINE_MIN_ANALYSIS_SECONDS', '10'))
+
+# Prometheus scrape endpoint at /metrics; set PROMETHEUS_MULTIPROC_DIR to aggregate across
+# worker processes (gunicorn.conf.py does this for gunicorn)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+
+# Request tracing: every request gets an X-Trace-Id, a sampled share records spans. Spans go to an
+# OTLP/HTTP JSON collector when TRACE_OTLP_ENDPOINT is set (e.g. http://collector:4318/v1/traces),
+# otherwise to TRACE_EXPORT_PATH as JSON lines
+TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'True').lower() == 'true'
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '0.1'))
+TRACE_OTLP_ENDPOINT = os.getenv('TRACE_OTLP_ENDPOINT', '')
+TRACE_EXPORT_PATH = os.getenv('TRACE_EXPORT_PATH', str(LOCAL_STATE_DIR / 'traces.jsonl'))
+TRACE_EXPORT_MAX_BYTES = int(os.getenv('TRACE_EXPORT_MAX_BYTES', str(64 * 1024 * 1024)))  # rotated to .1 beyond this
+TRACE_EXPORT_BATCH_SIZE = int(os.getenv('TRACE_EXPORT_BATCH_SIZE', '256'))
+TRACE_EXPORT_INTERVAL = float(os.getenv('TRACE_EXPORT_INTERVAL', '5'))
+TRACE_EXPORT_MAX_QUEUE = int(os.getenv('TRACE_EXPORT_MAX_QUEUE', '4096'))
 
 # Logging configuration
+# Log output (api/logs.py): records are formatted and written by a background thread
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')  # 'text' or 'json'
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))  # records beyond this are dropped, not waited for
+LOG_PAYLOAD_MAX_CHARS = int(os.getenv('LOG_PAYLOAD_MAX_CHARS', '2000'))  # cut-off for logged request/response bodies
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv('LOG_PAYLOAD_SAMPLE_RATE', '0.1'))  # share of info-level body dumps written
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -200,11 +361,17 @@ LOGGING = {
             'format': '{levelname} {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'api.logs.JsonFormatter',
+        },
     },
     'handlers': {
         'console': {
-            'class': 'logging.StreamHandler',
-            'formatter': 'verbose',
+            '()': 'api.logs.AsyncLogHandler',
+            'formatter': 'json' if LOG_FORMAT == 'json' else 'verbose',
+            'max_queue': LOG_QUEUE_SIZE,
+            'payload_max_chars': LOG_PAYLOAD_MAX_CHARS,
+            'payload_sample_rate': LOG_PAYLOAD_SAMPLE_RATE,
         },
     },
     'root': {
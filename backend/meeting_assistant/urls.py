@@ -19,6 +19,8 @@ from django.urls import path, include
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 
+from api.views import prometheus_metrics
+
 @csrf_exempt
 def root_health(request):
     """Root health check endpoint"""
@@ -37,5 +39,6 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
     path('health/', root_health, name='root_health'),
+    path('metrics', prometheus_metrics, name='metrics'),
     path('', root_health, name='root'),
 ]
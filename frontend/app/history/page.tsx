@@ -0,0 +1,252 @@
+"use client"
+
+import type React from "react"
+import { useState, useEffect, useCallback } from "react"
+import { Button } from "@/components/ui/button"
+import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card"
+import { Alert, AlertDescription } from "@/components/ui/alert"
+import { Badge } from "@/components/ui/badge"
+import { AlertCircle, Copy, History, KeyRound, Loader2, Search, Trash2 } from "lucide-react"
+import { Navigation } from "@/components/navigation"
+import { deleteMeeting, getMeeting, listMeetings, searchMeetings, type MeetingSummary } from "@/lib/meetings"
+import { getUserId, setUserId } from "@/lib/user-id"
+
+interface MeetingDetail {
+  data: {
+    transcript: string
+    translation: string
+    summary: string
+    actionItems: Array<{ item: string; assignee: string; priority: string; dueDate: string }>
+    keyDecisions: string[]
+  }
+}
+
+export default function HistoryPage() {
+  const [meetings, setMeetings] = useState<MeetingSummary[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [query, setQuery] = useState("")
+  const [activeQuery, setActiveQuery] = useState("")
+  const [isLoading, setIsLoading] = useState(false)
+  const [error, setError] = useState<string | null>(null)
+  const [expanded, setExpanded] = useState<Record<string, MeetingDetail>>({})
+  const [syncKey, setSyncKey] = useState("")
+  const [syncKeyInput, setSyncKeyInput] = useState("")
+  const [copySuccess, setCopySuccess] = useState(false)
+
+  const loadPage = useCallback(async (search: string, cursor: string | null) => {
+    setIsLoading(true)
+    setError(null)
+    try {
+      const page = search ? await searchMeetings(search, cursor) : await listMeetings(cursor)
+      setMeetings((current) => (cursor ? [...current, ...page.meetings] : page.meetings))
+      setNextCursor(page.nextCursor)
+    } catch (err) {
+      setError(err instanceof Error ? err.message : "Failed to load meeting history")
+    } finally {
+      setIsLoading(false)
+    }
+  }, [])
+
+  useEffect(() => {
+    setSyncKey(getUserId())
+    loadPage("", null)
+  }, [loadPage])
+
+  const handleSearch = useCallback(
+    (event: React.FormEvent) => {
+      event.preventDefault()
+      const search = query.trim()
+      setActiveQuery(search)
+      loadPage(search, null)
+    },
+    [query, loadPage],
+  )
+
+  const toggleMeeting = useCallback(
+    async (id: string) => {
+      if (expanded[id]) {
+        setExpanded((current) => {
+          const next = { ...current }
+          delete next[id]
+          return next
+        })
+        return
+      }
+      try {
+        const meeting = await getMeeting(id)
+        setExpanded((current) => ({ ...current, [id]: meeting }))
+      } catch (err) {
+        setError(err instanceof Error ? err.message : "Failed to load meeting")
+      }
+    },
+    [expanded],
+  )
+
+  const removeMeeting = useCallback(async (id: string) => {
+    try {
+      await deleteMeeting(id)
+      setMeetings((current) => current.filter((meeting) => meeting.id !== id))
+    } catch (err) {
+      setError(err instanceof Error ? err.message : "Failed to delete meeting")
+    }
+  }, [])
+
+  const copySyncKey = useCallback(async () => {
+    await navigator.clipboard.writeText(syncKey)
+    setCopySuccess(true)
+    setTimeout(() => setCopySuccess(false), 2000)
+  }, [syncKey])
+
+  const applySyncKey = useCallback(() => {
+    if (!setUserId(syncKeyInput)) {
+      setError("A sync key is 16-128 letters, digits, '-' or '_'")
+      return
+    }
+    setSyncKey(getUserId())
+    setSyncKeyInput("")
+    setExpanded({})
+    setQuery("")
+    setActiveQuery("")
+    loadPage("", null)
+  }, [syncKeyInput, loadPage])
+
+  return (
+    <div className="min-h-screen bg-gradient-to-br from-blue-50 via-white to-purple-50">
+      <Navigation />
+      <div className="container mx-auto px-4 py-8 max-w-6xl space-y-8">
+        <div className="text-center">
+          <h1 className="text-4xl font-bold text-gray-900 mb-4">Meeting History</h1>
+          <p className="text-xl text-gray-600 max-w-3xl mx-auto">
+            Every meeting you save, searchable across transcripts, summaries and action items
+          </p>
+        </div>
+
+        {/* Sync key */}
+        <Card className="shadow-lg border-0 bg-white/80 backdrop-blur-sm">
+          <CardHeader>
+            <CardTitle className="flex items-center gap-2">
+              <KeyRound className="h-5 w-5 text-blue-600" />
+              Sync Key
+            </CardTitle>
+          </CardHeader>
+          <CardContent className="space-y-4">
+            <p className="text-sm text-gray-600">
+              Your history belongs to this key. Enter it on another device to see the same meetings there, and keep it
+              private: anyone with the key can read and delete them.
+            </p>
+            <div className="flex flex-wrap items-center gap-2">
+              <code className="rounded bg-gray-100 px-3 py-2 text-sm text-gray-800 break-all">{syncKey}</code>
+              <Button variant="outline" size="sm" onClick={copySyncKey} className="flex items-center gap-1">
+                <Copy className="h-4 w-4" />
+                {copySuccess ? "Copied" : "Copy"}
+              </Button>
+            </div>
+            <div className="flex flex-wrap gap-2">
+              <input
+                value={syncKeyInput}
+                onChange={(e) => setSyncKeyInput(e.target.value)}
+                placeholder="Paste a sync key from another device"
+                className="flex-1 min-w-[16rem] rounded-md border border-gray-300 px-3 py-2 text-sm focus:border-blue-400 focus:outline-none"
+              />
+              <Button variant="outline" onClick={applySyncKey} disabled={!syncKeyInput.trim()}>
+                Use this key
+              </Button>
+            </div>
+          </CardContent>
+        </Card>
+
+        {/* Meetings */}
+        <Card className="shadow-lg border-0 bg-white/80 backdrop-blur-sm">
+          <CardHeader>
+            <CardTitle className="flex items-center gap-2">
+              <History className="h-5 w-5 text-purple-600" />
+              {activeQuery ? `Results for "${activeQuery}"` : "Saved Meetings"}
+            </CardTitle>
+          </CardHeader>
+          <CardContent className="space-y-4">
+            <form onSubmit={handleSearch} className="flex gap-2">
+              <input
+                value={query}
+                onChange={(e) => setQuery(e.target.value)}
+                placeholder="Search transcripts, summaries and action items"
+                className="flex-1 rounded-md border border-gray-300 px-3 py-2 text-sm focus:border-blue-400 focus:outline-none"
+              />
+              <Button type="submit" className="flex items-center gap-1">
+                <Search className="h-4 w-4" />
+                Search
+              </Button>
+            </form>
+
+            {error && (
+              <Alert variant="destructive">
+                <AlertCircle className="h-4 w-4" />
+                <AlertDescription>{error}</AlertDescription>
+              </Alert>
+            )}
+
+            {meetings.length === 0 && !isLoading && (
+              <p className="text-center text-sm text-gray-500 py-6">
+                {activeQuery ? "No meetings match this search" : "No saved meetings yet"}
+              </p>
+            )}
+
+            <div className="space-y-3">
+              {meetings.map((meeting) => (
+                <div key={meeting.id} className="rounded-lg border border-gray-200 bg-white p-4">
+                  <div className="flex items-start justify-between gap-4">
+                    <button className="text-left flex-1" onClick={() => toggleMeeting(meeting.id)}>
+                      <p className="font-medium text-gray-900">{meeting.title || "Untitled meeting"}</p>
+                      <div className="flex flex-wrap items-center gap-2 mt-1 text-xs text-gray-500">
+                        <span>{new Date(meeting.createdAt).toLocaleString()}</span>
+                        <Badge variant="outline">
+                          {meeting.sourceLanguage} → {meeting.targetLanguage}
+                        </Badge>
+                      </div>
+                      <p className="text-sm text-gray-600 mt-2 line-clamp-2">{meeting.snippet || meeting.summary}</p>
+                    </button>
+                    <Button
+                      variant="ghost"
+                      size="sm"
+                      onClick={() => removeMeeting(meeting.id)}
+                      aria-label="Delete meeting"
+                    >
+                      <Trash2 className="h-4 w-4 text-red-500" />
+                    </Button>
+                  </div>
+                  {expanded[meeting.id] && (
+                    <div className="mt-4 space-y-3 text-sm text-gray-700">
+                      <p className="whitespace-pre-wrap">{expanded[meeting.id].data.summary}</p>
+                      {expanded[meeting.id].data.actionItems.length > 0 && (
+                        <ul className="list-disc pl-5 space-y-1">
+                          {expanded[meeting.id].data.actionItems.map((item, index) => (
+                            <li key={index}>
+                              {item.item}
+                              {item.assignee && <span className="text-gray-500"> ({item.assignee})</span>}
+                            </li>
+                          ))}
+                        </ul>
+                      )}
+                      <details>
+                        <summary className="cursor-pointer text-gray-500">Transcript</summary>
+                        <p className="whitespace-pre-wrap mt-2">{expanded[meeting.id].data.transcript}</p>
+                      </details>
+                    </div>
+                  )}
+                </div>
+              ))}
+            </div>
+
+            {isLoading && <Loader2 className="h-6 w-6 animate-spin text-blue-600 mx-auto" />}
+            {nextCursor && !isLoading && (
+              <div className="text-center">
+                <Button variant="outline" onClick={() => loadPage(activeQuery, nextCursor)}>
+                  Load more
+                </Button>
+              </div>
+            )}
+          </CardContent>
+        </Card>
+      </div>
+    </div>
+  )
+}
@@ -7,6 +7,7 @@ import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card"
 import { Textarea } from "@/components/ui/textarea"
 import { Alert, AlertDescription } from "@/components/ui/alert"
 import { Progress } from "@/components/ui/progress"
+import { saveMeeting } from "@/lib/meetings"
 import {
   Upload,
   FileAudio,
@@ -312,22 +313,21 @@ export default function SessionsPage() {
     }
   }, [])
 
-  const saveSession = useCallback(() => {
+  const saveSession = useCallback(async () => {
     if (processedData && metadata) {
-      const sessionData = {
-        timestamp: new Date().toISOString(),
-        fileName: metadata.fileName,
-        processedData,
-        metadata,
-        preMeetingNotes,
+      try {
+        await saveMeeting({
+          title: metadata.fileName,
+          preMeetingNotes,
+          data: processedData,
+          metadata,
+        })
+
+        setSaveSuccess(true)
+        setTimeout(() => setSaveSuccess(false), 2000)
+      } catch (err) {
+        setError(err instanceof Error ? err.message : "Failed to save session")
       }
-      // Save to localStorage for now
-      const sessions = JSON.parse(localStorage.getItem("meetingSessions") || "[]")
-      sessions.push(sessionData)
-      localStorage.setItem("meetingSessions", JSON.stringify(sessions))
-
-      setSaveSuccess(true)
-      setTimeout(() => setSaveSuccess(false), 2000)
     }
   }, [processedData, metadata, preMeetingNotes])
 
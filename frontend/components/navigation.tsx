@@ -1,6 +1,6 @@
 import Link from "next/link"
 import { Button } from "@/components/ui/button"
-import { Home, Mic, Settings, User } from "lucide-react"
+import { History, Home, Mic, Settings, User } from "lucide-react"
 
 export function Navigation() {
   return (
@@ -27,6 +27,16 @@ export function Navigation() {
               Sessions
             </Link>
           </Button>
+          <Button variant="ghost" asChild>
+            <Link
+              href="/history"
+              className="flex items-center gap-2 text-gray-700 hover:text-blue-600"
+              prefetch={false}
+            >
+              <History className="h-5 w-5" />
+              History
+            </Link>
+          </Button>
           <Button variant="ghost" asChild>
             <Link
               href="/coming-soon"
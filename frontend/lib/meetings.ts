@@ -0,0 +1,72 @@
+import { getUserId } from "@/lib/user-id"
+
+export interface MeetingSummary {
+  id: string
+  title: string
+  sourceLanguage: string
+  targetLanguage: string
+  audioFormat: string
+  summary: string
+  createdAt: string
+  // Search results only
+  snippet?: string
+  score?: number
+}
+
+export interface MeetingPage {
+  meetings: MeetingSummary[]
+  nextCursor: string | null
+}
+
+const backendUrl = () => process.env.NEXT_PUBLIC_BACKEND_URL || "http://localhost:8000"
+
+async function meetingsRequest(path: string, init: RequestInit = {}) {
+  const response = await fetch(`${backendUrl()}/api/meetings/${path}`, {
+    ...init,
+    headers: { ...init.headers, "X-User-Id": getUserId() },
+  })
+  const body = await response.json().catch(() => ({}))
+  if (!response.ok) {
+    throw new Error(body.error || `Meetings request failed (HTTP ${response.status})`)
+  }
+  return body
+}
+
+function pageQuery(params: Record<string, string | null | undefined>) {
+  const query = new URLSearchParams()
+  for (const [key, value] of Object.entries(params)) {
+    if (value) {
+      query.set(key, value)
+    }
+  }
+  const encoded = query.toString()
+  return encoded ? `?${encoded}` : ""
+}
+
+export async function listMeetings(cursor?: string | null): Promise<MeetingPage> {
+  const body = await meetingsRequest(pageQuery({ cursor }))
+  return { meetings: body.meetings, nextCursor: body.nextCursor }
+}
+
+export async function searchMeetings(query: string, cursor?: string | null): Promise<MeetingPage> {
+  const body = await meetingsRequest(`search/${pageQuery({ q: query, cursor })}`)
+  return { meetings: body.results, nextCursor: body.nextCursor }
+}
+
+export async function saveMeeting(meeting: Record<string, unknown>) {
+  const body = await meetingsRequest("", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(meeting),
+  })
+  return body.meeting
+}
+
+export async function deleteMeeting(id: string) {
+  await meetingsRequest(`${id}/`, { method: "DELETE" })
+}
+
+export async function getMeeting(id: string) {
+  const body = await meetingsRequest(`${id}/`)
+  return body.meeting
+}
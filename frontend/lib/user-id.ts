@@ -0,0 +1,25 @@
+const USER_ID_KEY = "meeting-assistant-user-id"
+
+// Same rule the backend applies to X-User-Id
+const USER_ID_PATTERN = /^[A-Za-z0-9_-]{16,128}$/
+
+// There are no accounts yet: saved meetings belong to a random sync key. This browser keeps it, and entering the
+// same key on another device (see the History page) brings that device the same meeting history.
+export function getUserId(): string {
+  let userId = window.localStorage.getItem(USER_ID_KEY)
+  if (!userId || !USER_ID_PATTERN.test(userId)) {
+    userId = crypto.randomUUID()
+    window.localStorage.setItem(USER_ID_KEY, userId)
+  }
+  return userId
+}
+
+// Switch this browser to a sync key copied from another device; returns false if it is not a valid key
+export function setUserId(userId: string): boolean {
+  const trimmed = userId.trim()
+  if (!USER_ID_PATTERN.test(trimmed)) {
+    return false
+  }
+  window.localStorage.setItem(USER_ID_KEY, trimmed)
+  return true
+}